@@ -0,0 +1,166 @@
+import time
+from typing import Any
+
+from fastapi.responses import StreamingResponse
+
+import nebula
+from server.browse_cache import browse_cache
+from server.dependencies import CurrentUser
+from server.ndjson import ndjson_response
+from server.query_stats import browse_query_stats
+from server.request import APIRequest
+from server.websocket import messaging
+
+from .models import BrowseRequestModel, BrowseResponseModel
+from .query import build_filters, build_query, build_source, encode_cursor, get_order
+from .totals import Totals
+
+# The following columns will be appended to the result
+# regardless the view configuration (needed for UI)
+
+REQUIRED_COLUMNS = [
+    "id",
+    "id_folder",
+    "title",
+    "subtitle",
+    "status",
+    "content_type",
+    "media_type",
+    "ctime",
+    "mtime",
+    "video/fps_f",
+    "subclips",
+]
+
+# Number of rows fetched from the database cursor at once when streaming
+STREAM_PREFETCH = 500
+
+
+def build_row(record, projection: list[str]) -> dict[str, Any]:
+    # Projected values follow the id, sort_value and score columns
+    row = {}
+    for i, column in enumerate(projection, 3):
+        if (value := record[i]) is not None:
+            row[column] = value
+    if record["score"] is not None:
+        row["score"] = record["score"]
+    return row
+
+
+class Request(APIRequest):
+    """Browse the assets database."""
+
+    name: str = "browse"
+    response_model = BrowseResponseModel
+
+    async def handle(
+        self,
+        request: BrowseRequestModel,
+        user: CurrentUser,
+    ) -> BrowseResponseModel | StreamingResponse:
+
+        columns: list[str] = ["title", "duration"]
+        if request.view is not None and not request.columns:
+            assert type(request.view) is int, "View must be an integer"
+            if (view := nebula.settings.get_view(request.view)) is not None:
+                if view.columns is not None:
+                    columns = view.columns
+        elif request.columns:
+            columns = request.columns
+
+        all_columns = set(REQUIRED_COLUMNS + columns)
+        if "duration" in all_columns:
+            all_columns.add("mark_in")
+            all_columns.add("mark_out")
+        projection = sorted(all_columns)
+
+        filters = build_filters(request, user)
+        query, args = build_query(request, projection, filters)
+
+        # In the streaming mode, rows are sent as newline-delimited JSON
+        # while the database cursor is consumed.
+
+        if request.stream:
+            if request.count or request.facets:
+                raise nebula.BadRequestException(
+                    "Totals and facets are not available in the streaming mode"
+                )
+
+            async def rows():
+                async for record in nebula.db.readonly.stream(
+                    query, *args, prefetch=STREAM_PREFETCH
+                ):
+                    yield build_row(record, projection)
+
+            return ndjson_response(rows())
+
+        # Totals and facets are computed concurrently with the main query
+
+        search_join, cond_list, params = filters
+        totals: Totals | None = None
+        if request.count or request.facets:
+            totals = Totals(
+                build_source(search_join, cond_list),
+                params.values,
+                request.count,
+                request.facets,
+            )
+
+        # Results are cached only while the messaging loop
+        # (which invalidates the cache) is running. Offset pages are not
+        # cached: a change on a previous page shifts them without touching
+        # any of their rows.
+
+        use_cache = (
+            browse_cache.enabled
+            and messaging.is_running
+            and (request.cursor is not None or not request.offset)
+        )
+        if use_cache and (cached := await browse_cache.get(query, args)):
+            records, cursor = cached
+        else:
+            generation = browse_cache.generation
+            records, cursor = await self.fetch(request, query, args, projection)
+            if use_cache:
+                # The filters restricted to IDs passed as the last argument
+                check_params = params.copy()
+                ids_param = check_params.add([], "INTEGER[]")
+                check = build_source(
+                    search_join,
+                    [*cond_list, f"assets.id = ANY({ids_param})"],
+                )
+                ids = [row["id"] for row in records]
+                browse_cache.put(
+                    query, args, check, params.values, records, cursor, ids, generation
+                )
+
+        return BrowseResponseModel(
+            columns=columns,
+            data=records,
+            order_by=request.order_by,
+            order_dir=request.order_dir,
+            cursor=cursor,
+            **(await totals.result() if totals else {}),
+        )
+
+    async def fetch(
+        self,
+        request: BrowseRequestModel,
+        query: str,
+        args: list[Any],
+        projection: list[str],
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """Return rows of the query and a cursor of the next page"""
+        order_by, _ = get_order(request, projection)
+        cursor: str | None = None
+        records = []
+        start_time = time.monotonic()
+        async for record in nebula.db.readonly.iterate(query, *args):
+            cursor = encode_cursor(order_by, record["sort_value"], record["id"])
+            records.append(build_row(record, projection))
+        browse_query_stats.record(
+            query,
+            time.monotonic() - start_time,
+            label=f"view {request.view}",
+        )
+        return records, cursor if len(records) == request.limit else None
@@ -0,0 +1,122 @@
+from typing import Any, Literal
+
+from pydantic import Field
+
+from server.models import RequestModel, ResponseModel
+
+OrderDirection = Literal["asc", "desc"]
+ConditionOperator = Literal[
+    "=", "LIKE", "ILIKE", "IN", "NOT IN", "IS NULL", "IS NOT NULL", ">", ">=", "<", "<="
+]
+
+
+class ConditionModel(RequestModel):
+    key: str = Field(..., example="status")
+    value: Any = Field(None, example=1)
+    operator: str = Field("=", example="=")
+
+
+class BrowseRequestModel(RequestModel):
+    view: int | None = Field(
+        None,
+        title="View ID",
+        example=1,
+    )
+    query: str | None = Field(
+        None,
+        title="Search query",
+        example="star trek",
+    )
+    conditions: list[ConditionModel] | None = Field(
+        default_factory=list,
+        title="Conditions",
+        description="List of additional conditions",
+        example=[
+            {"key": "id_folder", "value": 1, "operator": "="},
+        ],
+    )
+    columns: list[str] | None = Field(
+        None,
+        title="Columns",
+        description="Override the view columns."
+        "Note that several columns are always included.",
+        example=["title", "subtitle", "id_folder"],
+    )
+    ignore_view_conditions: bool = Field(False, title="Ignore view conditions")
+    limit: int = Field(500, title="Limit", description="Maximum number of items")
+    offset: int = Field(
+        0,
+        title="Offset",
+        description="Offset. Ignored when a cursor is provided",
+    )
+    cursor: str | None = Field(
+        None,
+        title="Cursor",
+        description="Return the page following the one the cursor was "
+        "returned with. Much faster than offset for deep pages.",
+    )
+    order_by: str | None = Field(
+        "ctime",
+        title="Order by",
+        description="Metadata key to order by. Use 'relevance' to order "
+        "results of a fulltext search by their score",
+    )
+    order_dir: OrderDirection = Field("desc", title="Order direction")
+    count: bool = Field(
+        False,
+        title="Count",
+        description="Return the total number of matching assets",
+    )
+    facets: list[str] = Field(
+        default_factory=list,
+        title="Facets",
+        description="Return numbers of matching assets per value of these keys",
+        example=["id_folder", "status"],
+    )
+    stream: bool = Field(
+        False,
+        title="Stream",
+        description="Stream matching rows as newline-delimited JSON "
+        "(application/x-ndjson) instead of returning a response object. "
+        "Cannot be combined with count and facets",
+    )
+
+
+class BrowseResponseModel(ResponseModel):
+    columns: list[str] = Field(default_factory=list)
+    data: list[dict[str, Any]] = Field(
+        default_factory=list,
+        description="Matching assets. When searching, each row contains "
+        "its relevance 'score' as well",
+        example=[
+            {
+                "id": 1,
+                "title": "Star Trek IV",
+                "subtitle": "The Voyage Home",
+                "id_folder": 1,
+                "status": 1,
+                "duration": 6124.3,
+            }
+        ],
+    )
+    order_by: str | None = Field(None)
+    order_dir: OrderDirection = Field(None)
+    cursor: str | None = Field(
+        None,
+        description="Cursor of the next page. Null when there are no more rows",
+    )
+    total: int | None = Field(
+        None,
+        description="Total number of matching assets (if requested)",
+        example=12000,
+    )
+    total_exact: bool | None = Field(
+        None,
+        description="False when the total is a planner estimate",
+    )
+    facets: dict[str, dict[str, int]] | None = Field(
+        None,
+        description="Numbers of matching assets per value of the requested keys. "
+        "Facets which could not be computed in time are omitted.",
+        example={"id_folder": {"1": 8500, "2": 3500}},
+    )
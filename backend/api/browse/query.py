@@ -0,0 +1,416 @@
+import base64
+import binascii
+from decimal import Decimal, InvalidOperation
+from typing import Any
+
+import orjson
+
+import nebula
+from nebula.exceptions import BadRequestException, NebulaException
+from nebula.helpers.views import is_materialized
+from nebula.metadata.indexes import meta_cast, meta_expression
+from nebula.metadata.normalize import normalize_meta
+from nebula.search import build_search_query, search_terms
+
+from .models import BrowseRequestModel, ConditionModel, OrderDirection
+
+RANGE_OPERATORS = [">", ">=", "<", "<="]
+
+# Order by the fulltext search score
+RELEVANCE = "relevance"
+
+
+class QueryParams:
+    """Bind parameters of a query being compiled.
+
+    Values are never inlined in the SQL. Instead, `add` returns
+    a placeholder of the value, so queries differing only in values
+    share the same SQL text (shape). Postgres parses and plans each
+    shape once per connection and asyncpg reuses its prepared statement.
+    """
+
+    def __init__(self, values: list[Any] | None = None) -> None:
+        self.values: list[Any] = values or []
+
+    def add(self, value: Any, cast: str | None = None) -> str:
+        self.values.append(value)
+        if cast is None:
+            return f"${len(self.values)}"
+        return f"${len(self.values)}::{cast}"
+
+    def copy(self) -> "QueryParams":
+        return QueryParams(list(self.values))
+
+
+def sanitize_value(value: Any) -> Any:
+    if type(value) is str:
+        value = value.replace("'", "''")
+    return str(value)
+
+
+def parse_number(value: Any) -> int | Decimal:
+    try:
+        number = Decimal(str(value))
+    except InvalidOperation:
+        raise BadRequestException(f"Value {value} is not a number")
+    if not number.is_finite():
+        raise BadRequestException(f"Value {value} is not a number")
+    if number == number.to_integral_value():
+        return int(number)
+    return number
+
+
+def key_expression(key: str, typed: bool = False) -> str:
+    """Return a SQL expression of the given asset metadata key.
+
+    Typed expressions use database columns directly and match
+    expression indexes of indexed metatypes.
+    """
+    if not typed:
+        return f"meta->>'{key}'"
+    if key in nebula.Asset.db_columns:
+        return key
+    return meta_expression(key, nebula.settings.metatypes[key].metaclass)
+
+
+def number_cast(key: str, values: list[int | Decimal]) -> str:
+    """Return a SQL type numbers are compared with a typed key expression as.
+
+    Integer columns and keys are compared with integers, so their indexes
+    are used. Comparing them with fractions requires numeric parameters.
+    """
+    if key in nebula.Asset.db_columns:
+        cast = "INTEGER"
+    else:
+        cast = meta_cast(nebula.settings.metatypes[key].metaclass) or "NUMERIC"
+    if cast == "INTEGER" and not all(type(v) is int for v in values):
+        return "NUMERIC"
+    return cast
+
+
+def build_conditions(
+    conditions: list[ConditionModel],
+    params: QueryParams,
+) -> list[str]:
+    cond_list: list[str] = []
+    for condition in conditions:
+        assert (
+            condition.key in nebula.settings.metatypes
+        ), f"Invalid meta key {condition.key}"
+        if condition.operator in ["IN", "NOT IN"]:
+            assert type(condition.value) is list, "Value must be a list"
+            condition.value = [
+                normalize_meta(condition.key, value) for value in condition.value
+            ]
+        else:
+            condition.value = normalize_meta(condition.key, condition.value)
+        meta_type = nebula.settings.metatypes[condition.key]
+
+        # Numeric values are compared as numbers when the comparison may use
+        # an index or when comparing them as strings would be wrong.
+        typed = meta_cast(meta_type.metaclass) is not None and (
+            meta_type.index
+            or condition.key in nebula.Asset.db_columns
+            or condition.operator in RANGE_OPERATORS
+        )
+        if condition.operator in ["LIKE", "ILIKE"]:
+            typed = False
+        key = key_expression(condition.key, typed=typed)
+
+        # Lists are passed as a single array parameter,
+        # so the query shape does not depend on their length
+
+        if condition.operator in ["IN", "NOT IN"]:
+            values: list[int | Decimal] | list[str]
+            if typed:
+                numbers = [parse_number(v) for v in condition.value]
+                cast = number_cast(condition.key, numbers) + "[]"
+                values = numbers
+            else:
+                values = [str(v) for v in condition.value]
+                cast = "TEXT[]"
+            if condition.operator == "IN":
+                cond_list.append(f"{key} = ANY({params.add(values, cast)})")
+            else:
+                cond_list.append(f"{key} <> ALL({params.add(values, cast)})")
+        elif condition.operator in ["IS NULL", "IS NOT NULL"]:
+            cond_list.append(f"{key} {condition.operator}")
+        elif typed:
+            number = parse_number(condition.value)
+            cast = number_cast(condition.key, [number])
+            cond_list.append(f"{key} {condition.operator} {params.add(number, cast)}")
+        else:
+            text = str(condition.value)
+            assert text, "Value must not be empty"
+            cond_list.append(f"{key} {condition.operator} {params.add(text, 'TEXT')}")
+    return cond_list
+
+
+def process_inline_conditions(request: BrowseRequestModel):
+    if request.query:
+        query_elements = request.query.split(" ")
+        reduced_query = []
+        for element in query_elements:
+            if ":" in element:
+                key, value = element.split(":", 1)
+                if key and value:
+                    if request.conditions is None:
+                        request.conditions = []
+                    request.conditions.append(
+                        ConditionModel(key=key, value=value, operator="LIKE")
+                    )
+            else:
+                reduced_query.append(element)
+        request.query = " ".join(reduced_query)
+
+
+def build_order(order_by: str) -> str:
+    # Select the key to order by
+    # Ensure the key is in the columns list
+    # This effectively prevents SQL injections
+
+    # By default try to sort by database columns,
+    # since they are indexed and faster. It the user
+    # wants to sort by a key which is not a database
+    # column, we need to sort by the JSONB key, using
+    # the same expression as its index (if indexed)
+
+    if order_by in nebula.Asset.db_columns:
+        return order_by
+    if order_by not in nebula.settings.metatypes:
+        return f"meta->>'{sanitize_value(order_by)}'"
+    return key_expression(order_by, typed=True)
+
+
+def is_numeric_order(order_by: str) -> bool:
+    if order_by == RELEVANCE or order_by in nebula.Asset.db_columns:
+        return True
+    if (meta_type := nebula.settings.metatypes.get(order_by)) is None:
+        return False
+    return meta_cast(meta_type.metaclass) is not None
+
+
+def encode_cursor(order_by: str, value: Any, id: int) -> str:
+    """Return an opaque cursor pointing after the given row."""
+    if isinstance(value, Decimal):
+        value = str(value)
+    payload = orjson.dumps([order_by, value, id])
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+
+def decode_cursor(cursor: str, order_by: str) -> tuple[Any, int]:
+    """Return the sort value and ID of the row the cursor points after."""
+    try:
+        cursor_order_by, value, id = orjson.loads(base64.urlsafe_b64decode(cursor))
+        assert type(id) is int
+    except (binascii.Error, orjson.JSONDecodeError, ValueError, AssertionError):
+        raise BadRequestException("Invalid cursor")
+    if cursor_order_by != order_by:
+        raise BadRequestException("Cursor does not match the requested order")
+    return value, id
+
+
+def build_seek_condition(
+    cursor: str,
+    order_by: str,
+    order_expr: str,
+    order_dir: OrderDirection,
+    params: QueryParams,
+) -> str:
+    """Return a condition selecting rows following the cursor.
+
+    Rows are ordered by (order_expr, id). Postgres puts NULL values
+    first when sorting in the descending order and last otherwise.
+    """
+    value, id = decode_cursor(cursor, order_by)
+    op = "<" if order_dir == "desc" else ">"
+
+    if value is None:
+        id_param = params.add(id, "INTEGER")
+        if order_dir == "desc":
+            return (
+                f"(({order_expr} IS NULL AND id < {id_param}) "
+                f"OR {order_expr} IS NOT NULL)"
+            )
+        return f"({order_expr} IS NULL AND id > {id_param})"
+
+    if order_by == RELEVANCE:
+        value_param = params.add(parse_cursor_number(value), "BIGINT")
+    elif is_numeric_order(order_by):
+        number = parse_cursor_number(value)
+        value_param = params.add(number, number_cast(order_by, [number]))
+    else:
+        value_param = params.add(str(value), "TEXT")
+
+    seek = f"({order_expr}, id) {op} ({value_param}, {params.add(id, 'INTEGER')})"
+    if order_dir == "asc":
+        return f"({seek} OR {order_expr} IS NULL)"
+    return seek
+
+
+def parse_cursor_number(value: Any) -> int | Decimal:
+    try:
+        return parse_number(value)
+    except BadRequestException:
+        raise BadRequestException("Invalid cursor")
+
+
+def get_order(request: BrowseRequestModel, columns: list[str]) -> tuple[str, str]:
+    """Return the key and SQL expression the results are ordered by."""
+    if request.order_by == RELEVANCE and request.query:
+        if search_terms(request.query):
+            return RELEVANCE, "score"
+    if request.order_by in list(columns) + ["ctime"]:
+        order_by = request.order_by
+    else:
+        order_by = "ctime"
+    return order_by, build_order(order_by)
+
+
+Filters = tuple[str, list[str], QueryParams]
+
+
+def build_filters(
+    request: BrowseRequestModel,
+    user: nebula.User,
+) -> Filters:
+    """Return a fulltext join clause, conditions and their parameters.
+
+    Inline conditions are moved from the query to the request conditions,
+    so this function must be called only once per request.
+    """
+    cond_list: list[str] = []
+    params = QueryParams()
+
+    if request.view is None:
+        try:
+            request.view = nebula.settings.views[0]
+        except IndexError:
+            raise NebulaException("No views defined")
+
+    # Process views
+
+    if request.view is not None and not request.ignore_view_conditions:
+        assert type(request.view) is int, "View must be an integer"
+        view = nebula.settings.get_view(request.view)
+        if view is not None and is_materialized(view):
+            # Members of the view are precomputed (see nebula.helpers.views)
+            cond_list.append(
+                f"id IN (SELECT id_asset FROM view_members WHERE id_view = {view.id})"
+            )
+
+        elif view is not None:
+            if view.folders:
+                folders = params.add(view.folders, "INTEGER[]")
+                cond_list.append(f"id_folder = ANY({folders})")
+
+            if view.states:
+                states = params.add(view.states, "INTEGER[]")
+                cond_list.append(f"status = ANY({states})")
+
+            if view.conditions:
+                cond_list.extend(view.conditions)
+
+    process_inline_conditions(request)
+
+    if request.conditions:
+        cond_list.extend(build_conditions(request.conditions, params))
+
+    # Process full text
+    # Matching assets are joined with their score
+
+    search_join = ""
+    if request.query and (terms := search_terms(request.query)):
+        search_query = build_search_query(terms, "asset", bind=params.add)
+        search_join = f"""
+            JOIN ({search_query}) AS search(search_id, score)
+            ON search.search_id = assets.id
+            """
+
+    # Access control
+    # User specific values are parameters as well, so users share query shapes
+
+    if user.is_limited:
+        c1 = f"meta->>'created_by' = {params.add(str(user.id), 'TEXT')}"
+        c2 = f"meta->'assignees' @> {params.add([user.id], 'JSONB')}"
+        cond_list.append(f"({c1} OR {c2})")
+
+    if can_view := user["can/asset_view"]:
+        if type(can_view) is list:
+            folders = params.add(can_view, "INTEGER[]")
+            cond_list.append(f"id_folder = ANY({folders})")
+
+    return search_join, cond_list, params
+
+
+def build_source(search_join: str, cond_list: list[str]) -> str:
+    """Return FROM and WHERE clauses of a query"""
+    if cond_list:
+        conds = "WHERE " + " AND ".join(cond_list)
+    else:
+        conds = ""
+    return f"FROM assets {search_join} {conds}"
+
+
+def build_projection(columns: list[str]) -> str:
+    """Return a select list of the given metadata keys.
+
+    Only the requested keys are transferred and decoded, not the whole
+    metadata. Values are returned as columns m0, m1... in the order
+    of the given keys (NULL when the key is not set). Only known metadata
+    keys may be selected, so no SQL injection is possible.
+    """
+    for column in columns:
+        if column not in nebula.settings.metatypes:
+            raise BadRequestException(f"Invalid column {column}")
+    return ", ".join(f"meta->'{column}' AS m{i}" for i, column in enumerate(columns))
+
+
+def build_query(
+    request: BrowseRequestModel,
+    columns: list[str],
+    filters: Filters,
+) -> tuple[str, list[Any]]:
+    """Return the browse query and its arguments.
+
+    The limit is a part of the query shape, since clients use the same
+    page size, while offsets and cursors are parameters.
+    """
+    search_join, cond_list, params = filters
+    cond_list = list(cond_list)
+    params = params.copy()
+
+    # Seek to the position of the cursor
+
+    order_by, order_expr = get_order(request, columns)
+    if request.cursor:
+        cond_list.append(
+            build_seek_condition(
+                request.cursor,
+                order_by,
+                order_expr,
+                request.order_dir,
+                params,
+            )
+        )
+
+    # Build order
+    # Rows with equal sort values are ordered by ID to keep the pages stable
+
+    order = f"{order_expr} {request.order_dir}, id {request.order_dir}"
+
+    # Build query
+
+    offset = params.add(0 if request.cursor else request.offset, "INTEGER")
+    query = f"""
+        SELECT
+            id,
+            {order_expr} AS sort_value,
+            {'score' if search_join else 'NULL AS score'},
+            {build_projection(columns)}
+        {build_source(search_join, cond_list)}
+        ORDER BY {order}
+        LIMIT {int(request.limit)}
+        OFFSET {offset}
+    """
+    return query, params.values
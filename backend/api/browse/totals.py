@@ -0,0 +1,151 @@
+import asyncio
+import time
+from typing import Any
+
+import nebula
+from nebula.common import json_loads
+from nebula.metadata.indexes import meta_cast
+from server.background_queries import background_queries
+from server.query_stats import browse_query_stats
+
+from .query import key_expression
+
+# Maximum number of values returned per facet
+FACET_SIZE = 100
+
+# Maximum number of cached queries
+CACHE_SIZE = 1000
+
+
+class TotalsCache:
+    """Short-lived cache of browse totals and facets.
+
+    Keyed by the SQL query and arguments the value was computed from. Counts
+    are approximate by nature, so entries are not invalidated
+    on changes, they just expire.
+    """
+
+    def __init__(self) -> None:
+        self.data: dict[tuple[str, str], tuple[float, Any]] = {}
+
+    def get(self, key: tuple[str, str]) -> Any:
+        if (entry := self.data.get(key)) is None:
+            return None
+        timestamp, value = entry
+        if time.monotonic() - timestamp > nebula.config.browse_totals_ttl:
+            del self.data[key]
+            return None
+        return value
+
+    def put(self, key: tuple[str, str], value: Any) -> None:
+        now = time.monotonic()
+        ttl = nebula.config.browse_totals_ttl
+        self.data = {k: v for k, v in self.data.items() if now - v[0] <= ttl}
+        self.data[key] = (now, value)
+        while len(self.data) > CACHE_SIZE:
+            del self.data[next(iter(self.data))]
+
+
+totals_cache = TotalsCache()
+
+
+async def cached_fetch(query: str, args: list[Any]) -> list[Any]:
+    key = (query, repr(args))
+    if (result := totals_cache.get(key)) is not None:
+        return result
+    async with background_queries.semaphore:
+        start_time = time.monotonic()
+        res = await nebula.db.readonly.fetch(
+            query,
+            *args,
+            timeout=nebula.config.browse_totals_timeout,
+        )
+        browse_query_stats.record(query, time.monotonic() - start_time)
+    result = [tuple(row) for row in res]
+    totals_cache.put(key, result)
+    return result
+
+
+async def count_assets(source: str, args: list[Any]) -> tuple[int, bool]:
+    """Return a number of matching assets and whether it is exact.
+
+    Counting is stopped at `browse_count_limit`. Larger results
+    are estimated using the query planner.
+    """
+    limit = nebula.config.browse_count_limit
+    query = f"SELECT COUNT(*) FROM (SELECT 1 {source} LIMIT {limit + 1}) AS matches"
+    result = await cached_fetch(query, args)
+    if (total := result[0][0]) <= limit:
+        return total, True
+
+    result = await cached_fetch(f"EXPLAIN (FORMAT JSON) SELECT 1 {source}", args)
+    plan = json_loads(result[0][0])
+    estimate = int(plan[0]["Plan"]["Plan Rows"])
+    return max(estimate, limit + 1), False
+
+
+async def count_values(source: str, args: list[Any], key: str) -> dict[str, int]:
+    """Return the most frequent values of a key and their counts."""
+    metaclass = nebula.settings.metatypes[key].metaclass
+    expression = key_expression(key, typed=meta_cast(metaclass) is not None)
+    query = f"""
+        SELECT {expression} AS value, COUNT(*) AS count {source}
+        GROUP BY 1 ORDER BY 2 DESC LIMIT {FACET_SIZE}
+        """
+    result = await cached_fetch(query, args)
+    return {str(value): count for value, count in result if value is not None}
+
+
+class Totals:
+    """Totals and facets computed alongside the main browse query.
+
+    Queries are started immediately and the results are collected by
+    `result` once the main query is done. It waits no longer than the main
+    query took, and at most until the latency budget (counted from the
+    start) is exhausted, so the totals do not add much to the response
+    time. Results not ready by then are omitted.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        args: list[Any],
+        count: bool,
+        facets: list[str],
+    ) -> None:
+        for key in facets:
+            if key not in nebula.settings.metatypes:
+                raise nebula.BadRequestException(f"Invalid facet key {key}")
+        self.start_time = time.monotonic()
+        self.deadline = self.start_time + nebula.config.browse_totals_budget
+        self.count_task = (
+            background_queries.start(count_assets(source, args)) if count else None
+        )
+        self.facet_tasks = {
+            key: background_queries.start(count_values(source, args, key))
+            for key in facets
+        }
+
+    async def wait(self, task: asyncio.Task, deadline: float) -> Any:
+        timeout = max(0, deadline - time.monotonic())
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            return None
+        except Exception:
+            nebula.log.traceback("Unable to compute browse totals")
+            return None
+
+    async def result(self) -> dict[str, Any]:
+        now = time.monotonic()
+        deadline = min(self.deadline, now + (now - self.start_time))
+        result: dict[str, Any] = {}
+        if self.count_task is not None:
+            if (total := await self.wait(self.count_task, deadline)) is not None:
+                result["total"], result["total_exact"] = total
+        if self.facet_tasks:
+            result["facets"] = {}
+            for key, task in self.facet_tasks.items():
+                if (values := await self.wait(task, deadline)) is not None:
+                    result["facets"][key] = values
+        return result
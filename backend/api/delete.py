@@ -4,6 +4,7 @@ from pydantic import Field
 import nebula
 from nebula.enum import ObjectType
 from nebula.helpers.scheduling import bin_refresh
+from nebula.objects.base import transaction
 from nebula.objects.utils import get_object_class_by_name
 from server.dependencies import CurrentUser, RequestInitiator
 from server.models import RequestModel
@@ -72,9 +73,30 @@ class Request(APIRequest):
                     f"Deleting {request.obejct_type} is not implemented"
                 )
 
+        cls = get_object_class_by_name(request.object_type)
+
+        if request.object_type in [ObjectType.ASSET, ObjectType.EVENT]:
+            # Delete all objects (and their children) in a single transaction
+            # and send a single notification. Nothing is deleted when some
+            # of the objects do not exist.
+            async with transaction() as conn:
+                deleted = await cls.delete_many(
+                    request.ids, connection=conn, notify=False
+                )
+                if missing := [id for id in request.ids if id not in deleted]:
+                    raise nebula.NotFoundException(
+                        f"{cls.object_type.capitalize()} ID {missing[0]} not found"
+                    )
+            await nebula.msg(
+                "objects_changed",
+                object_type=cls.object_type,
+                objects=deleted,
+                initiator=initiator,
+            )
+            return Response(status_code=204)
+
         # Delete simple objects
 
-        cls = get_object_class_by_name(request.object_type)
         for id_object in request.ids:
             obj = await cls.load(id_object)
             try:
@@ -1,11 +1,13 @@
 from typing import Any
 
+from fastapi.responses import StreamingResponse
 from pydantic import Field
 
 import nebula
 from nebula.enum import ObjectType
 from server.dependencies import CurrentUser
 from server.models import RequestModel, ResponseModel
+from server.ndjson import ndjson_response
 from server.request import APIRequest
 
 
@@ -22,6 +24,27 @@ class GetRequestModel(RequestModel):
         description="List of object IDs to retrieve",
         example=[1, 2, 3],
     )
+    stream: bool = Field(
+        False,
+        title="Stream",
+        description="Stream objects as newline-delimited JSON "
+        "(application/x-ndjson) instead of returning a response object. "
+        "Objects the user is not allowed to access and unmodified objects "
+        "are omitted",
+    )
+    known_versions: dict[int, str] = Field(
+        default_factory=dict,
+        title="Known versions",
+        description="Versions of the requested objects the client already has. "
+        "Objects which were not modified since are not returned.",
+        example={1: "1680000000.123", 2: "1680000042.5"},
+    )
+    fields: list[str] | None = Field(
+        None,
+        title="Fields",
+        description="Return only these metadata keys (and the ID)",
+        example=["title", "subtitle", "status"],
+    )
 
 
 class GetResponseModel(ResponseModel):
@@ -35,6 +58,59 @@ class GetResponseModel(ResponseModel):
             {"id": 3, "title": "Third movie"},
         ],
     )
+    versions: dict[int, str] = Field(
+        default_factory=dict,
+        title="Versions",
+        description="Versions of the returned objects. "
+        "Pass them as known_versions to the following requests.",
+        example={1: "1680000000.123", 2: "1680000042.5", 3: "1680000099.1"},
+    )
+    not_modified: list[int] = Field(
+        default_factory=list,
+        title="Not modified",
+        description="IDs of objects matching their known version",
+        example=[],
+    )
+
+
+# Number of rows fetched from the database cursor at once when streaming
+STREAM_PREFETCH = 500
+
+# Metadata keys used by can_access_object
+ACL_KEYS = ["assignees", "created_by", "id_folder", "login"]
+
+
+def build_query(object_type_name: str, fields: list[str] | None) -> str:
+    """Return a query of the requested objects.
+
+    Query arguments are object IDs, IDs and versions of the objects the client
+    has, and the requested fields. The version of an object is its mtime.
+    Metadata of objects matching the known version is not transferred
+    (meta is NULL) and only the requested fields of the rest are.
+    """
+    if fields is None:
+        payload = "o.meta"
+    else:
+        payload = """COALESCE(
+            (SELECT jsonb_object_agg(key, value)
+            FROM jsonb_each(o.meta) WHERE key = ANY($4::TEXT[])),
+            '{}'::JSONB
+        )"""
+    acl = ", ".join(f"'{key}', o.meta->'{key}'" for key in ACL_KEYS)
+    return f"""
+        SELECT
+            o.id,
+            o.meta->>'mtime' AS version,
+            jsonb_strip_nulls(jsonb_build_object({acl})) AS acl,
+            CASE
+                WHEN known.version = o.meta->>'mtime' THEN NULL
+                ELSE {payload}
+            END AS meta
+        FROM {object_type_name}s AS o
+        LEFT JOIN unnest($2::INTEGER[], $3::TEXT[]) AS known(id, version)
+        ON known.id = o.id
+        WHERE o.id = ANY($1::INTEGER[])
+        """
 
 
 def can_access_object(user: nebula.User, meta: dict[str, Any]) -> bool:
@@ -70,17 +146,50 @@ class Request(APIRequest):
         self,
         request: GetRequestModel,
         user: CurrentUser,
-    ) -> GetResponseModel:
+    ) -> GetResponseModel | StreamingResponse:
 
         object_type_name = request.object_type.value
-        query = f"SELECT meta FROM {object_type_name}s WHERE id = ANY($1)"
+        query = build_query(object_type_name, request.fields)
+        args = [
+            request.ids,
+            list(request.known_versions.keys()),
+            list(request.known_versions.values()),
+        ]
+        if request.fields is not None:
+            args.append(list({"id", *request.fields}))
+
+        if request.stream:
+            # The response status is sent before the first row,
+            # so inaccessible objects cannot fail the request.
+
+            async def rows():
+                async for row in nebula.db.readonly.stream(
+                    query, *args, prefetch=STREAM_PREFETCH
+                ):
+                    if row["meta"] is None:
+                        continue
+                    if can_access_object(user, row["acl"]):
+                        yield row["meta"]
+
+            return ndjson_response(rows())
 
         data = []
-        async for row in nebula.db.iterate(query, request.ids):
-            if not can_access_object(user, row["meta"]):
+        versions: dict[int, str] = {}
+        not_modified: list[int] = []
+        async for row in nebula.db.readonly.iterate(query, *args):
+            if not can_access_object(user, row["acl"]):
                 raise nebula.ForbiddenException(
                     "You are not allowed to access this object"
                 )
+            if row["meta"] is None:
+                not_modified.append(row["id"])
+                continue
             data.append(row["meta"])
-
-        return GetResponseModel(data=data)
+            if row["version"] is not None:
+                versions[row["id"]] = row["version"]
+
+        return GetResponseModel(
+            data=data,
+            versions=versions,
+            not_modified=not_modified,
+        )
@@ -44,6 +44,7 @@ class ActionsRequest(APIRequest):
     ) -> ActionsResponseModel:
 
         result = []
+        assets: list[nebula.Asset] | None = None
 
         query = """
             SELECT id, service_type, title, settings
@@ -61,9 +62,15 @@ class ActionsRequest(APIRequest):
             if allow_if_elm := action_settings.findall("allow_if"):
                 allow_if_cond = allow_if_elm[0].text
 
-                for id_asset in request.ids:
-                    asset = await nebula.Asset.load(id_asset)
-                    assert asset
+                if assets is None:
+                    # Loaded once, when the first condition is evaluated
+                    assets = await nebula.Asset.load_many(request.ids)
+                    if len(assets) != len(set(request.ids)):
+                        raise nebula.NotFoundException(
+                            "Some of the requested assets do not exist"
+                        )
+
+                for asset in assets:
                     if not eval(allow_if_cond):
                         break
                 else:
@@ -2,11 +2,11 @@ import time
 from typing import Literal
 
 from fastapi import Response
-from nxtools import slugify
 from pydantic import Field
 
 import nebula
 from nebula.enum import JobState
+from nebula.search import build_search_query, search_terms
 from server.dependencies import CurrentUser
 from server.models import RequestModel, ResponseModel
 from server.request import APIRequest
@@ -206,9 +206,11 @@ class JobsRequest(APIRequest):
         # Return a list of jobs if requested
 
         conds = []
-        if request.search_query:
-            for elm in slugify(request.search_query, make_set=True):
-                conds.append(f"a.id IN (SELECT id FROM ft WHERE value LIKE '{elm}%')")
+        if request.search_query and (
+            terms := search_terms(request.search_query, min_length=1)
+        ):
+            search_query = build_search_query(terms, "asset")
+            conds.append(f"a.id IN (SELECT id FROM ({search_query}) AS search)")
 
         if user.is_limited:
             conds.append(
@@ -273,7 +275,7 @@ class JobsRequest(APIRequest):
         """
 
         jobs = []
-        async for row in nebula.db.iterate(query):
+        async for row in nebula.db.readonly.iterate(query):
             asset_name = row["asset_title"]
             if subtitle := row["asset_subtitle"]:
                 separator = nebula.settings.system.subtitle_separator
@@ -1,6 +1,7 @@
 import nebula
 from nebula.exceptions import NotFoundException
 from nebula.helpers.scheduling import can_append
+from nebula.objects.base import transaction
 
 from .models import OrderRequestModel, OrderResponseModel
 
@@ -17,11 +18,29 @@ async def set_rundown_order(
     order = request.order
 
     affected_bins: list[int] = [id_bin]
+    to_save: list[nebula.Item] = []
     pos = 1
 
     pool = await nebula.db.pool()
     async with pool.acquire() as conn:
-        async with conn.transaction():
+        async with transaction(conn):
+            # Preload all referenced items and assets at once
+
+            item_ids = [obj.id for obj in order if obj.type == "item" and obj.id]
+            asset_ids = [obj.id for obj in order if obj.type == "asset" and obj.id]
+            items = {
+                item.id: item
+                for item in await nebula.Item.load_many(
+                    item_ids, connection=conn, username=user.name
+                )
+            }
+            assets = {
+                asset.id: asset
+                for asset in await nebula.Asset.load_many(
+                    asset_ids, connection=conn, username=user.name
+                )
+            }
+
             for i, obj in enumerate(order):
                 item: nebula.Item | None = None
 
@@ -41,10 +60,8 @@ async def set_rundown_order(
                         item["id_bin"] = id_bin
                     else:
                         # Moving an existing item
-                        item = await nebula.Item.load(
-                            obj.id, connection=conn, username=user.name
-                        )
-                        assert item is not None
+                        if (item := items.get(obj.id)) is None:
+                            raise NotFoundException(f"Item ID {obj.id} not found")
 
                         if not item["id_bin"]:
                             nebula.log.error(
@@ -69,11 +86,7 @@ async def set_rundown_order(
                     assert (
                         obj.id is not None
                     ), "Asset ID must not be None when inserting asset to rundown"
-                    asset = await nebula.Asset.load(
-                        obj.id,
-                        connection=conn,
-                        username=user.name,
-                    )
+                    asset = assets.get(obj.id)
                     if not asset:
                         nebula.log.error(
                             f"Unable to append {obj.type} ID {obj.id}. "
@@ -114,10 +127,12 @@ async def set_rundown_order(
                     item["position"] = pos
                     item["id_bin"] = id_bin
 
-                    # save item, but don't send a notification just yet.
-                    # we'll send one notification for all items in the bin
                     item["updated_by"] = user.id
-                    await item.save(notify=False)
+                    to_save.append(item)
                 pos += 1
 
+            # save items, but don't send a notification just yet.
+            # we'll send one notification for all items in the bin
+            await nebula.Item.save_many(to_save, connection=conn, notify=False)
+
     return OrderResponseModel(affected_bins=affected_bins)
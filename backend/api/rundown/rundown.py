@@ -24,7 +24,7 @@ async def get_rundown(request: RundownRequestModel) -> RundownResponseModel:
     query = """
         SELECT
             e.id AS id_event,
-            e.meta AS emeta,
+            e.meta::text AS emeta,
             e.id_magic AS id_bin,
             i.id AS id_item,
             i.meta AS imeta,
@@ -49,20 +49,25 @@ async def get_rundown(request: RundownRequestModel) -> RundownResponseModel:
 
     rows: list[nebula.Event] = []
 
+    event: nebula.Event | None = None
     last_event = None
     ts_broadcast = ts_scheduled = 0.0
 
-    async for record in nebula.db.iterate(
+    async for record in nebula.db.readonly.iterate(
         query, request.id_channel, start_time, end_time
     ):
         id_event = record["id_event"]
         id_item = record["id_item"]
         id_bin = record["id_bin"]
-        emeta = record["emeta"] or {}
         imeta = record["imeta"] or {}
         ameta = record["ameta"] or {}
 
-        event = nebula.Event.from_meta(emeta)
+        if event is None or event.id != id_event:
+            # The event is repeated for each of its items, so its
+            # metadata is selected as text and decoded only once
+            event = nebula.Event.from_raw(record["emeta"], id=id_event)
+            emeta = event.meta
+
         item = nebula.Item.from_meta(imeta)
         if ameta:
             asset = nebula.Asset.from_meta(ameta)
@@ -1,5 +1,6 @@
 import nebula
 from nebula.helpers.scheduling import parse_rundown_date
+from nebula.objects.base import transaction
 from nebula.settings.models import PlayoutChannelSettings
 
 from .models import EventData, SchedulerRequestModel, SchedulerResponseModel
@@ -9,12 +10,16 @@ from .utils import delete_events, get_event_at_time, get_events_in_range
 async def create_new_event(
     channel: PlayoutChannelSettings,
     event_data: EventData,
+    assets: dict[int, nebula.Asset],
 ):
-    """Create a new event from the given data."""
+    """Create a new event from the given data.
+
+    `assets` are the preloaded assets of the scheduled events.
+    """
 
     pool = await nebula.db.pool()
     async with pool.acquire() as conn:
-        async with conn.transaction():
+        async with transaction(conn):
 
             new_bin = nebula.Bin(connection=conn)
             new_event = nebula.Event(connection=conn)
@@ -29,7 +34,10 @@ async def create_new_event(
             position = 0
             if event_data.id_asset:
 
-                asset = await nebula.Asset.load(event_data.id_asset, connection=conn)
+                if (asset := assets.get(event_data.id_asset)) is None:
+                    raise nebula.NotFoundException(
+                        f"Asset ID {event_data.id_asset} not found"
+                    )
 
                 new_event["id_asset"] = event_data.id_asset
 
@@ -46,17 +54,31 @@ async def create_new_event(
                 position += 1
 
             if event_data.items:
+                item_ids: list[int] = []
+                for item_data in event_data.items:
+                    if id_item := item_data.get("id"):
+                        if not isinstance(id_item, int):
+                            raise nebula.BadRequestException("Invalid item ID")
+                        item_ids.append(id_item)
+                items = {
+                    item.id: item
+                    for item in await nebula.Item.load_many(item_ids, connection=conn)
+                }
+                new_items: list[nebula.Item] = []
                 for item_data in event_data.items:
                     if item_data.get("id"):
-                        assert type(item_data["id"]) == int, "Invalid item ID"
-                        item = await nebula.Item.load(item_data["id"], connection=conn)
+                        if (item := items.get(item_data["id"])) is None:
+                            raise nebula.NotFoundException(
+                                f"Item ID {item_data['id']} not found"
+                            )
                     else:
                         item = nebula.Item(connection=conn)
                     item.update(item_data)
                     item["id_bin"] = new_bin.id
                     item["position"] = position
-                    await item.save()
+                    new_items.append(item)
                     position += 1
+                await nebula.Item.save_many(new_items, connection=conn)
 
             for field in channel.fields:
                 if (value := asset_meta.get(field.name)) is not None:
@@ -92,6 +114,14 @@ async def scheduler(
     affected_events: list[int] = []
     affected_bins: list[int] = []
 
+    # Preload assets of all events using a single query
+    assets = {
+        asset.id: asset
+        for asset in await nebula.Asset.load_many(
+            [e.id_asset for e in request.events if e.id_asset and editable]
+        )
+    }
+
     #
     # Delete events
     #
@@ -126,8 +156,10 @@ async def scheduler(
                     # Replace event with itself. This is a no-op.
                     continue
 
-                asset = await nebula.Asset.load(event_data.id_asset)
-                assert asset
+                if (asset := assets.get(event_data.id_asset)) is None:
+                    raise nebula.NotFoundException(
+                        f"Asset ID {event_data.id_asset} not found"
+                    )
 
                 # load the existing bin
                 ex_bin = await nebula.Bin.load(event_at_position["id_magic"])
@@ -182,7 +214,7 @@ async def scheduler(
 
         else:
             # create new event
-            await create_new_event(channel, event_data)
+            await create_new_event(channel, event_data, assets)
 
     # Return existing events
 
@@ -17,8 +17,8 @@ async def get_event_at_time(id_channel: int, timestamp: int) -> nebula.Event | N
         LIMIT 1
     """
 
-    async for record in nebula.db.iterate(query, id_channel, timestamp):
-        return nebula.Event.from_meta(record["meta"])
+    if record := await nebula.db.fetchrow(query, id_channel, timestamp):
+        return nebula.Event.from_row(record)
     return None
 
 
@@ -76,7 +76,7 @@ async def get_events_in_range(
     result = []
 
     # Last event before start_time
-    async for row in nebula.db.iterate(
+    async for row in nebula.db.readonly.iterate(
         """
         SELECT e.meta as emeta, o.meta as ometa FROM events AS e, bins AS o
         WHERE
@@ -93,7 +93,7 @@ async def get_events_in_range(
         result.append(nebula.Event.from_meta(rec))
 
     # Events between start_time and end_time
-    async for row in nebula.db.iterate(
+    async for row in nebula.db.readonly.iterate(
         """
         SELECT e.meta as emeta, o.meta as ometa FROM events AS e, bins AS o
         WHERE
@@ -7,6 +7,7 @@ import nebula
 from nebula.common import import_module
 from nebula.enum import ObjectType
 from nebula.helpers.scheduling import bin_refresh
+from nebula.objects.base import transaction
 from nebula.objects.utils import get_object_class_by_name
 from nebula.settings import load_settings
 from server.dependencies import CurrentUser
@@ -94,6 +95,14 @@ class OperationsRequestModel(RequestModel):
         title="Operations",
         description="List of operations to be executed",
     )
+    atomic: bool = Field(
+        False,
+        title="Atomic",
+        description="Execute all operations in a single transaction. "
+        "Either all of them succeed or none is applied. Much faster "
+        "for large batches, since the objects are loaded and saved at once "
+        "and a single change notification is sent per object type.",
+    )
 
 
 class OperationsResponseModel(ResponseModel):
@@ -156,6 +165,9 @@ class OperationsRequest(APIRequest):
     ) -> OperationsResponseModel:
         """Create or update multiple objects in one requests."""
 
+        if request.atomic:
+            return await self.handle_atomic(request, user)
+
         pool = await nebula.db.pool()
         result = []
         reload_settings = False
@@ -166,62 +178,18 @@ class OperationsRequest(APIRequest):
             op_id = operation.id
             try:
                 async with pool.acquire() as conn:
-                    async with conn.transaction():
+                    async with transaction(conn):
                         object_class = get_object_class_by_name(operation.object_type)
                         if operation.id is None:
-                            object = object_class(connection=conn, username=user.name)
-                            operation.data.pop("id", None)
-                            object["created_by"] = user.id
-                            object["updated_by"] = user.id
+                            object = self.create_object(object_class, conn, user)
                         else:
                             object = await object_class.load(
                                 operation.id,
                                 connection=conn,
                                 username=user.name,
                             )
-                            object["updated_by"] = user.id
-
-                        #
-                        # Modyfiing users
-                        #
-
-                        if isinstance(object, nebula.User):
-                            if not (user.is_admin or object.id == user.id):
-                                raise nebula.ForbiddenException(
-                                    "Unable to modify other users"
-                                )
-
-                            if not user.is_admin:
-                                for key in operation.data:
-                                    if key.startswith("can/") or key.startswith("is_"):
-                                        operation.data.pop(key, None)
-
-                            password = operation.data.pop("password", None)
-                            if password:
-                                object.set_password(password)
-
-                        #
-                        # ACL
-                        #
-
-                        await can_modify_object(object, user)
-
-                        #
-                        # Run validator
-                        #
-
-                        if validator := Validator.for_object(operation.object_type):
-                            try:
-                                await validator(
-                                    object,
-                                    operation.data,
-                                    connection=conn,
-                                    user=user,
-                                )
-                            except nebula.RequestSettingsReload:
-                                reload_settings = True
-                        else:
-                            object.update(operation.data)
+                        if await self.apply(operation, object, conn, user):
+                            reload_settings = True
                         await object.save()
                         if (
                             isinstance(object, nebula.Item)
@@ -252,6 +220,184 @@ class OperationsRequest(APIRequest):
         overall_success = all([x.success for x in result])
         return OperationsResponseModel(operations=result, success=overall_success)
 
+    async def handle_atomic(
+        self,
+        request: OperationsRequestModel,
+        user: CurrentUser,
+    ) -> OperationsResponseModel:
+        """Execute all operations in a single transaction.
+
+        Existing objects are loaded using one query per object type
+        and saved using `save_many`. Change notifications are sent
+        after the transaction is committed, one per object type.
+        """
+
+        reload_settings = False
+        objects: list[Any] = []
+        current: OperationModel | None = None
+        try:
+            async with transaction() as conn:
+                # Preload all referenced objects
+
+                ids: dict[ObjectType, list[int]] = {}
+                for operation in request.operations:
+                    if operation.id is not None:
+                        ids.setdefault(operation.object_type, []).append(operation.id)
+
+                loaded: dict[tuple[ObjectType, int], Any] = {}
+                for object_type, type_ids in ids.items():
+                    object_class = get_object_class_by_name(object_type)
+                    for object in await object_class.load_many(
+                        type_ids,
+                        connection=conn,
+                        username=user.name,
+                    ):
+                        loaded[(object_type, object.id)] = object
+
+                # Apply the operations. Operations with the same object
+                # modify the same instance.
+
+                for current in request.operations:
+                    object_class = get_object_class_by_name(current.object_type)
+                    if current.id is None:
+                        object = self.create_object(object_class, conn, user)
+                    else:
+                        object = loaded.get((current.object_type, current.id))
+                        if object is None:
+                            raise nebula.NotFoundException(
+                                f"{object_class.__name__} {current.id} not found"
+                            )
+                    if await self.apply(current, object, conn, user):
+                        reload_settings = True
+                    objects.append(object)
+                current = None
+
+                # Save all objects of each type at once
+
+                by_type: dict[ObjectType, list[Any]] = {}
+                for operation, object in zip(request.operations, objects):
+                    by_type.setdefault(operation.object_type, []).append(object)
+                for object_type, type_objects in by_type.items():
+                    object_class = get_object_class_by_name(object_type)
+                    await object_class.save_many(
+                        type_objects,
+                        connection=conn,
+                        notify=False,
+                    )
+
+        except Exception as e:
+            # Nothing was applied. The error is reported at the failed
+            # operation, or at all of them when saving failed.
+            result = []
+            for operation in request.operations:
+                if current is None or operation is current:
+                    error = str(e)
+                else:
+                    error = "Not applied"
+                result.append(
+                    OperationResponseModel(
+                        id=operation.id,
+                        object_type=operation.object_type,
+                        error=error,
+                        success=False,
+                    )
+                )
+            return OperationsResponseModel(operations=result, success=False)
+
+        for object_type, type_objects in by_type.items():
+            await nebula.msg(
+                "objects_changed",
+                object_type=object_type.value,
+                objects=list(dict.fromkeys(object.id for object in type_objects)),
+            )
+
+        affected_bins = list(
+            dict.fromkeys(
+                object["id_bin"]
+                for object in objects
+                if isinstance(object, nebula.Item) and object["id_bin"]
+            )
+        )
+        if affected_bins:
+            await bin_refresh(affected_bins)
+
+        if reload_settings:
+            await load_settings()
+
+        return OperationsResponseModel(
+            operations=[
+                OperationResponseModel(
+                    id=object.id,
+                    object_type=operation.object_type,
+                    success=True,
+                )
+                for operation, object in zip(request.operations, objects)
+            ],
+            success=True,
+        )
+
+    def create_object(self, object_class, conn, user: nebula.User):
+        object = object_class(connection=conn, username=user.name)
+        object["created_by"] = user.id
+        return object
+
+    async def apply(
+        self,
+        operation: OperationModel,
+        object,
+        conn,
+        user: nebula.User,
+    ) -> bool:
+        """Apply an operation to an object (without saving it).
+
+        Returns True if the settings need to be reloaded.
+        """
+        reload_settings = False
+        if operation.id is None:
+            operation.data.pop("id", None)
+        object["updated_by"] = user.id
+
+        #
+        # Modyfiing users
+        #
+
+        if isinstance(object, nebula.User):
+            if not (user.is_admin or object.id == user.id):
+                raise nebula.ForbiddenException("Unable to modify other users")
+
+            if not user.is_admin:
+                for key in list(operation.data):
+                    if key.startswith("can/") or key.startswith("is_"):
+                        operation.data.pop(key, None)
+
+            password = operation.data.pop("password", None)
+            if password:
+                object.set_password(password)
+
+        #
+        # ACL
+        #
+
+        await can_modify_object(object, user)
+
+        #
+        # Run validator
+        #
+
+        if validator := Validator.for_object(operation.object_type):
+            try:
+                await validator(
+                    object,
+                    operation.data,
+                    connection=conn,
+                    user=user,
+                )
+            except nebula.RequestSettingsReload:
+                reload_settings = True
+        else:
+            object.update(operation.data)
+        return reload_settings
+
 
 class SetRequest(APIRequest):
     name = "set"
@@ -0,0 +1,79 @@
+from typing import Any
+
+from pydantic import Field
+
+import nebula
+from nebula.objects.cache import object_cache
+from server.browse_cache import browse_cache
+from server.dependencies import CurrentUser
+from server.models import ResponseModel
+from server.query_stats import browse_query_stats
+from server.request import APIRequest
+
+
+class StatsResponseModel(ResponseModel):
+    object_cache: dict[str, Any] = Field(
+        default_factory=dict,
+        title="Object cache",
+        description="Size and hit/miss counters of the process-local object cache",
+        example={
+            "size": 10000,
+            "ttl": 60,
+            "entries": 1250,
+            "hits": 4520,
+            "misses": 1380,
+            "hit_ratio": 0.766,
+        },
+    )
+    browse_cache: dict[str, Any] = Field(
+        default_factory=dict,
+        title="Browse cache",
+        description="Size and hit/miss counters of the process-local browse cache",
+        example={
+            "size": 200,
+            "ttl": 10,
+            "entries": 35,
+            "hits": 810,
+            "misses": 240,
+            "hit_ratio": 0.771,
+        },
+    )
+    browse_queries: list[dict[str, Any]] = Field(
+        default_factory=list,
+        title="Browse queries",
+        description="Execution times (in seconds) of browse query shapes "
+        "with the highest total time. Queries differing only in values "
+        "share a shape. Labels are the views the shape was used by.",
+        example=[
+            {
+                "shape": "3f2a9c1d0b7e",
+                "query": "SELECT id, ctime AS sort_value, ... LIMIT 500 OFFSET $3",
+                "labels": ["view 1"],
+                "calls": 320,
+                "total_time": 6.4,
+                "mean_time": 0.02,
+                "max_time": 0.35,
+            }
+        ],
+    )
+
+
+class Request(APIRequest):
+    """Return performance statistics of the server process.
+
+    Note that the values are specific to the worker process
+    which handled the request.
+    """
+
+    name: str = "stats"
+    title: str = "Server statistics"
+    response_model = StatsResponseModel
+
+    async def handle(self, user: CurrentUser) -> StatsResponseModel:
+        if not user.is_admin:
+            raise nebula.ForbiddenException("Only administrators can view statistics")
+        return StatsResponseModel(
+            object_cache=object_cache.stats(),
+            browse_cache=browse_cache.stats(),
+            browse_queries=browse_query_stats.stats(),
+        )
@@ -0,0 +1,64 @@
+from nxtools import slugify
+from pydantic import Field
+
+from server.dependencies import CurrentUser
+from server.models import RequestModel, ResponseModel
+from server.request import APIRequest
+from server.suggestions import MAX_SUGGESTIONS, suggestion_index
+
+
+class SuggestRequestModel(RequestModel):
+    query: str = Field(
+        ...,
+        title="Query",
+        description="Search query being typed. The last word is completed",
+        example="star tr",
+    )
+    limit: int = Field(
+        10,
+        title="Limit",
+        description="Maximum number of suggestions",
+        ge=1,
+        le=MAX_SUGGESTIONS,
+    )
+
+
+class SuggestResponseModel(ResponseModel):
+    suggestions: list[str] = Field(
+        default_factory=list,
+        title="Suggestions",
+        description="Completed queries, the best matching first",
+        example=["star trek", "star trekkie"],
+    )
+
+
+class Request(APIRequest):
+    """Suggest completions of a search query.
+
+    Completions are words of the asset fulltext index, ranked by their
+    weight and frequency. Limited users and users restricted to some
+    folders get no suggestions, since the vocabulary includes words
+    of assets they cannot access.
+    """
+
+    name: str = "suggest"
+    title: str = "Search suggestions"
+    response_model = SuggestResponseModel
+
+    async def handle(
+        self,
+        request: SuggestRequestModel,
+        user: CurrentUser,
+    ) -> SuggestResponseModel:
+        if user.is_limited or isinstance(user["can/asset_view"], list):
+            return SuggestResponseModel()
+
+        # Only the last word is completed. Preceding words are kept as typed.
+        # Words are indexed slugified, so is the prefix. When the last word
+        # is slugified to several ones ("star-tr"), the last one is completed.
+        head, _, last = request.query.rstrip().rpartition(" ")
+        if not (prefix := slugify(last).split("-")[-1]):
+            return SuggestResponseModel()
+        words = suggestion_index.suggest(prefix, request.limit)
+        head = f"{head} " if head else ""
+        return SuggestResponseModel(suggestions=[f"{head}{word}" for word in words])
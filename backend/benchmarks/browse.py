@@ -0,0 +1,128 @@
+"""Benchmark of eager and lazy object metadata decoding.
+
+Browse: 5000 asset rows as returned by Postgres, of which only a page
+is actually inspected. Eager mode decodes every row up-front (jsonb codec),
+lazy mode keeps the raw payload (`meta::text`) and decodes it on the first
+access.
+
+Rundown: events joined with their items, so each event is repeated for
+every item. Eager mode decodes the event of every row, lazy mode decodes
+each event once.
+
+Run from the backend directory using `python -m benchmarks.browse`.
+No database is needed.
+"""
+
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from nebula.common import json_dumps, json_loads
+from nebula.objects.asset import Asset
+from nebula.objects.event import Event
+
+ROWS = 5000
+PAGE = 100
+EVENTS = 250
+ITEMS_PER_EVENT = 20
+
+
+def asset_meta(id: int) -> dict[str, Any]:
+    meta: dict[str, Any] = {
+        "id": id,
+        "id_folder": 1 + id % 8,
+        "title": f"Asset number {id}",
+        "subtitle": f"Episode {id % 12}",
+        "description": "Lorem ipsum dolor sit amet " * 20,
+        "status": 1,
+        "content_type": 2,
+        "media_type": 1,
+        "ctime": 1680000000 + id,
+        "mtime": 1680000000 + id,
+        "duration": 1500.0 + id,
+        "path": f"media.dir/{id:06d}.mov",
+        "video/fps_f": 25.0,
+        "subclips": [
+            {"title": f"Subclip {i}", "mark_in": i * 10, "mark_out": i * 10 + 5}
+            for i in range(10)
+        ],
+    }
+    for i in range(40):
+        meta[f"qc/stream_{i}"] = {"codec": "pcm_s24le", "channels": 2, "index": i}
+    return meta
+
+
+def browse_rows() -> list[tuple[int, str]]:
+    return [(id, json_dumps(asset_meta(id))) for id in range(1, ROWS + 1)]
+
+
+def rundown_rows() -> list[tuple[int, str]]:
+    rows: list[tuple[int, str]] = []
+    for id in range(1, EVENTS + 1):
+        meta = asset_meta(id) | {"id_magic": id, "start": 1680000000 + id * 1800}
+        raw = json_dumps(meta)
+        rows.extend((id, raw) for _ in range(ITEMS_PER_EVENT))
+    return rows
+
+
+def browse_eager(rows: list[tuple[int, str]]) -> list:
+    assets = [Asset.from_row({"id": id, "meta": json_loads(raw)}) for id, raw in rows]
+    by_id = {asset.id: asset for asset in assets}
+    return [by_id[id] for id in range(1, PAGE + 1) if by_id[id]["title"]]
+
+
+def browse_lazy(rows: list[tuple[int, str]]) -> list:
+    assets = [Asset.from_row({"id": id, "meta": raw}) for id, raw in rows]
+    by_id = {asset.id: asset for asset in assets}
+    return [by_id[id] for id in range(1, PAGE + 1) if by_id[id]["title"]]
+
+
+def rundown_eager(rows: list[tuple[int, str]]) -> list:
+    starts = []
+    for id, raw in rows:
+        event = Event.from_meta(json_loads(raw))
+        starts.append(event["start"])
+    return starts
+
+
+def rundown_lazy(rows: list[tuple[int, str]]) -> list:
+    starts = []
+    event: Event | None = None
+    for id, raw in rows:
+        if event is None or event.id != id:
+            event = Event.from_raw(raw, id=id)
+        starts.append(event["start"])
+    return starts
+
+
+def measure(name: str, func: Callable[[list], list], rows: list) -> None:
+    # Time and memory are measured separately,
+    # since tracing allocations slows the code down considerably.
+    start_time = time.perf_counter()
+    result = func(rows)
+    elapsed = time.perf_counter() - start_time
+    del result
+
+    tracemalloc.start()
+    func(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<16} {elapsed * 1000:>10.1f} ms {peak / 1024 / 1024:>10.1f} MiB")
+
+
+def main() -> None:
+    rows = browse_rows()
+    print(f"Browse: {ROWS} rows, {PAGE} inspected")
+    for _ in range(2):
+        measure("browse eager", browse_eager, rows)
+        measure("browse lazy", browse_lazy, rows)
+
+    rows = rundown_rows()
+    print(f"Rundown: {EVENTS} events, {ITEMS_PER_EVENT} items each")
+    for _ in range(2):
+        measure("rundown eager", rundown_eager, rows)
+        measure("rundown lazy", rundown_lazy, rows)
+
+
+if __name__ == "__main__":
+    main()
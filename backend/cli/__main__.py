@@ -4,10 +4,20 @@ import os
 import sys
 
 import nebula
+from cli import maintenance, reindex
 from nebula.common import classes_from_module, import_module
 
+BUILTIN_MODULES = [maintenance, reindex]
+
 
 def get_plugin(name: str):
+    for builtin_module in BUILTIN_MODULES:
+        for plugin_class in classes_from_module(
+            nebula.plugins.CLIPlugin, builtin_module
+        ):
+            if plugin_class.name == name:
+                return plugin_class()
+
     plugin_root = os.path.join(nebula.config.plugin_dir, "cli")
 
     for module_fname in os.listdir(plugin_root):
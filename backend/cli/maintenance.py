@@ -0,0 +1,69 @@
+"""Built-in maintenance commands."""
+
+import nebula
+from nebula.enum import ObjectTypeId
+from nebula.helpers.views import rebuild_view_members, sync_view_members
+from nebula.objects.base import transaction
+from nebula.objects.utils import object_types
+
+
+class PurgeFulltext(nebula.CLIPlugin):
+    """Remove fulltext index rows which are never used.
+
+    Deletes index rows of object types with fulltext indexing disabled
+    and rows of objects which no longer exist.
+    """
+
+    name = "purge_ft"
+
+    async def main(self):
+        for object_type, object_class in object_types.items():
+            type_id = ObjectTypeId[object_type.name].value
+            if not object_class.ft_enabled:
+                res = await nebula.db.execute(
+                    "DELETE FROM ft WHERE object_type = $1",
+                    type_id,
+                )
+            else:
+                res = await nebula.db.execute(
+                    f"""
+                    DELETE FROM ft WHERE object_type = $1
+                    AND NOT EXISTS (
+                        SELECT 1 FROM {object_class.object_type}s AS o
+                        WHERE o.id = ft.id
+                    )
+                    """,
+                    type_id,
+                )
+            # execute returns a status string such as "DELETE 42"
+            count = int(res.split()[-1])
+            nebula.log.info(f"Purged {count} fulltext rows of {object_type.value}s")
+
+
+class RebuildViews(nebula.CLIPlugin):
+    """Rebuild the view membership table.
+
+    Memberships are updated whenever an asset is saved. Rebuild them
+    after assets were changed directly in the database.
+    """
+
+    name = "rebuild_views"
+
+    async def main(self):
+        async with transaction() as conn:
+            await rebuild_view_members(conn, nebula.settings.views)
+        nebula.log.info("View memberships rebuilt")
+
+
+class SyncViews(nebula.CLIPlugin):
+    """Rebuild memberships of views whose definition changed.
+
+    Until then, changed views are evaluated on every browse.
+    """
+
+    name = "sync_views"
+
+    async def main(self):
+        async with transaction() as conn:
+            await sync_view_members(conn, nebula.settings.views)
+        nebula.log.info("View memberships synchronized")
@@ -0,0 +1,234 @@
+"""Fulltext index rebuild.
+
+Rebuilds the whole `ft` table, for example after fulltext weights
+of metatypes were changed. Objects are read using a server-side cursor,
+their index rows are computed in a process pool (slugify is CPU-bound)
+and loaded using COPY into a shadow table, which then replaces the
+`ft` table atomically. Searches keep using the old index meanwhile.
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import asyncpg
+
+import nebula
+from nebula.common import json_loads
+from nebula.enum import ObjectTypeId
+from nebula.objects.base import create_ft_index, get_ft_weight, transaction
+from nebula.objects.utils import object_types
+
+# Number of objects indexed by a worker at once
+BATCH_SIZE = 1000
+
+# Progress is reported in this interval (seconds)
+PROGRESS_INTERVAL = 5
+
+# Values longer than this do not fit the ft.value column
+MAX_VALUE_LENGTH = 255
+
+Record = tuple[int, int, int, str]
+
+
+def index_batch(
+    batch: list[tuple[int, str]],
+    type_id: int,
+    weights: dict[str, int],
+) -> list[Record]:
+    """Return ft rows of a batch of (id, JSON encoded metadata) tuples.
+
+    Executed in worker processes. `weights` must contain weights of all
+    indexed keys, since settings are not loaded in the workers.
+    """
+    records: list[Record] = []
+    for id, payload in batch:
+        for word, weight in create_ft_index(json_loads(payload), weights).items():
+            if len(word) <= MAX_VALUE_LENGTH:
+                records.append((id, type_id, int(weight), word))
+    return records
+
+
+def index_weights(object_class) -> dict[str, int]:
+    """Return fulltext weights of all keys indexed for the object class"""
+    keys = ["subclips", *nebula.settings.metatypes, *object_class.ft_weights]
+    return {key: get_ft_weight(key, object_class.ft_weights) for key in keys}
+
+
+class Progress:
+    def __init__(self, object_type: str, total: int) -> None:
+        self.object_type = object_type
+        self.total = total
+        self.count = 0
+        self.rows = 0
+        self.start_time = self.last_report = time.monotonic()
+
+    def update(self, count: int, rows: int) -> None:
+        self.count += count
+        self.rows += rows
+        if time.monotonic() - self.last_report >= PROGRESS_INTERVAL:
+            self.last_report = time.monotonic()
+            self.report()
+
+    def report(self) -> None:
+        elapsed = max(time.monotonic() - self.start_time, 1e-6)
+        percent = 100 * self.count / self.total if self.total else 100
+        nebula.log.info(
+            f"Indexed {self.count}/{self.total} {self.object_type}s "
+            f"({percent:.1f}%, {self.count / elapsed:.0f} objects/s, "
+            f"{self.rows / elapsed:.0f} rows/s)"
+        )
+
+
+class Reindex(nebula.CLIPlugin):
+    """Rebuild the fulltext index of all objects.
+
+    Use `workers` to set the number of worker processes
+    (defaults to the number of CPUs).
+    """
+
+    name = "reindex"
+
+    async def main(self, workers: int = 0):
+        start_time = time.time()
+        await nebula.db.execute("DROP TABLE IF EXISTS ft_new")
+        await nebula.db.execute("CREATE TABLE ft_new (LIKE ft INCLUDING DEFAULTS)")
+
+        workers = int(workers) or os.cpu_count() or 1
+        nebula.log.info(f"Rebuilding the fulltext index using {workers} workers")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for object_class in object_types.values():
+                if object_class.ft_enabled:
+                    await self.load(object_class, executor, workers * 2)
+
+        # Indexes are built after loading, which is much faster
+        # than updating them row by row
+
+        nebula.log.info("Creating indexes")
+        await nebula.db.execute(
+            "CREATE UNIQUE INDEX idx_ft_new_object ON ft_new(id, object_type, value)"
+        )
+        await nebula.db.execute(
+            """
+            CREATE INDEX idx_ft_new_search
+            ON ft_new(object_type, value text_pattern_ops) INCLUDE (id, weight)
+            """
+        )
+        await nebula.db.execute("ANALYZE ft_new")
+
+        # Objects saved during the rebuild are indexed again. Most of them
+        # before locking the ft table, the rest while it is locked.
+
+        lock_time = time.time()
+        async with transaction() as conn:
+            await self.catch_up(conn, start_time)
+        async with transaction() as conn:
+            await conn.execute("LOCK TABLE ft IN ACCESS EXCLUSIVE MODE")
+            await self.catch_up(conn, lock_time)
+            await self.swap(conn)
+        nebula.log.success(
+            f"Fulltext index rebuilt in {time.time() - start_time:.1f} seconds"
+        )
+
+    async def load(self, object_class, executor, max_pending: int) -> None:
+        """Load ft rows of all objects of a type to the shadow table.
+
+        Up to `max_pending` batches are processed at once, so the workers
+        are kept busy while the next batches are read and the finished
+        ones are written.
+        """
+        object_type = object_class.object_type
+        type_id = ObjectTypeId[object_type.upper()].value
+        weights = index_weights(object_class)
+        total = await nebula.db.fetchval(f"SELECT COUNT(*) FROM {object_type}s")
+        progress = Progress(object_type, total)
+        loop = asyncio.get_running_loop()
+
+        # Number of objects of the batches being processed
+        pending: dict[asyncio.Future, int] = {}
+
+        pool = await nebula.db.pool()
+        async with pool.acquire() as conn:
+
+            async def write(return_when: str) -> None:
+                done, _ = await asyncio.wait(pending, return_when=return_when)
+                for future in done:
+                    records = future.result()
+                    await conn.copy_records_to_table(
+                        "ft_new",
+                        records=records,
+                        columns=["id", "object_type", "weight", "value"],
+                    )
+                    progress.update(pending.pop(future), len(records))
+
+            batch: list[tuple[int, str]] = []
+            async for row in nebula.db.stream(
+                f"SELECT id, meta::TEXT FROM {object_type}s",
+                prefetch=BATCH_SIZE,
+            ):
+                batch.append((row[0], row[1]))
+                if len(batch) < BATCH_SIZE:
+                    continue
+                future = loop.run_in_executor(
+                    executor, index_batch, batch, type_id, weights
+                )
+                pending[future] = len(batch)
+                batch = []
+                if len(pending) >= max_pending:
+                    await write(asyncio.FIRST_COMPLETED)
+
+            if batch:
+                future = loop.run_in_executor(
+                    executor, index_batch, batch, type_id, weights
+                )
+                pending[future] = len(batch)
+            if pending:
+                await write(asyncio.ALL_COMPLETED)
+        progress.report()
+
+    async def catch_up(self, conn: asyncpg.Connection, since: float) -> None:
+        """Index objects saved since the given time again"""
+        for object_class in object_types.values():
+            if not object_class.ft_enabled:
+                continue
+            object_type = object_class.object_type
+            type_id = ObjectTypeId[object_type.upper()].value
+            if "mtime" in object_class.db_columns:
+                mtime = "mtime"
+            else:
+                mtime = "(meta->>'mtime')::NUMERIC"
+            res = await conn.fetch(
+                f"SELECT id, meta::TEXT FROM {object_type}s WHERE {mtime} >= $1",
+                int(since),
+            )
+            if not res:
+                continue
+            ids = [row[0] for row in res]
+            await conn.execute(
+                "DELETE FROM ft_new WHERE object_type = $1 AND id = ANY($2)",
+                type_id,
+                ids,
+            )
+            records = index_batch(
+                [(row[0], row[1]) for row in res],
+                type_id,
+                index_weights(object_class),
+            )
+            await conn.copy_records_to_table(
+                "ft_new",
+                records=records,
+                columns=["id", "object_type", "weight", "value"],
+            )
+            nebula.log.info(f"Reindexed {len(ids)} {object_type}s changed meanwhile")
+
+    async def swap(self, conn: asyncpg.Connection) -> None:
+        """Replace the ft table with the shadow table.
+
+        Must be called with the ft table locked. Index rows of objects
+        deleted during the rebuild are left behind (see `purge_ft`).
+        """
+        await conn.execute("DROP TABLE ft")
+        await conn.execute("ALTER TABLE ft_new RENAME TO ft")
+        await conn.execute("ALTER INDEX idx_ft_new_object RENAME TO idx_ft_object")
+        await conn.execute("ALTER INDEX idx_ft_new_search RENAME TO idx_ft_search")
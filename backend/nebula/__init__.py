@@ -12,6 +12,7 @@ __all__ = [
     "Event",
     "User",
     "msg",
+    "flush_messages",
     "log",
     "run",
     "Storage",
@@ -54,7 +55,7 @@ from .exceptions import (
     ValidationException,
 )
 from .log import log
-from .messaging import msg
+from .messaging import flush_messages, msg
 from .objects.asset import Asset
 from .objects.bin import Bin
 from .objects.event import Event
@@ -76,6 +77,9 @@ def run(entrypoint):
 
     async def run_async():
         await load_settings()
-        await entrypoint
+        try:
+            await entrypoint
+        finally:
+            await flush_messages()
 
     asyncio.run(run_async())
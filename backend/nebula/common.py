@@ -12,7 +12,7 @@ import orjson
 T = TypeVar("T", bound=type)
 
 
-def json_loads(data: str) -> Any:
+def json_loads(data: str | bytes) -> Any:
     """Load JSON data."""
     return orjson.loads(data)
 
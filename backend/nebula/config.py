@@ -21,11 +21,50 @@ class NebulaConfig(BaseModel):
         description="PostgreSQL connection string",
     )
 
+    postgres_readonly: PostgresDsn | None = Field(
+        None,
+        description="Optional connection string of a read-only replica. "
+        "When set, heavy read-only endpoints are served from the replica.",
+    )
+
+    postgres_readonly_lag_guard: float = Field(
+        5,
+        description="Number of seconds after a client's own write, "
+        "during which its read-only queries are sent to the primary",
+    )
+
+    postgres_pool_min_size: int = Field(
+        10,
+        description="Number of connections the PostgreSQL pool is initialized with",
+    )
+
+    postgres_pool_max_size: int = Field(
+        10,
+        description="Maximum number of connections in the PostgreSQL pool",
+    )
+
+    postgres_statement_cache_size: int = Field(
+        1024,
+        description="Number of prepared statements cached per connection. "
+        "Set to 0 when connecting through pgbouncer in transaction mode.",
+    )
+
+    postgres_command_timeout: float | None = Field(
+        None,
+        description="Default timeout (in seconds) of database queries",
+    )
+
     redis: RedisDsn = Field(
         "redis://redis",
         description="Redis connection string",
     )
 
+    messaging_debounce: float = Field(
+        0.05,
+        description="Change notifications sent within this time (in seconds) "
+        "are merged to a single message per object type. 0 disables merging.",
+    )
+
     frontend_dir: str = Field(
         "/frontend",
         description="Path to the frontend directory",
@@ -36,6 +75,60 @@ class NebulaConfig(BaseModel):
         description="Path to the plugin directory",
     )
 
+    object_cache_size: int = Field(
+        0,
+        description="Maximum number of assets, bins and events kept in "
+        "the process-local object cache. 0 disables the cache. "
+        "The cache is invalidated by the server messaging loop, "
+        "so it should be enabled only for server processes.",
+    )
+
+    object_cache_ttl: float = Field(
+        60,
+        description="Maximum age (in seconds) of an object cache entry",
+    )
+
+    browse_cache_size: int = Field(
+        200,
+        description="Maximum number of browse results kept in the process-local "
+        "browse cache. 0 disables the cache. Entries are invalidated by "
+        "asset change notifications.",
+    )
+
+    browse_cache_ttl: float = Field(
+        10,
+        description="Maximum age (in seconds) of a browse cache entry",
+    )
+
+    browse_count_limit: int = Field(
+        10000,
+        description="Browse totals are counted exactly up to this number "
+        "of assets. Larger totals are estimated by the query planner.",
+    )
+
+    browse_totals_budget: float = Field(
+        0.2,
+        description="Maximum time (in seconds) browse waits for totals "
+        "and facets. Browse does not wait longer than the main query took. "
+        "Slower results are cached and returned by subsequent requests.",
+    )
+
+    browse_totals_timeout: float = Field(
+        10,
+        description="Maximum duration (in seconds) of a totals or facets query",
+    )
+
+    browse_totals_concurrency: int = Field(
+        4,
+        description="Maximum number of totals and facets queries running "
+        "at the same time. Keep it below the size of the connection pool.",
+    )
+
+    browse_totals_ttl: float = Field(
+        60,
+        description="Number of seconds browse totals and facets are cached",
+    )
+
     password_hashing: Literal["legacy"] = Field(
         "legacy",
         description="Password hashing method",
@@ -1,13 +1,64 @@
+import math
+import time
+from contextvars import ContextVar
+
 import asyncpg
 import asyncpg.pool
 
 from nebula.common import json_dumps, json_loads
 from nebula.config import config
 from nebula.exceptions import NebulaException
+from nebula.redis import Redis
+
+# Identifier of the client (user) the current request is handled for.
+# Used to route reads of clients who recently wrote to the primary.
+current_client: ContextVar[str | None] = ContextVar("current_client", default=None)
+
+# Whether the current client has written recently. Resolved once per request
+# and set by the client's own writes, so reads do not query Redis every time.
+recent_write: ContextVar[bool | None] = ContextVar("recent_write", default=None)
+
+
+class ReadOnlyDB:
+    """Read-only query API.
+
+    Queries are executed using the read-only replica pool if configured,
+    otherwise (or shortly after the client's own write) using the primary.
+    """
+
+    def __init__(self, db: "DB") -> None:
+        self.db = db
+
+    async def fetch(self, query: str, *args, timeout: float | None = None):
+        pool = await self.db.read_pool()
+        return await pool.fetch(query, *args, timeout=timeout)
+
+    async def fetchrow(self, query: str, *args, timeout: float | None = None):
+        pool = await self.db.read_pool()
+        return await pool.fetchrow(query, *args, timeout=timeout)
+
+    async def iterate(self, query: str, *args):
+        pool = await self.db.read_pool()
+        for record in await pool.fetch(query, *args):
+            yield record
+
+    async def stream(self, query: str, *args, prefetch: int | None = None):
+        pool = await self.db.read_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction(readonly=True):
+                statement = await conn.prepare(query)
+                async for record in statement.cursor(*args, prefetch=prefetch):
+                    yield record
 
 
 class DB:
     _pool: asyncpg.pool.Pool | None = None
+    _readonly_pool: asyncpg.pool.Pool | None = None
+    _last_writes: dict[str, float]
+
+    def __init__(self) -> None:
+        self._last_writes = {}
+        self.readonly = ReadOnlyDB(self)
 
     async def init_connection(self, conn):
         await conn.set_type_codec(
@@ -22,9 +73,24 @@ class DB:
         self._pool = await asyncpg.create_pool(
             config.postgres,
             init=self.init_connection,
+            min_size=min(config.postgres_pool_min_size, config.postgres_pool_max_size),
+            max_size=config.postgres_pool_max_size,
+            statement_cache_size=config.postgres_statement_cache_size,
+            command_timeout=config.postgres_command_timeout,
         )
         assert self._pool is not None
 
+    async def connect_readonly(self):
+        """Create a connection pool of the read-only replica."""
+        self._readonly_pool = await asyncpg.create_pool(
+            config.postgres_readonly,
+            init=self.init_connection,
+            min_size=min(config.postgres_pool_min_size, config.postgres_pool_max_size),
+            max_size=config.postgres_pool_max_size,
+            statement_cache_size=config.postgres_statement_cache_size,
+            command_timeout=config.postgres_command_timeout,
+        )
+
     async def pool(self) -> asyncpg.pool.Pool:
         if self._pool is None:
             await self.connect()
@@ -32,24 +98,103 @@ class DB:
             raise NebulaException("Unable to connect to database")
         return self._pool
 
+    async def read_pool(self) -> asyncpg.pool.Pool:
+        """Return a connection pool for read-only queries.
+
+        That is the replica pool, unless no replica is configured,
+        or the current client has written recently (in that case,
+        the replica may not have caught up with the write yet).
+        """
+        if not config.postgres_readonly or await self.written_recently():
+            return await self.pool()
+        if self._readonly_pool is None:
+            await self.connect_readonly()
+        if self._readonly_pool is None:
+            raise NebulaException("Unable to connect to read-only database")
+        return self._readonly_pool
+
+    async def mark_written(self) -> None:
+        """Record a write of the current client.
+
+        The timestamp is kept locally and in Redis, so all server workers
+        are aware of the write. The Redis key is refreshed on every write,
+        so it does not expire while the replica may still lag behind.
+        """
+        if not config.postgres_readonly:
+            return
+        if (client := current_client.get()) is None:
+            return
+        now = time.time()
+        self._last_writes[client] = now
+        recent_write.set(True)
+        ttl = math.ceil(config.postgres_readonly_lag_guard) + 2
+        await Redis.set("last-write", client, str(now), ttl=ttl)
+
+    async def written_recently(self) -> bool:
+        """Return True if the current client has written recently.
+
+        The result is cached for the rest of the request (context).
+        """
+        if (client := current_client.get()) is None:
+            return False
+        if (cached := recent_write.get()) is not None:
+            return cached
+        guard = config.postgres_readonly_lag_guard
+        if time.time() - self._last_writes.get(client, 0) < guard:
+            result = True
+        elif (value := await Redis.get("last-write", client)) is None:
+            result = False
+        else:
+            result = time.time() - float(value) < guard
+        recent_write.set(result)
+        return result
+
     async def execute(self, query: str, *args):
         pool = await self.pool()
+        await self.mark_written()
         return await pool.execute(query, *args)
 
     async def executemany(self, query: str, *args):
         pool = await self.pool()
+        await self.mark_written()
         return await pool.executemany(query, *args)
 
     async def fetch(self, query: str, *args):
         pool = await self.pool()
         return await pool.fetch(query, *args)
 
+    async def fetchrow(self, query: str, *args):
+        """Return the first row of the result or None"""
+        pool = await self.pool()
+        return await pool.fetchrow(query, *args)
+
+    async def fetchval(self, query: str, *args, column: int = 0):
+        """Return a value of the first row of the result or None"""
+        pool = await self.pool()
+        return await pool.fetchval(query, *args, column=column)
+
     async def iterate(self, query: str, *args):
+        """Iterate over rows of a bounded result set.
+
+        The whole result is fetched in a single round trip,
+        without a transaction and a server-side cursor.
+        Use `stream` for large scans.
+        """
+        pool = await self.pool()
+        for record in await pool.fetch(query, *args):
+            yield record
+
+    async def stream(self, query: str, *args, prefetch: int | None = None):
+        """Iterate over rows using a server-side cursor.
+
+        Rows are fetched in batches of `prefetch` records, so memory
+        stays bounded regardless the size of the result.
+        """
         pool = await self.pool()
         async with pool.acquire() as conn:
             async with conn.transaction():
                 statement = await conn.prepare(query)
-                async for record in statement.cursor(*args):
+                async for record in statement.cursor(*args, prefetch=prefetch):
                     yield record
 
 
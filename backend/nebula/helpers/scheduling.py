@@ -19,9 +19,9 @@ async def bin_refresh(
     if not bins:
         return None
 
-    for id_bin in bins:
-        # Resave bin to update duration
-        b = await nebula.Bin.load(id_bin)
+    # Resave bins to update their durations
+    bin_objects = await nebula.Bin.load_many(bins)
+    for b in bin_objects:
         await b.get_items()
         if user:
             b["updated_by"] = user.id
@@ -30,7 +30,7 @@ async def bin_refresh(
             f"New duration of {b} is {s2time(b.duration)} ({len(b.items)} items)",
             user=user.name if user else None,
         )
-        await b.save(notify=False)
+    await nebula.Bin.save_many(bin_objects, notify=False)
 
     query = """
     SELECT DISTINCT(c.id) AS id_event FROM events as e, channels AS c
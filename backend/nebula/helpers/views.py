@@ -0,0 +1,192 @@
+"""Materialized view membership.
+
+IDs of assets matching each view are stored in the `view_members` table,
+so browsing a view does not evaluate its folders, states and conditions
+against the whole assets table. The `view_conditions` table records
+the condition the memberships of each view were built from. Memberships
+of saved assets are updated within the save transaction using these
+conditions (see `Asset._after_save`).
+
+The whole table is rebuilt when the views are set up (or using the
+`rebuild_views` CLI command). Memberships of views whose definition changed
+are rebuilt using the `sync_views` CLI command. Until then, such views
+are evaluated on every browse.
+
+Only views with conditions on the asset row itself can be materialized.
+Conditions depending on the current time (such as "today") or reading
+other tables (subqueries of items, events, bins...) change their result
+without the asset being saved, so they are evaluated on every browse.
+"""
+
+import re
+from typing import TYPE_CHECKING
+
+import asyncpg
+
+from nebula.common import sql_list
+from nebula.db import DB
+from nebula.log import log
+
+if TYPE_CHECKING:
+    from nebula.settings.models import ViewSettings
+
+# Conditions using these functions are evaluated on every browse
+VOLATILE = re.compile(
+    r"\b(now|current_date|current_time|current_timestamp|localtime"
+    r"|localtimestamp|clock_timestamp|statement_timestamp"
+    r"|transaction_timestamp|timeofday|random)\b",
+    re.IGNORECASE,
+)
+
+# Conditions reading other tables are evaluated on every browse as well
+FOREIGN = re.compile(r"\b(select|from|join)\b", re.IGNORECASE)
+
+# Conditions the memberships of views were built from, by view ID.
+# Loaded with the settings (see `load_view_conditions`).
+built_conditions: dict[int, str] = {}
+
+
+def view_condition(view: "ViewSettings") -> str | None:
+    """Return a SQL condition selecting assets of the view (None for all)"""
+    cond_list = []
+    if view.folders:
+        cond_list.append(f"id_folder IN {sql_list(view.folders)}")
+    if view.states:
+        cond_list.append(f"status IN {sql_list(view.states)}")
+    if view.conditions:
+        cond_list.extend(f"({condition})" for condition in view.conditions)
+    return " AND ".join(cond_list) or None
+
+
+def can_materialize(view: "ViewSettings") -> bool:
+    """Return True if the view condition depends on the asset row only"""
+    if (condition := view_condition(view)) is None:
+        return False
+    return VOLATILE.search(condition) is None and FOREIGN.search(condition) is None
+
+
+def is_materialized(view: "ViewSettings") -> bool:
+    """Return True if up-to-date members of the view are stored in view_members"""
+    if (condition := view_condition(view)) is None:
+        return False
+    return built_conditions.get(view.id) == condition
+
+
+async def load_view_conditions(connection: asyncpg.Connection | DB) -> None:
+    """Load conditions the view memberships were built from"""
+    res = await connection.fetch("SELECT id_view, condition FROM view_conditions")
+    built_conditions.clear()
+    built_conditions.update({row["id_view"]: row["condition"] for row in res})
+
+
+async def update_view_members(conn: asyncpg.Connection, ids: list[int]) -> None:
+    """Update view memberships of the given assets.
+
+    Must be called within a transaction. Conditions are read from
+    the view_conditions table, so memberships are updated the same way
+    they were built, regardless of the settings loaded by the process.
+    Memberships of all views are written using a single statement.
+    When a view condition fails, the error is raised, so the save is
+    rolled back instead of leaving the memberships stale.
+    """
+    if not ids:
+        return
+    res = await conn.fetch("SELECT id_view, condition FROM view_conditions")
+    if not res:
+        return
+    branches = [
+        f"SELECT {row['id_view']}, id FROM assets "
+        f"WHERE id = ANY($1) AND {row['condition']}"
+        for row in res
+    ]
+    await conn.execute(
+        "DELETE FROM view_members WHERE id_asset = ANY($1) AND id_view = ANY($2)",
+        ids,
+        [row["id_view"] for row in res],
+    )
+    await conn.execute(
+        f"""
+        INSERT INTO view_members (id_view, id_asset)
+        {' UNION ALL '.join(branches)}
+        """,
+        ids,
+    )
+
+
+async def build_view_members(conn: asyncpg.Connection, view: "ViewSettings") -> None:
+    """Replace memberships of a single view"""
+    condition = view_condition(view)
+    await conn.execute("DELETE FROM view_members WHERE id_view = $1", view.id)
+    res = await conn.execute(
+        f"""
+        INSERT INTO view_members (id_view, id_asset)
+        SELECT $1, id FROM assets WHERE {condition}
+        """,
+        view.id,
+    )
+    await conn.execute(
+        """
+        INSERT INTO view_conditions (id_view, condition) VALUES ($1, $2)
+        ON CONFLICT (id_view) DO UPDATE SET condition = EXCLUDED.condition
+        """,
+        view.id,
+        condition,
+    )
+    # execute returns a status string such as "INSERT 0 42"
+    count = int(res.split()[-1])
+    log.trace(f"View {view.name} has {count} members")
+
+
+async def rebuild_view_members(
+    conn: asyncpg.Connection,
+    views: list["ViewSettings"],
+) -> None:
+    """Rebuild the view_members table. Must be called within a transaction.
+
+    Fails when a view condition is not valid.
+    """
+    await conn.execute("TRUNCATE view_members, view_conditions")
+    for view in views:
+        if not can_materialize(view):
+            log.trace(f"View {view.name} is not materialized")
+            continue
+        await build_view_members(conn, view)
+    await load_view_conditions(conn)
+
+
+async def sync_view_members(
+    conn: asyncpg.Connection,
+    views: list["ViewSettings"],
+) -> None:
+    """Rebuild memberships of views whose definition changed.
+
+    Must be called within a transaction. Views which cannot be built
+    are reported and evaluated on every browse instead.
+    """
+    # Concurrent synchronizations wait for each other
+    await conn.execute("SELECT pg_advisory_xact_lock(hashtext('view_members'))")
+    res = await conn.fetch("SELECT id_view, condition FROM view_conditions")
+    built = {row["id_view"]: row["condition"] for row in res}
+
+    materialized: set[int] = set()
+    for view in views:
+        if not can_materialize(view):
+            continue
+        materialized.add(view.id)
+        if built.get(view.id) == view_condition(view):
+            continue
+        log.info(f"Rebuilding memberships of view {view.name}")
+        try:
+            async with conn.transaction():
+                await build_view_members(conn, view)
+        except asyncpg.PostgresError as e:
+            log.error(f"Unable to build memberships of view {view.name}: {e}")
+            # Previous memberships of the view are not maintained anymore
+            materialized.discard(view.id)
+
+    if obsolete := [id for id in built if id not in materialized]:
+        await conn.execute("DELETE FROM view_members WHERE id_view = ANY($1)", obsolete)
+        await conn.execute(
+            "DELETE FROM view_conditions WHERE id_view = ANY($1)", obsolete
+        )
+    await load_view_conditions(conn)
@@ -1,21 +1,89 @@
-import json
+"""Messaging.
+
+Messages are published to a Redis channel as JSON encoded lists
+[timestamp, site, host, topic, data].
+
+`objects_changed` messages are not published immediately. Messages sent
+within `messaging_debounce` seconds are merged to one message per object
+type (and initiator), so bulk operations saving objects one by one
+publish a single message instead of one per object. Other messages are
+published immediately, after any pending changes, so the order
+of messages is kept.
+"""
+
+import asyncio
 import socket
 import time
 from typing import Any
 
+import orjson
+
 from nebula.config import config
+from nebula.log import log
 from nebula.redis import Redis
 
+HOSTNAME = socket.gethostname()
 
-async def msg(topic: str, **data: Any) -> None:
-    await Redis.publish(
-        json.dumps(
-            [
-                time.time(),
-                config.site_name,
-                socket.gethostname(),
-                topic,
-                data,
-            ]
+
+async def publish(topic: str, data: dict[str, Any]) -> None:
+    message = orjson.dumps([time.time(), config.site_name, HOSTNAME, topic, data])
+    await Redis.publish(message)
+
+
+class ChangeAggregator:
+    """Merges `objects_changed` messages sent within a short window"""
+
+    def __init__(self) -> None:
+        # Changed object IDs (ordered, unique) per encoded message data
+        # without the objects list
+        self.pending: dict[bytes, dict[int, None]] = {}
+        self.flush_task: asyncio.Task | None = None
+
+    def add(self, data: dict[str, Any]) -> None:
+        objects = data.get("objects") or []
+        key = orjson.dumps(
+            {k: v for k, v in data.items() if k != "objects"},
+            option=orjson.OPT_SORT_KEYS,
         )
-    )
+        self.pending.setdefault(key, {}).update(dict.fromkeys(objects))
+        if self.flush_task is None:
+            self.flush_task = asyncio.create_task(self.flush_later())
+
+    async def flush_later(self) -> None:
+        await asyncio.sleep(config.messaging_debounce)
+        self.flush_task = None
+        try:
+            await self.flush()
+        except Exception:
+            log.traceback("Unable to publish change notifications")
+
+    async def flush(self) -> None:
+        """Publish all pending changes"""
+        if (
+            self.flush_task is not None
+            and self.flush_task is not asyncio.current_task()
+        ):
+            self.flush_task.cancel()
+            self.flush_task = None
+        pending, self.pending = self.pending, {}
+        for key, ids in pending.items():
+            data = orjson.loads(key)
+            data["objects"] = list(ids)
+            await publish("objects_changed", data)
+
+
+changes = ChangeAggregator()
+
+
+async def msg(topic: str, **data: Any) -> None:
+    if topic == "objects_changed" and config.messaging_debounce > 0:
+        changes.add(data)
+        return
+    if changes.pending:
+        await changes.flush()
+    await publish(topic, data)
+
+
+async def flush_messages() -> None:
+    """Publish pending messages. Call before the process exits."""
+    await changes.flush()
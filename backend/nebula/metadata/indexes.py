@@ -0,0 +1,144 @@
+"""Expression indexes of asset metadata keys.
+
+Keys of metatypes marked as `index` get an expression index on the assets
+table. Queries must use exactly the same expression (as returned by
+`meta_expression`) in order to use the index, so both the setup and the
+query builders use this module.
+
+Numeric values are casted using IMMUTABLE functions defined in schema.sql,
+which return NULL for values that cannot be casted. A plain cast would make
+every write of an asset with such a value fail once the key is indexed.
+"""
+
+import re
+
+import asyncpg
+
+from nebula.enum import MetaClass
+from nebula.log import log
+
+INDEX_PREFIX = "idx_meta_"
+
+CASTS: dict[MetaClass, str] = {
+    MetaClass.INTEGER: "INTEGER",
+    MetaClass.NUMERIC: "NUMERIC",
+    MetaClass.DATETIME: "NUMERIC",
+    MetaClass.TIMECODE: "NUMERIC",
+    MetaClass.COLOR: "INTEGER",
+}
+
+# Functions casting text values to the SQL types (see schema.sql)
+CAST_FUNCTIONS: dict[str, str] = {
+    "INTEGER": "meta_integer",
+    "NUMERIC": "meta_numeric",
+}
+
+# Metaclasses which cannot be meaningfully indexed using a btree index
+UNINDEXABLE = [MetaClass.OBJECT, MetaClass.LIST]
+
+
+def meta_cast(metaclass: MetaClass) -> str | None:
+    """Return a SQL type, values of the given metaclass are compared as"""
+    return CASTS.get(metaclass)
+
+
+def meta_expression(key: str, metaclass: MetaClass) -> str:
+    """Return a SQL expression of a metadata key.
+
+    Numeric keys are casted to their SQL type, so they are compared
+    and sorted as numbers. Values which cannot be casted are NULL.
+    The key must be a valid metatype (it is not escaped).
+    """
+    if cast := meta_cast(metaclass):
+        return f"{CAST_FUNCTIONS[cast]}(meta->>'{key}')"
+    return f"(meta->>'{key}')"
+
+
+def legacy_index_name(key: str) -> str:
+    """Return a name of the index created for the key by previous versions"""
+    return "idx_" + key.replace("/", "_")
+
+
+def meta_index_name(key: str, metaclass: MetaClass) -> str:
+    """Return a name of the expression index of a metadata key.
+
+    The SQL type is a part of the name, so changing the metaclass
+    of the key results in rebuilding the index.
+    """
+    slug = re.sub(r"[^a-z0-9]+", "_", key.lower()).strip("_")
+    cast = meta_cast(metaclass) or "text"
+    return f"{INDEX_PREFIX}{slug}_{cast.lower()}"[:63]
+
+
+def is_current(definition: str, expression: str) -> bool:
+    """Return True if an existing index definition uses the expression.
+
+    Indexes of casted keys created before the safe cast functions
+    were introduced use a plain cast and must be rebuilt.
+    """
+    function = expression.split("(")[0]
+    return not function or f"{function}(" in definition
+
+
+async def update_meta_indexes(
+    conn: asyncpg.Connection,
+    indexed: dict[str, MetaClass],
+    exclude: list[str] | None = None,
+    legacy_keys: list[str] | None = None,
+) -> None:
+    """Create missing and drop unused expression indexes of the assets table.
+
+    `indexed` maps keys which should be indexed to their metaclass.
+    Keys listed in `exclude` (such as real table columns) are skipped.
+    Indexes of `legacy_keys` created by previous versions (`idx_<key>`
+    on the text value) duplicate the managed ones, so they are dropped.
+    An index which cannot be created is reported and skipped.
+    """
+    wanted: dict[str, str] = {}
+    for key, metaclass in indexed.items():
+        if key in (exclude or []) or metaclass in UNINDEXABLE:
+            continue
+        wanted[meta_index_name(key, metaclass)] = meta_expression(key, metaclass)
+
+    # Legacy names may clash with indexes of table columns (idx_status),
+    # so only expression indexes of the metadata are dropped.
+    res = await conn.fetch(
+        """
+        SELECT indexname FROM pg_indexes
+        WHERE tablename = 'assets'
+        AND indexname = ANY($1)
+        AND indexdef LIKE '%(meta ->> %'
+        """,
+        [legacy_index_name(key) for key in legacy_keys or []],
+    )
+    for row in res:
+        log.info(f"Dropping legacy metadata index {row['indexname']}")
+        await conn.execute(f"DROP INDEX IF EXISTS {row['indexname']}")
+
+    res = await conn.fetch(
+        """
+        SELECT indexname, indexdef FROM pg_indexes
+        WHERE tablename = 'assets' AND indexname LIKE $1
+        """,
+        f"{INDEX_PREFIX}%",
+    )
+    existing = {row["indexname"]: row["indexdef"] for row in res}
+
+    for index_name, definition in existing.items():
+        if index_name in wanted and is_current(definition, wanted[index_name]):
+            continue
+        log.info(f"Dropping unused metadata index {index_name}")
+        await conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+        existing[index_name] = ""
+
+    for index_name, expression in wanted.items():
+        if existing.get(index_name):
+            continue
+        log.info(f"Creating metadata index {index_name}")
+        try:
+            async with conn.transaction():
+                await conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {index_name} ON assets ({expression})"
+                )
+        except asyncpg.exceptions.PostgresError as e:
+            log.error(f"Unable to create metadata index {index_name}: {e}")
@@ -3,13 +3,17 @@ import os
 from nxtools import get_base_name, slugify
 
 from nebula.enum import ContentType, MediaType, ObjectStatus
-from nebula.objects.base import BaseObject
+from nebula.helpers.views import update_view_members
+from nebula.objects.base import BaseObject, transaction
 from nebula.settings import settings
 from nebula.storages import storages
 
 
 class Asset(BaseObject):
+    __slots__ = ()
+
     object_type: str = "asset"
+    cacheable: bool = True
     db_columns: list[str] = [
         "id_folder",
         "content_type",
@@ -27,6 +31,11 @@ class Asset(BaseObject):
         "version_of": 0,  # NOTE: V5 Compatibility, remove in V6, should be None
     }
 
+    @classmethod
+    async def _after_save(cls, connection, ids: list[int]) -> None:
+        async with transaction(connection) as conn:
+            await update_view_members(conn, ids)
+
     @property
     def base_name(self) -> str | None:
         """Return base name of the asset.
@@ -1,9 +1,12 @@
 import time
-from typing import Any
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, Callable
 
 import asyncpg
 from nxtools import slugify
 
+from nebula.common import json_loads
 from nebula.db import DB, db
 from nebula.enum import ObjectTypeId
 from nebula.exceptions import (
@@ -15,13 +18,43 @@ from nebula.log import log
 from nebula.messaging import msg
 from nebula.metadata.format import format_meta
 from nebula.metadata.normalize import normalize_meta
+from nebula.objects.cache import object_cache
+from nebula.objects.loader import get_loader
 from nebula.settings import settings
 
+# Maximum number of rows written by a single multi-row statement.
+# Keeps the number of query arguments well below the Postgres limit.
+BULK_CHUNK_SIZE = 500
 
-def create_ft_index(meta) -> dict[str, float]:
+# Fulltext weight of subclip titles
+SUBCLIPS_WEIGHT = 8
+
+# Callbacks invoked with the object type and IDs of written objects.
+# Allows process-local caches outside this package to be invalidated
+# before the request writing the objects returns.
+write_listeners: list[Callable[[str, list[int]], None]] = []
+
+
+def get_ft_weight(key: str, weights: dict[str, int] | None = None) -> int:
+    """Return the fulltext weight of a metadata key (0 if not indexed).
+
+    Per-object-type `weights` override the weights set in metatypes.
+    """
+    if weights and key in weights:
+        return weights[key]
+    if key == "subclips":
+        return SUBCLIPS_WEIGHT
+    if key not in settings.metatypes:
+        return 0
+    return settings.metatypes[key].fulltext or 0
+
+
+def create_ft_index(
+    meta,
+    weights: dict[str, int] | None = None,
+) -> dict[str, float]:
     ft: dict[str, float] = {}
-    if "subclips" in meta:
-        weight = 8
+    if "subclips" in meta and (weight := get_ft_weight("subclips", weights)):
         for sc in [k.get("title", "") for k in meta["subclips"]]:
             try:
                 for word in slugify(sc, make_set=True, min_length=3):
@@ -33,9 +66,9 @@ def create_ft_index(meta) -> dict[str, float]:
             except Exception:
                 log.error("Unable to slugify subclips data")
     for key in meta:
-        if key not in settings.metatypes:
+        if key == "subclips":
             continue
-        if not (weight := settings.metatypes[key].fulltext):
+        if not (weight := get_ft_weight(key, weights)):
             continue
         try:
             for word in slugify(meta[key], make_set=True, min_length=3):
@@ -48,15 +81,152 @@ def create_ft_index(meta) -> dict[str, float]:
     return ft
 
 
+class TransactionCallbacks:
+    """Callbacks of a transaction opened by `transaction`"""
+
+    __slots__ = ["connection", "commit", "rollback"]
+
+    def __init__(self, connection: asyncpg.Connection) -> None:
+        self.connection = connection
+        self.commit: list[Callable[[], None]] = []
+        self.rollback: list[Callable[[], None]] = []
+
+
+# Callbacks of the innermost transaction opened by `transaction`
+_transaction_callbacks: ContextVar[TransactionCallbacks | None] = ContextVar(
+    "transaction_callbacks", default=None
+)
+
+
+@asynccontextmanager
+async def _tracked_transaction(
+    conn: asyncpg.Connection,
+) -> AsyncGenerator[asyncpg.Connection, None]:
+    callbacks = TransactionCallbacks(conn)
+    token = _transaction_callbacks.set(callbacks)
+    try:
+        async with conn.transaction():
+            yield conn
+    except BaseException:
+        for callback in callbacks.rollback:
+            callback()
+        raise
+    finally:
+        _transaction_callbacks.reset(token)
+    for callback in callbacks.commit:
+        callback()
+
+
+@asynccontextmanager
+async def transaction(
+    connection: asyncpg.Connection | DB | None = None,
+) -> AsyncGenerator[asyncpg.Connection, None]:
+    """Yield a connection with an open transaction.
+
+    When a DB instance (or None) is given, a connection is acquired
+    from the pool. An already running transaction is reused as is.
+    """
+    if connection is None:
+        connection = db
+    if isinstance(connection, DB):
+        pool = await connection.pool()
+        async with pool.acquire() as conn:
+            async with _tracked_transaction(conn):
+                yield conn
+    elif hasattr(connection, "is_in_transaction") and connection.is_in_transaction():
+        yield connection
+    else:
+        async with _tracked_transaction(connection):
+            yield connection
+
+
+def in_transaction() -> bool:
+    """Return True if running within a transaction opened by `transaction`"""
+    return _transaction_callbacks.get() is not None
+
+
+def _current_callbacks(connection: asyncpg.Connection) -> TransactionCallbacks | None:
+    current = _transaction_callbacks.get()
+    if current is None or current.connection is not connection:
+        return None
+    return current
+
+
+def on_commit(connection: asyncpg.Connection, callback: Callable[[], None]) -> bool:
+    """Call the callback once the current transaction commits.
+
+    Only transactions opened using `transaction` are tracked. Returns False
+    if the connection is not in such a transaction (for example when
+    the caller used `connection.transaction()`), so the outcome
+    of the transaction will not be known.
+    """
+    if (current := _current_callbacks(connection)) is None:
+        return False
+    current.commit.append(callback)
+    return True
+
+
+def on_rollback(connection: asyncpg.Connection, callback: Callable[[], None]) -> bool:
+    """Call the callback if the current transaction is rolled back.
+
+    See `on_commit`.
+    """
+    if (current := _current_callbacks(connection)) is None:
+        return False
+    current.rollback.append(callback)
+    return True
+
+
 class BaseObject:
+    """Base class of all Nebula objects.
+
+    Object metadata may be provided either as a dict, or as a raw
+    (JSON encoded) payload. In the latter case the payload is decoded
+    only when the metadata is accessed for the first time, so objects
+    which are just passed around (or identified by their ID) never
+    pay for decoding their metadata.
+
+    Keys modified using `__setitem__` or `update` are tracked and only
+    these are written when an existing object is saved. Saving an
+    unchanged object is a no-op. Values modified in place (such as
+    appending to a list) are not tracked - set the value again or
+    use `mark_dirty`. Changes are considered saved once the save
+    transaction commits, so a save rolled back may be simply retried.
+
+    Objects created from a metadata dict which includes an ID are written
+    whole, since the dict may differ from the stored metadata. Only objects
+    loaded from the database (`load`, `load_many`, `from_row`, `from_raw`)
+    start clean.
+    """
+
+    __slots__ = (
+        "_meta",
+        "_raw_meta",
+        "_raw_id",
+        "_dirty",
+        "connection",
+        "username",
+    )
+
     object_type: str
-    meta: dict[str, Any] = {}
     defaults: dict[str, Any] = {}
     db_columns: list[str] = []
-    connection: asyncpg.Connection | DB | None = None
-    username: str | None = None  # Name of the user operating on the object
-
-    def __init__(self, meta: dict[str, Any] | None = None, **kwargs) -> None:
+    cacheable: bool = False  # Use the process-local object cache for loading
+    ft_enabled: bool = True  # Maintain the fulltext index of the objects
+    ft_weights: dict[str, int] = {}  # Override metatype fulltext weights (0 = skip)
+    connection: asyncpg.Connection | DB
+    username: str | None  # Name of the user operating on the object
+    _meta: dict[str, Any] | None
+    _raw_meta: bytes | str | None  # Not yet decoded metadata
+    _raw_id: int | None  # Object ID known without decoding the metadata
+    _dirty: set[str] | None  # Keys changed since the last save. None means all
+
+    def __init__(
+        self,
+        meta: dict[str, Any] | None = None,
+        raw_meta: bytes | str | None = None,
+        **kwargs,
+    ) -> None:
 
         if (conn := kwargs.get("connection")) is not None:
             assert isinstance(conn, asyncpg.Connection) or isinstance(conn, DB)
@@ -65,10 +235,35 @@ class BaseObject:
             self.connection = db
 
         self.username = kwargs.get("username")
+        self._raw_id = None
+        self._dirty = None if meta and meta.get("id") else set()
+
+        if raw_meta is not None:
+            self._meta = None
+            self._raw_meta = raw_meta
+            self._raw_id = kwargs.get("id")
+            return
+
+        self._raw_meta = None
+        self._set_meta(self.defaults | (meta or {}))
 
-        if meta is None:
-            meta = {}
-        self.meta = self.defaults | meta
+    def _set_meta(self, meta: dict[str, Any]) -> None:
+        self._meta = meta
+        self._raw_meta = None
+
+    @property
+    def meta(self) -> dict[str, Any]:
+        if self._meta is None:
+            assert self._raw_meta is not None
+            self._set_meta(self.defaults | json_loads(self._raw_meta))
+        assert self._meta is not None
+        return self._meta
+
+    @meta.setter
+    def meta(self, value: dict[str, Any]) -> None:
+        self._meta = value
+        self._raw_meta = None
+        self._dirty = None
 
     def __repr__(self) -> str:
         return f"<{self.__str__().capitalize()}>"
@@ -84,6 +279,8 @@ class BaseObject:
 
     @property
     def id(self) -> int | None:
+        if self._meta is None and self._raw_id:
+            return self._raw_id
         id = self.meta.get("id")
         # Handle false and other weird values
         # Yes. It happens.
@@ -115,7 +312,7 @@ class BaseObject:
         be casted to the expected type.
         """
         if value is None:
-            self.meta.pop(key, None)
+            self._unset(key)
             return
         try:
             value = normalize_meta(key, value)
@@ -124,9 +321,31 @@ class BaseObject:
         except ValueError as e:
             raise ValidationException(str(e), key=key)
         if value is None:
-            self.meta.pop(key, None)
-        else:
-            self.meta[key] = value
+            self._unset(key)
+            return
+        current = self.meta.get(key)
+        if current == value:
+            # Re-assigning the same list or dict is considered a change,
+            # since it was most likely modified in place.
+            if current is not value or not isinstance(value, (dict, list)):
+                return
+        self.meta[key] = value
+        self.mark_dirty(key)
+
+    def _unset(self, key: str) -> None:
+        if key in self.meta:
+            del self.meta[key]
+            self.mark_dirty(key)
+
+    def mark_dirty(self, *keys: str) -> None:
+        """Mark the given keys as modified, so they are written on save."""
+        if self._dirty is not None:
+            self._dirty.update(keys)
+
+    @property
+    def is_dirty(self) -> bool:
+        """Return True if the object has unsaved changes."""
+        return self._dirty is None or bool(self._dirty)
 
     def get(self, key: str, default: Any = None) -> Any:
         if (value := self[key]) is None and (key != "id"):
@@ -146,29 +365,128 @@ class BaseObject:
     # TODO: after upgrading to Python 3.11, use 'self' as a return type
     #
 
+    @classmethod
+    def _use_cache(cls, connection) -> bool:
+        # Objects loaded using an explicit connection or within
+        # a transaction are always read from the database (and not cached,
+        # since they may include uncommitted writes)
+        return (
+            cls.cacheable
+            and object_cache.enabled
+            and isinstance(connection, DB)
+            and not in_transaction()
+        )
+
+    @classmethod
+    async def _load_raw(cls, ids: list[int]) -> dict[int, str]:
+        """Return encoded metadata of the existing objects.
+
+        Concurrent loads are batched and coalesced, except within
+        a transaction, where the caller may have written the objects
+        just before, so they are read using the transaction connection.
+        """
+        loader = get_loader(cls.object_type)
+        if (callbacks := _transaction_callbacks.get()) is not None:
+            return await loader.query(ids, connection=callbacks.connection)
+        return await loader.load_many(ids)
+
     @classmethod
     async def load(cls, id: int, **kwargs):
-        """Load an object from the database"""
-        conn = kwargs.get("connection", db)
-        res = await conn.fetch(f"SELECT meta FROM {cls.object_type}s WHERE id = $1", id)
-        if not res:
-            raise NotFoundException(f"{cls.object_type.capitalize()} ID {id} not found")
-        return cls(meta=res[0]["meta"], **kwargs)
+        """Load an object from the database
+
+        Unless an explicit connection is provided, concurrent loads
+        of the same object type are batched into a single query and
+        the object metadata is decoded lazily.
+        """
+        conn = kwargs.get("connection") or db
+        use_cache = cls._use_cache(conn)
+        if use_cache and (payload := object_cache.get(cls.object_type, id)):
+            return cls.from_raw(payload, id=id, **kwargs)
+        if isinstance(conn, DB):
+            generation = object_cache.generation
+            if (raw := (await cls._load_raw([id])).get(id)) is not None:
+                if use_cache:
+                    object_cache.put(cls.object_type, id, raw, generation)
+                return cls.from_raw(raw, id=id, **kwargs)
+        else:
+            res = await conn.fetch(
+                f"SELECT meta FROM {cls.object_type}s WHERE id = $1", id
+            )
+            if res:
+                return cls._from_stored(res[0]["meta"], **kwargs)
+        raise NotFoundException(f"{cls.object_type.capitalize()} ID {id} not found")
+
+    @classmethod
+    async def load_many(cls, ids: list[int], **kwargs) -> list:
+        """Load multiple objects from the database using a single query.
+
+        Objects are returned in the order of the requested IDs,
+        missing objects are skipped.
+        """
+        conn = kwargs.get("connection") or db
+        use_cache = cls._use_cache(conn)
+        ids = list(dict.fromkeys(ids))
+        objects = {}
+        if use_cache:
+            for id in ids:
+                if payload := object_cache.get(cls.object_type, id):
+                    objects[id] = cls.from_raw(payload, id=id, **kwargs)
+        if missing := [id for id in ids if id not in objects]:
+            if isinstance(conn, DB):
+                generation = object_cache.generation
+                loaded = await cls._load_raw(missing)
+                for id, raw in loaded.items():
+                    if use_cache:
+                        object_cache.put(cls.object_type, id, raw, generation)
+                    objects[id] = cls.from_raw(raw, id=id, **kwargs)
+            else:
+                res = await conn.fetch(
+                    f"SELECT id, meta FROM {cls.object_type}s WHERE id = ANY($1)",
+                    missing,
+                )
+                for row in res:
+                    objects[row["id"]] = cls._from_stored(row["meta"], **kwargs)
+        return [objects[id] for id in ids if id in objects]
 
     @classmethod
     def from_row(cls, row, **kwargs):
         """Return an object from a database row.
 
         meta is expected to be one of the column of the row.
+        When it is selected as text (`meta::text AS meta`), decoding
+        is deferred until the metadata is accessed (lazy mode).
+        Note that no validation is performed.
+        Do not use with untrusted data.
+        """
+        meta = row["meta"]
+        if isinstance(meta, (str, bytes)):
+            if "id" in row.keys():
+                kwargs["id"] = row["id"]
+            return cls(raw_meta=meta, **kwargs)
+        return cls._from_stored(meta, **kwargs)
+
+    @classmethod
+    def _from_stored(cls, meta: dict[str, Any], **kwargs):
+        """Return an unmodified object from the stored metadata"""
+        obj = cls(meta=meta, **kwargs)
+        obj._dirty = set()
+        return obj
+
+    @classmethod
+    def from_raw(cls, raw_meta: bytes | str, **kwargs):
+        """Return an object from JSON encoded metadata (lazy mode).
+
+        The payload is decoded on the first access to the metadata.
         Note that no validation is performed.
         Do not use with untrusted data.
         """
-        return cls(meta=dict(row["meta"]), **kwargs)
+        return cls(raw_meta=raw_meta, **kwargs)
 
     @classmethod
     def from_meta(cls, meta: dict[str, Any], **kwargs):
         """Return an object from a metadata dict.
 
+        The object is written whole when saved.
         Note that no validation is performed.
         Do not use with untrusted data.
         """
@@ -207,6 +525,8 @@ class BaseObject:
             assert isinstance(self.connection, asyncpg.Connection)
             async with self.connection.transaction():
                 await self._delete()
+        self._invalidate_cached(self.connection, [self.id])
+        await db.mark_written()
 
     async def _delete(self) -> None:
         assert self.connection is not None
@@ -223,61 +543,399 @@ class BaseObject:
     async def delete_children(self) -> None:
         pass
 
+    @classmethod
+    async def delete_many(
+        cls,
+        ids: list[int],
+        connection: asyncpg.Connection | DB | None = None,
+        notify: bool = True,
+        initiator: str | None = None,
+    ) -> list[int]:
+        """Delete multiple objects of the same type at once.
+
+        Objects, their children and their fulltext index are deleted
+        in a single transaction. Returns a list of deleted object IDs
+        (objects which do not exist are skipped).
+        """
+        if not ids:
+            return []
+        async with transaction(connection) as conn:
+            await cls.delete_children_many(conn, ids)
+            res = await conn.fetch(
+                f"DELETE FROM {cls.object_type}s WHERE id = ANY($1) RETURNING id",
+                ids,
+            )
+            deleted = [row["id"] for row in res]
+            await conn.execute(
+                "DELETE FROM ft WHERE object_type = $1 AND id = ANY($2)",
+                ObjectTypeId[cls.object_type.upper()].value,
+                deleted,
+            )
+        cls._invalidate_cached(conn, deleted)
+        await db.mark_written()
+        if notify and deleted:
+            await msg(
+                "objects_changed",
+                object_type=cls.object_type,
+                objects=deleted,
+                initiator=initiator,
+            )
+        log.info(f"Deleted {len(deleted)} {cls.object_type}s")
+        return deleted
+
+    @classmethod
+    def _invalidate_cached(cls, connection, ids: list[int]) -> None:
+        """Drop cached metadata of written objects.
+
+        Loads started later do not share queries already running either.
+        Write listeners (such as the browse cache) are notified too.
+        When the objects were written within an enclosing transaction,
+        this is repeated once it commits, since loads running until then
+        still read the previous data.
+        """
+
+        def invalidate() -> None:
+            object_cache.invalidate(cls.object_type, ids)
+            get_loader(cls.object_type).forget(ids)
+            for listener in write_listeners:
+                listener(cls.object_type, ids)
+
+        invalidate()
+        on_commit(connection, invalidate)
+
+    @classmethod
+    async def delete_children_many(cls, connection, ids: list[int]) -> None:
+        """Bulk counterpart of delete_children"""
+        pass
+
+    @classmethod
+    async def _after_save(cls, connection, ids: list[int]) -> None:
+        """Update data derived from saved objects.
+
+        Called by both `save` and `save_many` within the save transaction.
+        """
+        pass
+
+    def _restore_dirty(self, keys: set[str] | None) -> None:
+        """Mark keys of a save which did not commit as modified again"""
+        if keys is None or self._dirty is None:
+            self._dirty = None
+        else:
+            self._dirty |= keys
+
+    def _rollback_save(self, keys: set[str] | None, is_new: bool) -> None:
+        if is_new:
+            # The inserted row does not exist
+            self.meta.pop("id", None)
+        self._restore_dirty(keys)
+
     async def save(self, notify: bool = True, initiator: str = None) -> None:
         assert self.connection is not None
-        if isinstance(self.connection, DB):
-            pool = await self.connection.pool()
-            async with pool.acquire() as conn:
-                async with conn.transaction():
-                    await self._save()
-        elif (
-            hasattr(self.connection, "is_in_transaction")
-            and self.connection.is_in_transaction()
-        ):
-            await self._save()
-        else:
-            async with self.connection.transaction():
-                await self._save()
+        if self.id is not None and not self.is_dirty:
+            # Do not format the object, it would decode lazy metadata
+            log.trace(
+                f"Skipping save of unchanged {self.object_type} ID {self.id}",
+                user=self.username,
+            )
+            return
+
+        # Saved keys are set aside until the transaction ends. Keys modified
+        # meanwhile are tracked as usual.
+        keys, self._dirty = self._dirty, set()
+        is_new = self.id is None
+
+        def rollback() -> None:
+            self._rollback_save(keys, is_new)
+
+        try:
+            async with transaction(self.connection) as conn:
+                tracked = on_rollback(conn, rollback)
+                object_id = await self._save(conn, keys)
+        except BaseException:
+            # Idempotent, so it does not matter whether the transaction
+            # already called it
+            rollback()
+            raise
+        if not tracked:
+            # The caller may still roll back the transaction
+            self._restore_dirty(keys)
+
+        self._invalidate_cached(conn, [object_id])
+        await db.mark_written()
         if notify:
             await msg(
                 "objects_changed",
                 object_type=self.object_type,
-                objects=[self.id],
+                objects=[object_id],
                 initiator=initiator,
             )
         log.info(f"Saved {self}", user=self.username)
 
-    async def _save(self) -> None:
-        assert self.connection is not None
-        if self.id is None:
-            await self._insert()
+    async def _save(self, conn: asyncpg.Connection, keys: set[str] | None) -> int:
+        """Write the object using the transaction connection.
+
+        `keys` are the modified keys (None for all). Returns the object ID.
+        """
+        if (object_id := self.id) is None:
+            object_id = await self._insert(conn)
+            await self._update_ft(conn, None, is_new=True)
+            # The ID is not known until the object is inserted
+            keys = {"id"}
         else:
-            await self.connection.execute(
-                "DELETE FROM ft WHERE object_type = $1 AND id = $2",
-                ObjectTypeId[self.object_type.upper()].value,
-                self.id,
+            await self._update_ft(conn, keys)
+        await self._update(conn, keys)
+        await self._after_save(conn, [object_id])
+        return object_id
+
+    @classmethod
+    async def save_many(
+        cls,
+        objects: list,
+        connection: asyncpg.Connection | DB | None = None,
+        notify: bool = True,
+        initiator: str | None = None,
+    ) -> None:
+        """Save multiple objects of the same type at once.
+
+        All objects are persisted in a single transaction using multi-row
+        statements, changed fulltext index rows are bulk-loaded using COPY
+        and a single notification is sent for all saved objects.
+        Unchanged objects are skipped.
+        """
+        objects = [obj for obj in objects if obj.id is None or obj.is_dirty]
+        if not objects:
+            return
+        for obj in objects:
+            assert (
+                obj.object_type == cls.object_type
+            ), f"Unable to save {obj} as {cls.object_type}"
+        if connection is None:
+            connection = objects[0].connection
+
+        # See `save`. The same object may be passed multiple times.
+        states = {obj: (obj._dirty, obj.id is None) for obj in objects}
+
+        def rollback() -> None:
+            for obj, (keys, is_new) in states.items():
+                obj._rollback_save(keys, is_new)
+
+        try:
+            async with transaction(connection) as conn:
+                tracked = on_rollback(conn, rollback)
+                await cls._save_many(conn, objects)
+                for obj in states:
+                    obj._dirty = set()
+        except BaseException:
+            rollback()
+            raise
+        if not tracked:
+            for obj, (keys, _) in states.items():
+                obj._restore_dirty(keys)
+
+        cls._invalidate_cached(conn, [obj.id for obj in objects])
+        await db.mark_written()
+        if notify:
+            await msg(
+                "objects_changed",
+                object_type=cls.object_type,
+                objects=list(dict.fromkeys(obj.id for obj in objects)),
+                initiator=initiator,
             )
-        ft_payloads = [
-            (
-                self.id,
-                ObjectTypeId[self.object_type.upper()].value,
-                weight,
-                word,
+        log.info(f"Saved {len(objects)} {cls.object_type}s", user=objects[0].username)
+
+    @classmethod
+    async def _save_many(cls, conn: asyncpg.Connection, objects: list) -> None:
+        now = time.time()
+        object_type = ObjectTypeId[cls.object_type.upper()].value
+
+        # Allocate IDs for new objects, so all of them can be inserted
+        # using multi-row statements.
+
+        new_objects = [obj for obj in objects if obj.id is None]
+        new_ids: set[int] = set()
+        if new_objects:
+            res = await conn.fetch(
+                """
+                SELECT nextval(pg_get_serial_sequence($1, 'id')) AS id
+                FROM generate_series(1, $2)
+                """,
+                f"{cls.object_type}s",
+                len(new_objects),
+            )
+            for obj, row in zip(new_objects, res):
+                obj.meta["id"] = row["id"]
+                obj.meta["ctime"] = now
+                new_ids.add(row["id"])
+
+        # The same object may be passed multiple times. Last one wins.
+
+        unique = list({obj.id: obj for obj in objects}.values())
+        for obj in unique:
+            obj.meta["mtime"] = now
+
+        # New objects are inserted, existing objects with unknown changes
+        # are written whole and only the changed keys of the rest are patched.
+        # Existing objects are never inserted, so rows deleted meanwhile
+        # (with their children) are not resurrected.
+
+        inserted: list[BaseObject] = []
+        replaced: list[BaseObject] = []
+        patches: dict[tuple[str, ...], list[list[Any]]] = {}
+        for obj in unique:
+            if obj.id in new_ids:
+                inserted.append(obj)
+                continue
+            if obj._dirty is None:
+                replaced.append(obj)
+                continue
+            keys = obj._dirty | {"mtime"}
+            patch_columns = obj._dirty_columns(keys)
+            patches.setdefault(patch_columns, []).append(
+                obj._patch_args(keys, patch_columns)
             )
-            for word, weight in create_ft_index(self.meta).items()
+
+        for patch_columns, patch_args in patches.items():
+            await conn.executemany(cls._patch_query(patch_columns), patch_args)
+
+        if replaced:
+            await conn.executemany(
+                cls._replace_query(),
+                [obj._replace_args() for obj in replaced],
+            )
+
+        columns = ["id", *cls.db_columns, "meta"]
+        for i in range(0, len(inserted), BULK_CHUNK_SIZE):
+            qargs: list[Any] = []
+            rows: list[str] = []
+            for obj in inserted[i : i + BULK_CHUNK_SIZE]:
+                values = [obj.id] + [obj.meta[col] for col in cls.db_columns]
+                values.append(obj.meta)
+                placeholders = range(len(qargs) + 1, len(qargs) + len(values) + 1)
+                rows.append("(" + ", ".join(f"${j}" for j in placeholders) + ")")
+                qargs.extend(values)
+            await conn.execute(
+                f"""
+                INSERT INTO {cls.object_type}s ({', '.join(columns)})
+                VALUES {', '.join(rows)}
+                """,
+                *qargs,
+            )
+
+        await cls._after_save(conn, [obj.id for obj in unique])
+
+        # Rebuild fulltext index of objects with changed indexed keys
+
+        if not cls.ft_enabled:
+            return
+
+        ft_changed = [
+            obj for obj in unique if obj.id in new_ids or cls._ft_affected(obj._dirty)
         ]
+        if not ft_changed:
+            return
 
-        await self.connection.executemany(
-            """
-            INSERT INTO ft (id, object_type, weight, value)
-            VALUES ($1, $2, $3, $4)
-            """,
-            ft_payloads,
+        await conn.execute(
+            "DELETE FROM ft WHERE object_type = $1 AND id = ANY($2)",
+            object_type,
+            [obj.id for obj in ft_changed],
         )
-        await self._update()
+        records = [
+            (obj.id, object_type, int(weight), word)
+            for obj in ft_changed
+            for word, weight in create_ft_index(obj.meta, cls.ft_weights).items()
+        ]
+        if records:
+            await conn.copy_records_to_table(
+                "ft",
+                records=records,
+                columns=["id", "object_type", "weight", "value"],
+            )
 
-    async def _insert(self) -> None:
-        assert self.connection is not None
+    @classmethod
+    def _ft_affected(cls, keys: set[str] | None) -> bool:
+        """Return True if modifying the keys may change the fulltext index"""
+        if not cls.ft_enabled:
+            return False
+        if keys is None:
+            return True
+        return any(get_ft_weight(key, cls.ft_weights) for key in keys)
+
+    async def _update_ft(
+        self,
+        conn: asyncpg.Connection,
+        keys: set[str] | None,
+        is_new: bool = False,
+    ) -> None:
+        """Synchronize the fulltext index with the object metadata.
+
+        Only inserted, removed and re-weighted words are written.
+        When none of the modified `keys` is indexed, the index
+        is not touched at all. The decision depends only on the keys,
+        so no state needs to be updated when the save commits.
+        Words already inserted by a concurrent save of the same object
+        are re-weighted. Objects of types with fulltext disabled are not indexed.
+        """
+        if not self.ft_enabled:
+            return
+        if not is_new and not self._ft_affected(keys):
+            return
+
+        object_type = ObjectTypeId[self.object_type.upper()].value
+        old_index: dict[str, float] = {}
+        if not is_new:
+            res = await conn.fetch(
+                "SELECT value, weight FROM ft WHERE object_type = $1 AND id = $2",
+                object_type,
+                self.id,
+            )
+            old_index = {row["value"]: row["weight"] for row in res}
+        new_index = create_ft_index(self.meta, self.ft_weights)
+
+        removed = [word for word in old_index if word not in new_index]
+        changed = [word for word in new_index if word in old_index]
+        changed = [word for word in changed if old_index[word] != new_index[word]]
+        inserted = [word for word in new_index if word not in old_index]
+
+        if removed:
+            await conn.execute(
+                """
+                DELETE FROM ft
+                WHERE object_type = $1 AND id = $2 AND value = ANY($3)
+                """,
+                object_type,
+                self.id,
+                removed,
+            )
+
+        if changed:
+            await conn.execute(
+                """
+                UPDATE ft SET weight = u.weight
+                FROM unnest($3::VARCHAR[], $4::INTEGER[]) AS u(value, weight)
+                WHERE ft.object_type = $1 AND ft.id = $2 AND ft.value = u.value
+                """,
+                object_type,
+                self.id,
+                changed,
+                [int(new_index[word]) for word in changed],
+            )
+
+        if inserted:
+            await conn.execute(
+                """
+                INSERT INTO ft (id, object_type, weight, value)
+                SELECT $1, $2, u.weight, u.value
+                FROM unnest($3::VARCHAR[], $4::INTEGER[]) AS u(value, weight)
+                ON CONFLICT (id, object_type, value)
+                DO UPDATE SET weight = EXCLUDED.weight
+                """,
+                self.id,
+                object_type,
+                inserted,
+                [int(new_index[word]) for word in inserted],
+            )
+
+    async def _insert(self, conn: asyncpg.Connection) -> int:
         self.meta["ctime"] = self.meta["mtime"] = time.time()
         placeholders = ", ".join(
             ["$" + str(i) for i in range(1, len(self.db_columns) + 2)]
@@ -288,24 +946,61 @@ class BaseObject:
             """
         qargs = [self.meta[col] for col in self.db_columns] + [self.meta]
 
-        res = await self.connection.fetch(query, *qargs)
+        res = await conn.fetch(query, *qargs)
         self.meta["id"] = res[0]["id"]
+        return res[0]["id"]
 
-    async def _update(self) -> None:
-        assert self.connection is not None
+    async def _update(self, conn: asyncpg.Connection, keys: set[str] | None) -> None:
         self.meta["mtime"] = time.time()
+        if keys is not None:
+            keys = keys | {"mtime"}
+            columns = self._dirty_columns(keys)
+            await conn.execute(
+                self._patch_query(columns),
+                *self._patch_args(keys, columns),
+            )
+            return
+        await conn.execute(self._replace_query(), *self._replace_args())
+
+    @classmethod
+    def _replace_query(cls) -> str:
+        """Return a query writing all columns and the whole metadata"""
         upcols = ", ".join(
-            [col + " = $" + str(i) for i, col in enumerate(self.db_columns, 1)]
+            [col + " = $" + str(i) for i, col in enumerate(cls.db_columns, 1)]
         )
-        query = f"""
-            UPDATE {self.object_type}s
+        return f"""
+            UPDATE {cls.object_type}s
             SET {upcols},
-            meta=${len(self.db_columns) + 1}
-            WHERE id = ${len(self.db_columns) + 2}
+            meta=${len(cls.db_columns) + 1}
+            WHERE id = ${len(cls.db_columns) + 2}
             """
 
-        qargs = [self.meta[col] for col in self.db_columns] + [
-            self.meta,
-            self.id,
-        ]
-        await self.connection.execute(query, *qargs)
+    def _replace_args(self) -> list[Any]:
+        return [self.meta[col] for col in self.db_columns] + [self.meta, self.id]
+
+    #
+    # Partial updates
+    #
+
+    def _dirty_columns(self, keys: set[str]) -> tuple[str, ...]:
+        return tuple(col for col in self.db_columns if col in keys)
+
+    @classmethod
+    def _patch_query(cls, columns: tuple[str, ...]) -> str:
+        """Return a query updating the given columns and changed meta keys.
+
+        Changed keys are merged to the stored metadata, removed keys
+        are deleted from it. Arguments are provided by `_patch_args`.
+        """
+        upcols = "".join([f"{col} = ${i}, " for i, col in enumerate(columns, 1)])
+        return f"""
+            UPDATE {cls.object_type}s
+            SET {upcols}meta = (meta || ${len(columns) + 1}::JSONB)
+                - ${len(columns) + 2}::TEXT[]
+            WHERE id = ${len(columns) + 3}
+            """
+
+    def _patch_args(self, keys: set[str], columns: tuple[str, ...]) -> list[Any]:
+        patch = {key: self.meta[key] for key in keys if key in self.meta}
+        removed = [key for key in keys if key not in self.meta]
+        return [self.meta.get(col) for col in columns] + [patch, removed, self.id]
@@ -5,7 +5,11 @@ from nebula.objects.item import Item
 
 
 class Bin(BaseObject):
+    __slots__ = ("_items",)
+
     object_type: str = "bin"
+    cacheable: bool = True
+    ft_enabled: bool = False  # Not searched, so not worth indexing
     db_columns: list[str] = [
         "bin_type",
     ]
@@ -14,26 +18,27 @@ class Bin(BaseObject):
         "bin_type": 0,
     }
 
-    _items: list[Item] | None = None
+    _items: list[Item] | None
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._items = None
 
     async def get_items(self) -> list[Item]:
         if self._items is None:
-            self._items = []
+            # Assets of the bin are usually hot (scheduled for today),
+            # so they are resolved using the object cache when enabled.
             res = await db.fetch(
-                """
-                SELECT i.meta as imeta, a.meta as ameta
-                FROM items i LEFT JOIN assets a
-                ON i.id_asset = a.id
-                WHERE i.id_bin = $1 ORDER BY i.position ASC
-                """,
+                "SELECT meta FROM items WHERE id_bin = $1 ORDER BY position ASC",
                 self.id,
             )
-            for row in res:
-                item = Item.from_meta(row["imeta"])
-                if row["ameta"]:
-                    asset = Asset.from_meta(row["ameta"])
+            items = [Item.from_row(row) for row in res]
+            asset_ids = [item["id_asset"] for item in items if item["id_asset"]]
+            assets = {asset.id: asset for asset in await Asset.load_many(asset_ids)}
+            for item in items:
+                if (asset := assets.get(item["id_asset"])) is not None:
                     item.asset = asset
-                self._items.append(item)
+            self._items = items
         return self._items
 
     @property
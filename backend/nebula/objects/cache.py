@@ -0,0 +1,103 @@
+import time
+from collections import OrderedDict
+from typing import Any
+
+import orjson
+
+from nebula.config import config
+
+
+class ObjectCache:
+    """Process-local LRU cache of object metadata.
+
+    Entries are keyed by object type and ID and are evicted when
+    the cache exceeds its size or when they are older than the TTL.
+    Metadata is stored serialized. Objects are created from the payload
+    in lazy mode, so every hit gets a private copy decoded on demand.
+
+    Entries are invalidated when objects are saved and from
+    `objects_changed` messages, so several server workers stay coherent.
+    Metadata read before an invalidation is not stored, since a load
+    started before a save may finish after it.
+    """
+
+    def __init__(self, size: int = 0, ttl: float = 60) -> None:
+        self.size = size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # Incremented on every invalidation
+        self.generation = 0
+        self.data: OrderedDict[tuple[str, int], tuple[float, bytes]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    def get(self, object_type: str, id: int) -> bytes | None:
+        """Return JSON encoded metadata of the cached object or None"""
+        key = (object_type, id)
+        if (entry := self.data.get(key)) is None:
+            self.misses += 1
+            return None
+        timestamp, payload = entry
+        if time.monotonic() - timestamp > self.ttl:
+            del self.data[key]
+            self.misses += 1
+            return None
+        self.data.move_to_end(key)
+        self.hits += 1
+        return payload
+
+    def put(
+        self,
+        object_type: str,
+        id: int,
+        meta: dict[str, Any] | str,
+        generation: int,
+    ) -> None:
+        """Store object metadata (dict or its JSON encoded form).
+
+        `generation` is the cache generation the metadata was read at.
+        """
+        if not self.enabled or generation != self.generation:
+            return
+        key = (object_type, id)
+        if isinstance(meta, str):
+            payload = meta.encode()
+        else:
+            payload = orjson.dumps(meta)
+        self.data[key] = (time.monotonic(), payload)
+        self.data.move_to_end(key)
+        while len(self.data) > self.size:
+            self.data.popitem(last=False)
+
+    def invalidate(self, object_type: str, ids: list[int]) -> None:
+        self.generation += 1
+        for id in ids:
+            self.data.pop((object_type, id), None)
+
+    def clear(self) -> None:
+        self.data.clear()
+
+    def handle_message(self, topic: str, data: dict[str, Any]) -> None:
+        """Invalidate entries affected by a messaging message"""
+        if topic != "objects_changed":
+            return
+        if (object_type := data.get("object_type")) is None:
+            return
+        self.invalidate(object_type, data.get("objects") or [])
+
+    def stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": self.size,
+            "ttl": self.ttl,
+            "entries": len(self.data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0,
+        }
+
+
+object_cache = ObjectCache(config.object_cache_size, config.object_cache_ttl)
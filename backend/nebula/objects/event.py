@@ -2,7 +2,10 @@ from nebula.objects.base import BaseObject
 
 
 class Event(BaseObject):
+    __slots__ = ()
+
     object_type: str = "event"
+    cacheable: bool = True
     db_columns: list[str] = [
         "id_channel",
         "start",
@@ -18,3 +21,7 @@ class Event(BaseObject):
 
     async def delete_children(self):
         await self.connection.execute("DELETE FROM bins WHERE id_magic = $1", self.id)
+
+    @classmethod
+    async def delete_children_many(cls, connection, ids: list[int]) -> None:
+        await connection.execute("DELETE FROM bins WHERE id_magic = ANY($1)", ids)
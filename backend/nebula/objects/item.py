@@ -5,7 +5,10 @@ from nebula.objects.base import BaseObject
 
 
 class Item(BaseObject):
+    __slots__ = ("_asset",)
+
     object_type: str = "item"
+    ft_enabled: bool = False  # Not searched, so not worth indexing
     db_columns: list[str] = [
         "id_asset",
         "id_bin",
@@ -17,7 +20,11 @@ class Item(BaseObject):
         "id_asset": None,
     }
 
-    _asset: Asset | None = None
+    _asset: Asset | None
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._asset = None
 
     def __getitem__(self, key: str) -> Any:
         # item has its own value
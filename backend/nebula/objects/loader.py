@@ -0,0 +1,103 @@
+import asyncio
+
+import asyncpg
+
+from nebula.db import DB, db
+
+
+class ObjectLoader:
+    """Batching and coalescing loader of objects of one type.
+
+    IDs requested during one event loop iteration are collected
+    and resolved using a single `WHERE id = ANY($1)` query.
+    Concurrent requests of the same ID share one result.
+
+    The loader resolves to JSON encoded metadata (or None if the object
+    does not exist), which is decoded lazily by the objects created from
+    it. Loaded data is not retained once the batch is resolved.
+
+    Objects written meanwhile must be passed to `forget`, so later loads
+    do not share a query started before the write.
+    """
+
+    def __init__(self, object_type: str) -> None:
+        self.object_type = object_type
+        self.pending: dict[int, asyncio.Future] = {}
+        self.inflight: dict[int, asyncio.Future] = {}
+        self.tasks: set[asyncio.Task] = set()
+
+    def load(self, id: int) -> asyncio.Future:
+        """Return a future resolving to the metadata of the given object"""
+        future = self.pending.get(id) or self.inflight.get(id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            if not self.pending:
+                loop.call_soon(self.dispatch)
+            self.pending[id] = future
+        # The future is shared, so one cancelled awaiter
+        # must not cancel the others.
+        return asyncio.shield(future)
+
+    async def load_many(self, ids: list[int]) -> dict[int, str]:
+        """Return a dict of encoded metadata of the existing objects"""
+        futures = [self.load(id) for id in ids]
+        results = await asyncio.gather(*futures)
+        return {id: meta for id, meta in zip(ids, results) if meta is not None}
+
+    def forget(self, ids: list[int]) -> None:
+        """Do not share queries already running with later loads of the IDs"""
+        for id in ids:
+            self.inflight.pop(id, None)
+
+    def dispatch(self) -> None:
+        batch = self.pending
+        self.pending = {}
+        self.inflight.update(batch)
+        # The event loop keeps only weak references to tasks
+        task = asyncio.create_task(self.fetch(batch))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def query(
+        self,
+        ids: list[int],
+        connection: asyncpg.Connection | DB | None = None,
+    ) -> dict[int, str]:
+        """Return encoded metadata of the existing objects (without batching)"""
+        res = await (connection or db).fetch(
+            f"""
+            SELECT id, meta::text AS meta FROM {self.object_type}s
+            WHERE id = ANY($1)
+            """,
+            ids,
+        )
+        return {row["id"]: row["meta"] for row in res}
+
+    async def fetch(self, batch: dict[int, asyncio.Future]) -> None:
+        try:
+            found = await self.query(list(batch.keys()))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        else:
+            for id, future in batch.items():
+                if not future.done():
+                    future.set_result(found.get(id))
+        finally:
+            for id, future in batch.items():
+                # A later batch may be loading the object already
+                if self.inflight.get(id) is future:
+                    del self.inflight[id]
+
+
+loaders: dict[str, ObjectLoader] = {}
+
+
+def get_loader(object_type: str) -> ObjectLoader:
+    """Return a shared loader for the given object type"""
+    if object_type not in loaders:
+        loaders[object_type] = ObjectLoader(object_type)
+    return loaders[object_type]
@@ -42,6 +42,8 @@ class UserRights(BaseModel):
 
 
 class User(BaseObject):
+    __slots__ = ()
+
     object_type: str = "user"
     db_columns: list[str] = [
         "login",
@@ -61,6 +63,7 @@ class User(BaseObject):
     @name.setter
     def name(self, value):
         self.meta["login"] = value
+        self.mark_dirty("login")
 
     @classmethod
     async def by_login(cls, login: str) -> "User":
@@ -95,6 +98,7 @@ class User(BaseObject):
 
     def set_password(self, password: str):
         self.meta["password"] = hash_password(password)
+        self.mark_dirty("password")
 
     def can(
         self,
@@ -1,3 +1,5 @@
+import asyncio
+
 from nxtools import format_time
 
 import nebula
@@ -89,8 +91,9 @@ class SolverPlugin:
         if (self._needed_duration is None) or force:
             dur = self.next_event["start"] - self.event["start"]
             items = await self.bin.get_items()
+            # Assets of all items are loaded using a single query
+            await asyncio.gather(*[item.get_asset() for item in items])
             for item in items:
-                await item.get_asset()
                 if item.id == self.placeholder.id:
                     continue
                 dur -= item.duration
@@ -195,6 +198,7 @@ class SolverPlugin:
             return
 
         i = 0
+        to_save: list[nebula.Item] = []
         items = await self.bin.get_items()
         for item in items:
             i += 1
@@ -204,10 +208,12 @@ class SolverPlugin:
                     i += 1
                     new_item["id_bin"] = self.bin.id
                     new_item["position"] = i
-                    await new_item.save(notify=False)
+                    to_save.append(new_item)
+                continue
             if item["position"] != i:
                 item["position"] = i
-                await item.save(notify=False)
+                to_save.append(item)
+        await nebula.Item.save_many(to_save, notify=False)
 
         if self.bin.id not in self.affected_bins:
             self.affected_bins.append(self.bin.id)
@@ -73,7 +73,7 @@ class Redis:
         return cls.redis_pool.pubsub()
 
     @classmethod
-    async def publish(cls, message: str) -> None:
+    async def publish(cls, message: str | bytes) -> None:
         """Publish a message to a Redis channel"""
         if not cls.connected:
             await cls.connect()
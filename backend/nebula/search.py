@@ -0,0 +1,74 @@
+"""Fulltext search.
+
+Objects are indexed in the `ft` table: every word of their indexed
+metadata is stored along with the object ID, object type and the weight
+of the key the word comes from (see `create_ft_index`).
+
+Search terms are matched as word prefixes ("trek" matches "trekkie").
+An object matches a query when it matches all of its terms. Its score
+is a sum of the best weights matched by each term, so a term found in
+the title ranks higher than one found in the description.
+
+Lookups use the `idx_ft_search` index on (object_type, value) which
+includes the id and weight columns, so the ft table itself is not read.
+"""
+
+from typing import Any, Callable
+
+from nxtools import slugify
+
+from nebula.enum import ObjectTypeId
+
+
+def search_terms(query: str, min_length: int = 3) -> list[str]:
+    """Return a sorted list of unique search terms of a query string."""
+    return sorted(slugify(query, make_set=True, min_length=min_length))
+
+
+def prefix_match(term: str, bind: Callable[[Any, str], str] | None) -> str:
+    """Return a condition matching ft values starting with the term.
+
+    Without `bind`, the term is inlined (no need to sanitize it, slugified
+    strings are safe). Otherwise `bind(value, cast)` must return a query
+    parameter placeholder of the value. The prefix is matched as a range
+    of values then, because the planner can use the index for a LIKE
+    condition only when it knows the pattern (not in generic plans).
+    """
+    if bind is None:
+        return f"value LIKE '{term}%'"
+    upper = term[:-1] + chr(ord(term[-1]) + 1)
+    return f"value ~>=~ {bind(term, 'TEXT')} AND value ~<~ {bind(upper, 'TEXT')}"
+
+
+def build_search_query(
+    terms: list[str],
+    object_type: str = "asset",
+    bind: Callable[[Any, str], str] | None = None,
+) -> str:
+    """Return a SQL query of objects matching all the given search terms.
+
+    The query returns `id` and `score` columns and it is meant to be used
+    as a subquery (`id IN (SELECT id FROM (...) AS search)`) or joined
+    with the object table to order the results by the score.
+    Terms must be slugified (see `search_terms`). When `bind` is given,
+    terms are passed as query parameters (see `prefix_match`).
+    """
+    assert terms, "No search terms provided"
+    type_id = ObjectTypeId[object_type.upper()].value
+
+    branches = [
+        f"""
+        SELECT id, MAX(weight) AS score FROM ft
+        WHERE object_type = {type_id} AND {prefix_match(term, bind)}
+        GROUP BY id
+        """
+        for term in terms
+    ]
+    if len(branches) == 1:
+        return branches[0]
+
+    return f"""
+        SELECT id, SUM(score) AS score
+        FROM ({' UNION ALL '.join(branches)}) AS matches
+        GROUP BY id HAVING COUNT(*) = {len(branches)}
+        """
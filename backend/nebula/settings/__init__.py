@@ -1,7 +1,10 @@
 from typing import Any
 
+import asyncpg
+
 from nebula.config import config
 from nebula.db import db
+from nebula.helpers.views import built_conditions, load_view_conditions
 from nebula.log import log
 from nebula.settings.metatypes import MetaType
 from nebula.settings.models import (
@@ -97,3 +100,11 @@ async def load_settings():
     for key in new_settings.dict().keys():
         if key in settings.dict().keys():
             setattr(settings, key, getattr(new_settings, key))
+
+    # Views whose memberships are not built from their current definition
+    # are evaluated on every browse (see nebula.helpers.views)
+    try:
+        await load_view_conditions(db)
+    except asyncpg.PostgresError:
+        log.traceback("Unable to load view conditions")
+        built_conditions.clear()
@@ -38,6 +38,11 @@ class MetaType(SettingsModel):
         False,
         description="Weight of the field in fulltext search",
     )
+    index: bool = Field(
+        False,
+        description="Maintain a database index of the field, "
+        "so filtering and sorting assets by it is fast",
+    )
     aliases: dict[LanguageCode, MetaAlias] = Field(
         default_factory=dict,
         description="Title, description and header for each language",
@@ -69,6 +74,7 @@ class MetaType(SettingsModel):
             metaclass=settings["class"],
             editable=settings.get("editable", False),
             fulltext=settings.get("fulltext", False),
+            index=settings.get("index", False),
             aliases=aliases,
             cs=settings.get("cs"),
             mode=settings.get("mode"),
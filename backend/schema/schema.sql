@@ -88,6 +88,40 @@ CREATE INDEX IF NOT EXISTS idx_status ON assets(id_folder);
 CREATE INDEX IF NOT EXISTS idx_ctime ON assets(ctime);
 CREATE INDEX IF NOT EXISTS idx_mtime ON assets(mtime);
 
+-- Casts of metadata values used by typed expressions and their indexes
+-- (see nebula/metadata/indexes.py). Values which cannot be casted are NULL,
+-- so a stray value does not make writes of the asset fail.
+
+CREATE OR REPLACE FUNCTION meta_integer(value TEXT) RETURNS INTEGER
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+  SELECT CASE WHEN value ~ '^\s*[-+]?[0-9]{1,9}\s*$' THEN value::INTEGER END
+$$;
+
+CREATE OR REPLACE FUNCTION meta_numeric(value TEXT) RETURNS NUMERIC
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+  SELECT CASE
+    WHEN value ~ '^\s*[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]{1,3})?\s*$'
+    THEN value::NUMERIC
+  END
+$$;
+
+-- Assets matching each view (see nebula/helpers/views.py)
+
+CREATE TABLE IF NOT EXISTS public.view_members (
+  id_view INTEGER NOT NULL REFERENCES public.views(id) ON DELETE CASCADE,
+  id_asset INTEGER NOT NULL REFERENCES public.assets(id) ON DELETE CASCADE,
+  CONSTRAINT view_members_pkey PRIMARY KEY (id_view, id_asset)
+);
+
+CREATE INDEX IF NOT EXISTS idx_view_members_asset ON view_members(id_asset);
+
+-- Conditions the memberships of each view were built from
+
+CREATE TABLE IF NOT EXISTS public.view_conditions (
+  id_view INTEGER PRIMARY KEY REFERENCES public.views(id) ON DELETE CASCADE,
+  condition TEXT NOT NULL
+);
+
 -- BINS
 
 CREATE TABLE IF NOT EXISTS public.bins (
@@ -146,9 +180,28 @@ CREATE TABLE IF NOT EXISTS public.ft (
   value VARCHAR(255)
 );
 
-CREATE INDEX IF NOT EXISTS idx_ft_id ON ft(id);
-CREATE INDEX IF NOT EXISTS idx_ft_type ON ft(object_type);
-CREATE INDEX IF NOT EXISTS idx_ft ON ft(value text_pattern_ops);
+-- Each word is indexed once per object. Duplicate rows written
+-- by concurrent saves before the unique index existed are removed first.
+
+DO $$
+BEGIN
+  IF to_regclass('public.idx_ft_object') IS NULL THEN
+    DELETE FROM ft a USING ft b
+    WHERE a.ctid < b.ctid
+      AND a.id = b.id
+      AND a.object_type = b.object_type
+      AND a.value = b.value;
+  END IF;
+END $$;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_ft_object ON ft(id, object_type, value);
+CREATE INDEX IF NOT EXISTS idx_ft_search
+  ON ft(object_type, value text_pattern_ops) INCLUDE (id, weight);
+
+-- Replaced by idx_ft_object and idx_ft_search
+DROP INDEX IF EXISTS idx_ft_id;
+DROP INDEX IF EXISTS idx_ft_type;
+DROP INDEX IF EXISTS idx_ft;
 
 -- AUX
 
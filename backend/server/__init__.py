@@ -8,9 +8,11 @@ from fastapi.websockets import WebSocket, WebSocketDisconnect
 import nebula
 from nebula.exceptions import NebulaException
 from nebula.settings import load_settings
+from server.background_queries import background_queries
 from server.dependencies import current_user_query
 from server.endpoints import install_endpoints
 from server.storage_monitor import storage_monitor
+from server.suggestions import suggestion_index
 from server.video import range_requests_response
 from server.websocket import messaging
 
@@ -233,12 +235,15 @@ async def startup_event():
 
     messaging.start()
     storage_monitor.start()
+    suggestion_index.start()
     nebula.log.success("Server started")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     nebula.log.info("Stopping server...")
+    await nebula.flush_messages()
     await messaging.shutdown()
+    await background_queries.shutdown()
 
     nebula.log.info("Server stopped", handlers=None)
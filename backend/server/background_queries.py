@@ -0,0 +1,34 @@
+import asyncio
+from typing import Any, Coroutine
+
+import nebula
+
+
+class BackgroundQueries:
+    """Database queries running detached from the request which started them.
+
+    Browse totals and facets which do not finish within the latency budget
+    keep running, so their results are cached for subsequent requests.
+    Their number is limited, so they do not exhaust the connection pool
+    shared with the regular requests, and they are cancelled on shutdown.
+    """
+
+    def __init__(self) -> None:
+        self.tasks: set[asyncio.Task] = set()
+        self.semaphore = asyncio.Semaphore(nebula.config.browse_totals_concurrency)
+
+    def start(self, coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+        # Keep references to the tasks, so they are not garbage collected
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    async def shutdown(self) -> None:
+        tasks = list(self.tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+background_queries = BackgroundQueries()
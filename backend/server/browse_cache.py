@@ -0,0 +1,182 @@
+import time
+from collections import OrderedDict
+from typing import Any
+
+import nebula
+from nebula.objects.base import write_listeners
+
+# Entries with more changed candidate assets are dropped
+# instead of being checked
+MAX_SUSPECTS = 100
+
+
+class BrowseCacheEntry:
+    __slots__ = [
+        "timestamp",
+        "check",
+        "check_args",
+        "rows",
+        "cursor",
+        "ids",
+        "suspects",
+    ]
+
+    def __init__(
+        self,
+        check: str,
+        check_args: list[Any],
+        rows: list[dict[str, Any]],
+        cursor: str | None,
+        ids: set[int],
+    ) -> None:
+        self.timestamp = time.monotonic()
+        self.check = check
+        self.check_args = check_args
+        self.rows = rows
+        self.cursor = cursor
+        self.ids = ids
+        self.suspects: set[int] = set()
+
+
+class BrowseCache:
+    """Process-local LRU cache of browse results.
+
+    Entries are keyed by the browse SQL query and its arguments, which
+    cover the view, conditions, search, ordering, page and the access
+    control conditions of the user, so users with the same rights
+    share entries.
+
+    Entries are invalidated when assets are saved or deleted by this
+    process (before the response is sent, so clients read their own
+    writes) and from `objects_changed` messages of other processes:
+
+    - an entry containing a changed asset is dropped immediately
+    - other changed assets are recorded as suspects of the entry. They may
+      have started matching its conditions, so before the entry is used
+      again, a cheap primary key lookup checks whether any of them
+      matches. If so, the entry is dropped.
+
+    The TTL is a safety net for changes without notifications
+    and for time-relative view conditions.
+    """
+
+    def __init__(self, size: int = 0, ttl: float = 10) -> None:
+        self.size = size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # Incremented on every invalidation. Results of queries started
+        # before an invalidation are not stored, since they may be stale.
+        self.generation = 0
+        self.data: OrderedDict[tuple[str, str], BrowseCacheEntry] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    async def get(
+        self,
+        query: str,
+        args: list[Any],
+    ) -> tuple[list[dict[str, Any]], str | None] | None:
+        """Return cached rows and the next page cursor or None"""
+        key = (query, repr(args))
+        if (entry := self.data.get(key)) is None:
+            self.misses += 1
+            return None
+        if time.monotonic() - entry.timestamp > self.ttl:
+            del self.data[key]
+            self.misses += 1
+            return None
+        if entry.suspects and not await self.validate(entry):
+            self.data.pop(key, None)
+            self.misses += 1
+            return None
+        self.data.move_to_end(key)
+        self.hits += 1
+        return entry.rows, entry.cursor
+
+    async def validate(self, entry: BrowseCacheEntry) -> bool:
+        """Check that none of the suspects matches the entry conditions"""
+        suspects = list(entry.suspects)
+        try:
+            matches = await nebula.db.readonly.fetchrow(
+                f"SELECT EXISTS (SELECT 1 {entry.check})",
+                *entry.check_args,
+                suspects,
+            )
+        except Exception:
+            nebula.log.traceback("Unable to validate a browse cache entry")
+            return False
+        if matches[0]:
+            return False
+        entry.suspects.difference_update(suspects)
+        return True
+
+    def put(
+        self,
+        query: str,
+        args: list[Any],
+        check: str,
+        check_args: list[Any],
+        rows: list[dict[str, Any]],
+        cursor: str | None,
+        ids: list[int],
+        generation: int,
+    ) -> None:
+        """Store a browse result.
+
+        `check` is a FROM clause of the query conditions restricted
+        to assets with IDs passed as an argument following `check_args`.
+        `generation` is the cache generation the query was started at.
+        """
+        if not self.enabled or generation != self.generation:
+            return
+        key = (query, repr(args))
+        entry = BrowseCacheEntry(check, check_args, rows, cursor, set(ids))
+        self.data[key] = entry
+        self.data.move_to_end(key)
+        while len(self.data) > self.size:
+            self.data.popitem(last=False)
+
+    def invalidate(self, ids: list[int]) -> None:
+        self.generation += 1
+        changed = set(ids)
+        for key, entry in list(self.data.items()):
+            if not entry.ids.isdisjoint(changed):
+                del self.data[key]
+                continue
+            entry.suspects.update(changed)
+            if len(entry.suspects) > MAX_SUSPECTS:
+                del self.data[key]
+
+    def clear(self) -> None:
+        self.data.clear()
+
+    def handle_write(self, object_type: str, ids: list[int]) -> None:
+        """Invalidate entries affected by objects written by this process"""
+        if object_type == "asset":
+            self.invalidate(ids)
+
+    def handle_message(self, topic: str, data: dict[str, Any]) -> None:
+        """Invalidate entries affected by a messaging message"""
+        if topic != "objects_changed" or data.get("object_type") != "asset":
+            return
+        self.invalidate(data.get("objects") or [])
+
+    def stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": self.size,
+            "ttl": self.ttl,
+            "entries": len(self.data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0,
+        }
+
+
+browse_cache = BrowseCache(
+    nebula.config.browse_cache_size, nebula.config.browse_cache_ttl
+)
+write_listeners.append(browse_cache.handle_write)
@@ -3,6 +3,7 @@ from typing import Annotated
 from fastapi import Depends, Header, Path, Query, Request
 
 import nebula
+from nebula.db import current_client
 from server.session import Session
 from server.utils import parse_access_token
 
@@ -48,7 +49,9 @@ async def current_user(
     session = await Session.check(access_token, request)
     if session is None:
         raise nebula.UnauthorizedException("Invalid access token")
-    return nebula.User(meta=session.user)
+    user = nebula.User(meta=session.user)
+    current_client.set(f"user-{user.id}")
+    return user
 
 
 CurrentUser = Annotated[nebula.User, Depends(current_user)]
@@ -63,7 +66,9 @@ async def current_user_optional(
     session = await Session.check(access_token, None)
     if session is None:
         return None
-    return nebula.User(meta=session.user)
+    user = nebula.User(meta=session.user)
+    current_client.set(f"user-{user.id}")
+    return user
 
 
 CurrentUserOptional = Annotated[nebula.User | None, Depends(current_user_optional)]
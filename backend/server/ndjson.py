@@ -0,0 +1,36 @@
+from typing import Any, AsyncIterator
+
+import orjson
+from fastapi.responses import StreamingResponse
+
+# Rows are sent in chunks of approximately this size (in bytes)
+CHUNK_SIZE = 64 * 1024
+
+
+def ndjson_response(rows: AsyncIterator[Any]) -> StreamingResponse:
+    """Return a response streaming rows as newline-delimited JSON.
+
+    Rows may be JSON serializable objects or already encoded JSON
+    (bytes or str). The first row is sent as soon as it is available,
+    the following ones are sent in chunks, so memory usage does not
+    depend on the number of rows.
+    """
+
+    async def generate() -> AsyncIterator[bytes]:
+        buffer = bytearray()
+        first = True
+        async for row in rows:
+            if isinstance(row, str):
+                row = row.encode()
+            elif not isinstance(row, bytes):
+                row = orjson.dumps(row)
+            buffer += row
+            buffer += b"\n"
+            if first or len(buffer) >= CHUNK_SIZE:
+                yield bytes(buffer)
+                buffer.clear()
+                first = False
+        if buffer:
+            yield bytes(buffer)
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
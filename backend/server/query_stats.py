@@ -0,0 +1,69 @@
+import re
+from typing import Any
+
+from nebula.common import hash_data
+
+# Maximum number of tracked query shapes
+MAX_SHAPES = 500
+
+# Maximum number of labels (e.g. view IDs) kept per shape
+MAX_LABELS = 20
+
+
+class ShapeStats:
+    __slots__ = ["query", "calls", "total_time", "max_time", "labels"]
+
+    def __init__(self, query: str) -> None:
+        self.query = query
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.labels: set[str] = set()
+
+
+class QueryStats:
+    """Process-local execution time statistics of query shapes.
+
+    Compiled queries pass values as bind parameters, so their SQL text
+    identifies a shape: a combination of a view definition, search and
+    condition keys and operators (but not values). Slow shapes point
+    to view definitions or conditions which need an index.
+    """
+
+    def __init__(self) -> None:
+        self.data: dict[str, ShapeStats] = {}
+
+    def record(self, query: str, duration: float, label: str | None = None) -> None:
+        if (shape := self.data.get(query)) is None:
+            if len(self.data) >= MAX_SHAPES:
+                # Forget the least used shape
+                least_used = min(self.data, key=lambda q: self.data[q].calls)
+                del self.data[least_used]
+            shape = self.data[query] = ShapeStats(query)
+        shape.calls += 1
+        shape.total_time += duration
+        shape.max_time = max(shape.max_time, duration)
+        if label is not None and len(shape.labels) < MAX_LABELS:
+            shape.labels.add(label)
+
+    def clear(self) -> None:
+        self.data.clear()
+
+    def stats(self, limit: int = 20) -> list[dict[str, Any]]:
+        """Return statistics of shapes with the highest total time"""
+        shapes = sorted(self.data.values(), key=lambda s: s.total_time, reverse=True)
+        return [
+            {
+                "shape": hash_data(shape.query)[:12],
+                "query": re.sub(r"\s+", " ", shape.query).strip(),
+                "labels": sorted(shape.labels),
+                "calls": shape.calls,
+                "total_time": round(shape.total_time, 4),
+                "mean_time": round(shape.total_time / shape.calls, 4),
+                "max_time": round(shape.max_time, 4),
+            }
+            for shape in shapes[:limit]
+        ]
+
+
+browse_query_stats = QueryStats()
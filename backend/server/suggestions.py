@@ -0,0 +1,160 @@
+import asyncio
+import bisect
+import heapq
+import time
+from typing import Any
+
+import nebula
+from nebula.enum import ObjectTypeId
+from server.background import BackgroundTask
+
+# Maximum number of suggestions returned
+MAX_SUGGESTIONS = 50
+
+# Maximum number of cached prefixes
+CACHE_SIZE = 10000
+
+# Completions of prefixes up to this length are computed in advance,
+# since they match the largest parts of the vocabulary
+PRECOMPUTED_LENGTH = 2
+
+# The vocabulary is rebuilt in this interval (seconds) to drop words
+# of deleted assets and to correct the counts
+REBUILD_INTERVAL = 3600
+
+# Changed assets are indexed in this interval (seconds)
+UPDATE_INTERVAL = 1
+
+ASSET_TYPE_ID = ObjectTypeId.ASSET.value
+
+
+class SuggestionIndex(BackgroundTask):
+    """In-memory prefix index of the asset fulltext vocabulary.
+
+    Words of the `ft` table are kept in a sorted array, so words starting
+    with a prefix form a continuous range found by binary search. Words
+    are ranked by their best weight and then by the number of assets
+    they appear in. Top completions of a prefix are cached and updated
+    in place when a word starting with it is added or its score increases,
+    so the precomputed completions of short prefixes stay warm.
+
+    The vocabulary is loaded at startup and updated from `objects_changed`
+    messages (new words and weights of saved assets). Words are removed
+    only by the periodic rebuild.
+    """
+
+    def initialize(self) -> None:
+        self.words: list[str] = []
+        self.scores: dict[str, tuple[int, int]] = {}
+        self.cache: dict[str, list[str]] = {}
+        self.changed: set[int] = set()
+        self.ready = False
+
+    async def run(self) -> None:
+        last_build = 0.0
+        while not self.shutting_down:
+            if time.monotonic() - last_build > REBUILD_INTERVAL:
+                await self.build()
+                last_build = time.monotonic()
+            elif self.changed:
+                await self.update()
+            await asyncio.sleep(UPDATE_INTERVAL)
+
+    async def build(self) -> None:
+        start_time = time.monotonic()
+        self.changed.clear()
+        res = await nebula.db.readonly.fetch(
+            """
+            SELECT value, MAX(weight), COUNT(*) FROM ft
+            WHERE object_type = $1 GROUP BY value
+            """,
+            ASSET_TYPE_ID,
+        )
+        scores = {row[0]: (row[1] or 0, row[2]) for row in res if row[0]}
+        self.words = sorted(scores)
+        self.scores = scores
+        self.cache = {}
+        await self.precompute()
+        self.ready = True
+        nebula.log.debug(
+            f"Suggestion index of {len(self.words)} words built "
+            f"in {time.monotonic() - start_time:.2f} seconds"
+        )
+
+    async def precompute(self) -> None:
+        prefixes = {word[:PRECOMPUTED_LENGTH] for word in self.words}
+        prefixes |= {prefix[:-1] for prefix in prefixes if len(prefix) > 1}
+        for prefix in sorted(prefixes):
+            self.complete(prefix)
+            # Do not block the event loop for too long
+            await asyncio.sleep(0)
+
+    async def update(self) -> None:
+        """Add words of recently saved assets"""
+        ids = list(self.changed)
+        self.changed.clear()
+        res = await nebula.db.fetch(
+            "SELECT value, weight FROM ft WHERE object_type = $1 AND id = ANY($2)",
+            ASSET_TYPE_ID,
+            ids,
+        )
+        for word, weight in res:
+            if not word:
+                continue
+            weight = weight or 0
+            if (score := self.scores.get(word)) is None:
+                bisect.insort(self.words, word)
+                self.scores[word] = (weight, 1)
+            elif weight > score[0]:
+                self.scores[word] = (weight, score[1])
+            else:
+                continue
+            for i in range(1, len(word) + 1):
+                self.rank(word[:i], word)
+
+    def rank(self, prefix: str, word: str) -> None:
+        """Update cached completions of a prefix after the word score increased"""
+        if (result := self.cache.get(prefix)) is None:
+            return
+        if word not in result:
+            if len(result) >= MAX_SUGGESTIONS and (
+                self.scores[result[-1]] >= self.scores[word]
+            ):
+                return
+            result.append(word)
+        result.sort(key=self.scores.__getitem__, reverse=True)
+        del result[MAX_SUGGESTIONS:]
+
+    def handle_message(self, topic: str, data: dict[str, Any]) -> None:
+        if topic != "objects_changed" or data.get("object_type") != "asset":
+            return
+        self.changed.update(data.get("objects") or [])
+
+    def complete(self, prefix: str) -> list[str]:
+        """Return the best completions of a prefix"""
+        if (result := self.cache.get(prefix)) is not None:
+            return result
+        start = bisect.bisect_left(self.words, prefix)
+        end = bisect.bisect_left(self.words, prefix[:-1] + chr(ord(prefix[-1]) + 1))
+        result = heapq.nlargest(
+            MAX_SUGGESTIONS,
+            self.words[start:end],
+            key=self.scores.__getitem__,
+        )
+        if len(self.cache) >= CACHE_SIZE:
+            # Keep the precomputed completions
+            self.cache = {
+                key: value
+                for key, value in self.cache.items()
+                if len(key) <= PRECOMPUTED_LENGTH
+            }
+        self.cache[prefix] = result
+        return result
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[str]:
+        if not prefix:
+            return []
+        return self.complete(prefix)[:limit]
+
+
+suggestion_index = SuggestionIndex()
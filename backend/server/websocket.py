@@ -8,8 +8,11 @@ from fastapi.websockets import WebSocket, WebSocketDisconnect
 
 import nebula
 from nebula.common import json_dumps, json_loads
+from nebula.objects.cache import object_cache
 from server.background import BackgroundTask
+from server.browse_cache import browse_cache
 from server.session import Session
+from server.suggestions import suggestion_index
 
 ALWAYS_SUBSCRIBE = [
     "server.started",
@@ -120,7 +123,7 @@ class Messaging(BackgroundTask):
                 if raw_message is None:
                     await asyncio.sleep(0.01)
                     if time.time() - last_msg > 3:
-                        message = {"topic": "heartbeat"}
+                        message: dict[str, Any] = {"topic": "heartbeat"}
                         last_msg = time.time()
                     else:
                         continue
@@ -133,6 +136,9 @@ class Messaging(BackgroundTask):
                         "topic": data[3],
                         "data": data[4],
                     }
+                    object_cache.handle_message(message["topic"], message["data"])
+                    browse_cache.handle_message(message["topic"], message["data"])
+                    suggestion_index.handle_message(message["topic"], message["data"])
 
                 clients = list(self.clients.values())
                 for client in clients:
@@ -1,6 +1,9 @@
 import json
 import os
 
+from nebula.metadata.indexes import update_meta_indexes
+from nebula.objects.asset import Asset
+
 
 async def setup_metatypes(meta_types, db):
     languages = ["en", "cs"]
@@ -15,6 +18,7 @@ async def setup_metatypes(meta_types, db):
                 header = alias
             aliases[lang][key] = [alias, header, description]
 
+    indexed = {}
     for key, data in meta_types.items():
         meta_type = {}
         meta_type["ns"] = data["ns"]
@@ -22,7 +26,7 @@ async def setup_metatypes(meta_types, db):
         meta_type["class"] = data["type"].value
         meta_type["aliases"] = {}
 
-        for opt in ["cs", "fulltext", "mode", "format", "default"]:
+        for opt in ["cs", "fulltext", "index", "mode", "format", "default"]:
             if opt in data:
                 meta_type[opt] = data[opt]
 
@@ -46,7 +50,12 @@ async def setup_metatypes(meta_types, db):
         )
 
         if data.get("index", False):
-            idx_name = "idx_" + key.replace("/", "_")
-            await db.execute(
-                f"CREATE INDEX IF NOT EXISTS {idx_name} ON assets((meta->>'{key}'))",
-            )
+            indexed[key] = data["type"]
+
+    # Database columns are indexed already
+    await update_meta_indexes(
+        db,
+        indexed,
+        exclude=["id", *Asset.db_columns],
+        legacy_keys=list(meta_types),
+    )
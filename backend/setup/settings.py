@@ -5,6 +5,7 @@ import httpx
 
 from nebula.common import import_module
 from nebula.config import config
+from nebula.helpers.views import rebuild_view_members
 from nebula.log import log
 from nebula.settings.models import (
     ActionSettings,
@@ -108,6 +109,7 @@ async def setup_settings(db):
         """
     )
     log.trace(f"Saved {len(TEMPLATE['views'])} views")
+    await rebuild_view_members(db, TEMPLATE["views"])
 
     # Setup folders
 
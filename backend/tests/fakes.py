@@ -0,0 +1,120 @@
+"""Test doubles of database connections.
+
+Tests using them do not need a running Postgres. Queries are recorded,
+so the tests can check what would have been sent to the database.
+"""
+
+import re
+from contextlib import asynccontextmanager
+from typing import Any, Callable
+
+import asyncpg
+
+from nebula.db import DB
+
+
+def normalize(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip()
+
+
+class FakeTransaction:
+    def __init__(self, conn: "FakeConnection") -> None:
+        self.conn = conn
+
+    async def __aenter__(self) -> None:
+        self.conn.depth += 1
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.conn.depth -= 1
+        if self.conn.depth == 0:
+            self.conn.commits += 1 if exc_type is None else 0
+            self.conn.rollbacks += 0 if exc_type is None else 1
+
+
+class FakeConnection(asyncpg.Connection):
+    """Connection recording executed queries.
+
+    `handler` is called with a normalized query and its arguments and
+    returns rows of the result. When it raises, the query fails.
+    """
+
+    def __init__(self, handler: Callable[[str, tuple], Any] | None = None) -> None:
+        # Keep asyncpg.Connection.__del__ happy
+        self._aborted = True
+        self._protocol = None
+        self.handler = handler
+        self.queries: list[tuple[str, tuple]] = []
+        self.copies: list[tuple[str, list[tuple], list[str]]] = []
+        self.depth = 0
+        self.commits = 0
+        self.rollbacks = 0
+
+    def is_in_transaction(self) -> bool:
+        return self.depth > 0
+
+    def transaction(self, **kwargs) -> FakeTransaction:  # type: ignore
+        return FakeTransaction(self)
+
+    def run(self, query: str, args: tuple) -> Any:
+        query = normalize(query)
+        self.queries.append((query, args))
+        if self.handler is None:
+            return []
+        return self.handler(query, args) or []
+
+    def find(self, fragment: str) -> list[tuple[str, tuple]]:
+        """Return executed queries containing the fragment"""
+        return [(q, a) for q, a in self.queries if fragment in q]
+
+    async def execute(self, query: str, *args, **kwargs) -> str:  # type: ignore
+        result = self.run(query, args)
+        return result if isinstance(result, str) else "OK"
+
+    async def executemany(self, query: str, args, **kwargs) -> None:  # type: ignore
+        for row in args:
+            self.run(query, tuple(row))
+
+    async def fetch(self, query: str, *args, **kwargs) -> list:  # type: ignore
+        return self.run(query, args)
+
+    async def fetchrow(self, query: str, *args, **kwargs) -> Any:  # type: ignore
+        res = self.run(query, args)
+        return res[0] if res else None
+
+    async def fetchval(self, query: str, *args, **kwargs) -> Any:  # type: ignore
+        res = self.run(query, args)
+        return res[0][0] if res else None
+
+    async def copy_records_to_table(  # type: ignore
+        self,
+        table: str,
+        *,
+        records: list[tuple],
+        columns: list[str],
+        **kwargs,
+    ) -> None:
+        self.copies.append((table, list(records), columns))
+
+
+class FakeDB(DB):
+    """Connection pool acquiring the given connection.
+
+    Statements sent to the pool directly (as when autocommitted
+    outside of a transaction) fail.
+    """
+
+    def __init__(self, conn: FakeConnection) -> None:
+        super().__init__()
+        self.conn = conn
+
+    async def pool(self) -> Any:
+        return self
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+    async def execute(self, query: str, *args) -> Any:
+        raise AssertionError(f"Query outside of a transaction: {query}")
+
+    fetch = fetchrow = fetchval = executemany = execute
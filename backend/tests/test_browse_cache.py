@@ -0,0 +1,79 @@
+import pytest
+
+from nebula.objects.asset import Asset
+from nebula.objects.base import transaction
+from server.browse_cache import BrowseCache, browse_cache
+from tests.fakes import FakeConnection
+
+
+@pytest.fixture
+def cache(monkeypatch) -> BrowseCache:
+    monkeypatch.setattr(browse_cache, "size", 10)
+    browse_cache.clear()
+    yield browse_cache
+    browse_cache.clear()
+
+
+def cache_page(cache: BrowseCache, query: str, ids: list[int]) -> None:
+    rows = [{"id": id} for id in ids]
+    cache.put(query, [], "FROM assets", [], rows, None, ids, cache.generation)
+
+
+def stored_asset(conn: FakeConnection, id: int) -> Asset:
+    return Asset.from_row(
+        {"id": id, "meta": {"id": id, "id_folder": 1, "title": "Old"}},
+        connection=conn,
+    )
+
+
+@pytest.mark.asyncio
+async def test_saved_asset_is_invalidated_before_save_returns(cache: BrowseCache):
+    cache_page(cache, "page", [1, 2])
+    conn = FakeConnection()
+    asset = stored_asset(conn, 1)
+    asset["title"] = "New"
+    await asset.save(notify=False)
+    # No messaging round trip is needed to read the change
+    assert await cache.get("page", []) is None
+
+
+@pytest.mark.asyncio
+async def test_other_written_assets_become_suspects(cache: BrowseCache):
+    cache_page(cache, "page", [1, 2])
+    conn = FakeConnection()
+    asset = stored_asset(conn, 3)
+    asset["title"] = "New"
+    await asset.save(notify=False)
+    assert cache.data[("page", "[]")].suspects == {3}
+
+
+@pytest.mark.asyncio
+async def test_results_read_before_commit_are_invalidated(cache: BrowseCache):
+    conn = FakeConnection()
+    asset = stored_asset(conn, 1)
+    asset["title"] = "New"
+    async with transaction(conn):
+        await asset.save(notify=False)
+        # Read by another connection while the transaction is open
+        cache_page(cache, "page", [1])
+        assert await cache.get("page", []) is not None
+    assert await cache.get("page", []) is None
+
+
+@pytest.mark.asyncio
+async def test_deleted_assets_are_invalidated(cache: BrowseCache):
+    cache_page(cache, "page", [1, 2])
+
+    def handler(query: str, args: tuple):
+        if query.startswith("DELETE FROM assets"):
+            return [{"id": id} for id in args[0]]
+        return []
+
+    await Asset.delete_many([2], connection=FakeConnection(handler), notify=False)
+    assert await cache.get("page", []) is None
+
+
+def test_other_object_types_are_ignored(cache: BrowseCache):
+    cache_page(cache, "page", [1])
+    cache.handle_write("item", [1])
+    assert ("page", "[]") in cache.data
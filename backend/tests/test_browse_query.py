@@ -0,0 +1,210 @@
+from decimal import Decimal
+
+import pytest
+
+import nebula
+from api.browse import build_row
+from api.browse.models import BrowseRequestModel
+from api.browse.query import (
+    RELEVANCE,
+    build_filters,
+    build_projection,
+    build_query,
+    decode_cursor,
+    encode_cursor,
+    get_order,
+)
+from nebula.enum import MetaClass
+from nebula.exceptions import BadRequestException
+from nebula.settings.metatypes import MetaType
+from nebula.settings.models import ViewSettings
+from server.query_stats import QueryStats
+from tests.fakes import normalize
+
+COLUMNS = ["duration", "episode", "title"]
+
+
+@pytest.fixture(autouse=True)
+def browse_settings(monkeypatch):
+    metatypes = {
+        "title": MetaType(fulltext=10),
+        "genre": MetaType(),
+        "episode": MetaType(metaclass=MetaClass.INTEGER, index=True),
+        "duration": MetaType(metaclass=MetaClass.TIMECODE),
+        "id_folder": MetaType(metaclass=MetaClass.INTEGER),
+        "status": MetaType(metaclass=MetaClass.INTEGER),
+        "ctime": MetaType(metaclass=MetaClass.DATETIME),
+    }
+    views = [ViewSettings(id=1, name="All", position=0)]
+    monkeypatch.setattr(nebula.settings, "metatypes", metatypes)
+    monkeypatch.setattr(nebula.settings, "views", views)
+
+
+def admin() -> nebula.User:
+    return nebula.User(meta={"id": 1, "login": "admin", "is_admin": True})
+
+
+def compile(user: nebula.User | None = None, **kwargs) -> tuple[str, list]:
+    request = BrowseRequestModel(**{"view": 1, **kwargs})
+    query, args = build_query(request, COLUMNS, build_filters(request, user or admin()))
+    return normalize(query), args
+
+
+#
+# Relevance ordering
+#
+
+
+def test_search_results_are_ordered_by_relevance():
+    request = BrowseRequestModel(query="star trek", order_by=RELEVANCE)
+    assert get_order(request, COLUMNS) == (RELEVANCE, "score")
+
+    query, args = compile(query="star trek", order_by=RELEVANCE)
+    assert "JOIN ( SELECT id, SUM(score) AS score" in query
+    assert "score, meta->'duration' AS m0" in query
+    assert "ORDER BY score desc, id desc" in query
+    assert ["star", "stas", "trek", "trel"] == args[:4]
+
+
+def test_relevance_without_search_terms_falls_back_to_ctime():
+    request = BrowseRequestModel(query="a b", order_by=RELEVANCE)
+    assert get_order(request, COLUMNS) == ("ctime", "ctime")
+
+    query, _ = compile(order_by=RELEVANCE)
+    assert "NULL AS score" in query
+    assert "ORDER BY ctime desc, id desc" in query
+
+
+#
+# Cursor pagination
+#
+
+
+def test_cursor_roundtrip():
+    cursor = encode_cursor("title", "Star Trek", 42)
+    assert decode_cursor(cursor, "title") == ("Star Trek", 42)
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", encode_cursor("title", "x", 1)])
+def test_invalid_cursor_is_rejected(cursor: str):
+    with pytest.raises(BadRequestException):
+        decode_cursor(cursor, "ctime")
+
+
+def test_next_page_seeks_after_the_cursor():
+    cursor = encode_cursor("episode", 5, 42)
+    query, args = compile(order_by="episode", cursor=cursor, offset=100)
+    assert "(meta_integer(meta->>'episode'), id) < ($1::INTEGER, $2::INTEGER)" in query
+    assert "ORDER BY meta_integer(meta->>'episode') desc, id desc" in query
+    # Offset is ignored
+    assert args == [5, 42, 0]
+
+
+def test_ascending_page_includes_null_values():
+    cursor = encode_cursor("title", "Star Trek", 42)
+    query, args = compile(order_by="title", order_dir="asc", cursor=cursor)
+    assert (
+        "(((meta->>'title'), id) > ($1::TEXT, $2::INTEGER) "
+        "OR (meta->>'title') IS NULL)"
+    ) in query
+    assert args == ["Star Trek", 42, 0]
+
+
+def test_descending_page_after_null_values():
+    cursor = encode_cursor("title", None, 42)
+    query, args = compile(order_by="title", cursor=cursor)
+    assert (
+        "(((meta->>'title') IS NULL AND id < $1::INTEGER) "
+        "OR (meta->>'title') IS NOT NULL)"
+    ) in query
+    assert args == [42, 0]
+
+
+#
+# Column projection
+#
+
+
+def test_only_projected_keys_are_selected():
+    assert build_projection(["title", "episode"]) == (
+        "meta->'title' AS m0, meta->'episode' AS m1"
+    )
+    query, _ = compile()
+    assert "meta->'duration' AS m0, meta->'episode' AS m1, meta->'title' AS m2" in query
+    assert "SELECT id, ctime AS sort_value, NULL AS score," in query
+    assert "meta," not in query
+
+
+def test_unknown_columns_are_rejected():
+    with pytest.raises(BadRequestException):
+        build_projection(["title", "x' AS m0, (SELECT 1) AS m1 --"])
+
+
+def test_rows_are_built_from_projected_columns():
+    record = {0: 1, 1: 100, 2: None, 3: 3600.0, 4: None, 5: "Title", "score": None}
+    assert build_row(record, COLUMNS) == {"duration": 3600.0, "title": "Title"}
+
+    record["score"] = 20
+    assert build_row(record, COLUMNS)["score"] == 20
+
+
+#
+# Bind parameters
+#
+
+
+def test_values_are_bound():
+    first = compile(conditions=[{"key": "genre", "value": "Drama"}], offset=0)
+    second = compile(conditions=[{"key": "genre", "value": "Comedy"}], offset=500)
+    # Same shape, so the prepared statement is reused
+    assert first[0] == second[0]
+    assert "meta->>'genre' = $1::TEXT" in first[0]
+    assert first[1] == ["Drama", 0]
+    assert second[1] == ["Comedy", 500]
+
+
+def test_lists_are_bound_as_arrays():
+    short, args = compile(
+        conditions=[{"key": "episode", "value": [1, 2], "operator": "IN"}]
+    )
+    long, _ = compile(
+        conditions=[{"key": "episode", "value": [1, 2, 3, 4], "operator": "IN"}]
+    )
+    assert short == long
+    assert "meta_integer(meta->>'episode') = ANY($1::INTEGER[])" in short
+    assert args[0] == [1, 2]
+
+
+def test_numbers_are_compared_as_numbers():
+    query, args = compile(
+        conditions=[{"key": "duration", "value": "12.5", "operator": ">"}]
+    )
+    assert "meta_numeric(meta->>'duration') > $1::NUMERIC" in query
+    assert args[0] == Decimal("12.5")
+
+
+def test_users_share_query_shapes():
+    def limited(id: int) -> nebula.User:
+        return nebula.User(
+            meta={"id": id, "login": f"user{id}", "is_limited": True},
+        )
+
+    first, first_args = compile(user=limited(1))
+    second, second_args = compile(user=limited(2))
+    assert first == second
+    assert first_args[:2] == ["1", [1]]
+    assert second_args[:2] == ["2", [2]]
+
+
+def test_query_stats_are_kept_per_shape():
+    stats = QueryStats()
+    stats.record("SELECT 1", 0.5, label="view 1")
+    stats.record("SELECT 1", 1.5, label="view 2")
+    stats.record("SELECT 2", 0.1)
+    first, second = stats.stats()
+    assert first["query"] == "SELECT 1"
+    assert first["calls"] == 2
+    assert first["max_time"] == 1.5
+    assert first["mean_time"] == 1.0
+    assert first["labels"] == ["view 1", "view 2"]
+    assert second["calls"] == 1
@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+import pytest
+
+import nebula
+from api.browse import totals
+from nebula.config import config
+from server.background_queries import background_queries
+
+
+class SlowReadOnly:
+    def __init__(self, duration: float) -> None:
+        self.duration = duration
+        self.running = 0
+        self.max_running = 0
+
+    async def fetch(self, query: str, *args, **kwargs) -> list:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.duration)
+        finally:
+            self.running -= 1
+        return [(1,)]
+
+
+def slow_count(duration: float):
+    async def count_assets(source: str, args: list) -> tuple[int, bool]:
+        await asyncio.sleep(duration)
+        return 10, True
+
+    return count_assets
+
+
+@pytest.fixture(autouse=True)
+def budget(monkeypatch):
+    monkeypatch.setattr(config, "browse_totals_budget", 0.5)
+    totals.totals_cache.data.clear()
+
+
+@pytest.mark.asyncio
+async def test_fast_main_query_does_not_wait_for_totals(monkeypatch):
+    monkeypatch.setattr(totals, "count_assets", slow_count(1))
+    result = totals.Totals("FROM assets", [], True, [])
+    start = time.monotonic()
+    assert await result.result() == {}
+    assert time.monotonic() - start < 0.1
+    await background_queries.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_totals_finished_alongside_main_query_are_returned(monkeypatch):
+    monkeypatch.setattr(totals, "count_assets", slow_count(0.05))
+    result = totals.Totals("FROM assets", [], True, [])
+    # The main query
+    await asyncio.sleep(0.1)
+    assert await result.result() == {"total": 10, "total_exact": True}
+
+
+@pytest.mark.asyncio
+async def test_wait_is_bounded_by_budget(monkeypatch):
+    monkeypatch.setattr(config, "browse_totals_budget", 0.05)
+    monkeypatch.setattr(totals, "count_assets", slow_count(1))
+    result = totals.Totals("FROM assets", [], True, [])
+    await asyncio.sleep(0.1)
+    start = time.monotonic()
+    assert await result.result() == {}
+    assert time.monotonic() - start < 0.05
+    await background_queries.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_are_limited(monkeypatch):
+    readonly = SlowReadOnly(0.01)
+    monkeypatch.setattr(nebula.db, "readonly", readonly)
+    monkeypatch.setattr(background_queries, "semaphore", asyncio.Semaphore(2))
+    await asyncio.gather(
+        *[totals.cached_fetch(f"SELECT {i}", []) for i in range(5)],
+    )
+    assert readonly.max_running == 2
+
+
+@pytest.mark.asyncio
+async def test_shutdown_cancels_background_queries(monkeypatch):
+    monkeypatch.setattr(totals, "count_assets", slow_count(10))
+    result = totals.Totals("FROM assets", [], True, [])
+    assert background_queries.tasks
+    await background_queries.shutdown()
+    assert result.count_task is not None
+    assert result.count_task.cancelled()
+    assert not background_queries.tasks
@@ -0,0 +1,97 @@
+import importlib
+
+import pytest
+
+from nebula.config import config
+from nebula.db import DB
+
+# nebula.db is shadowed by the DB instance exported by the nebula package
+db_module = importlib.import_module("nebula.db")
+
+
+class FakeCursor:
+    def __init__(self, rows: list, prefetch: int | None) -> None:
+        self.rows = rows
+        self.prefetch = prefetch
+
+    def __aiter__(self):
+        return self.iterate()
+
+    async def iterate(self):
+        for row in self.rows:
+            yield row
+
+
+class FakeStatement:
+    def __init__(self, pool: "FakePool") -> None:
+        self.pool = pool
+
+    def cursor(self, *args, prefetch: int | None = None) -> FakeCursor:
+        self.pool.calls.append(("cursor", prefetch))
+        return FakeCursor(self.pool.rows, prefetch)
+
+
+class FakePool:
+    """Pool and its single connection"""
+
+    def __init__(self, rows: list) -> None:
+        self.rows = rows
+        self.calls: list[tuple] = []
+
+    async def fetch(self, query: str, *args) -> list:
+        self.calls.append(("fetch", query))
+        return self.rows
+
+    def acquire(self) -> "FakePool":
+        return self
+
+    def transaction(self) -> "FakePool":
+        self.calls.append(("transaction",))
+        return self
+
+    async def __aenter__(self) -> "FakePool":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+    async def prepare(self, query: str) -> FakeStatement:
+        return FakeStatement(self)
+
+
+@pytest.mark.asyncio
+async def test_pool_is_configured(monkeypatch):
+    options: dict = {}
+
+    async def create_pool(dsn: str, **kwargs):
+        options.update(kwargs)
+        return FakePool([])
+
+    monkeypatch.setattr(db_module.asyncpg, "create_pool", create_pool)
+    monkeypatch.setattr(config, "postgres_pool_min_size", 20)
+    monkeypatch.setattr(config, "postgres_pool_max_size", 5)
+    monkeypatch.setattr(config, "postgres_statement_cache_size", 0)
+    monkeypatch.setattr(config, "postgres_command_timeout", 30)
+    await DB().connect()
+
+    # The minimum size never exceeds the maximum
+    assert options["min_size"] == 5
+    assert options["max_size"] == 5
+    assert options["statement_cache_size"] == 0
+    assert options["command_timeout"] == 30
+
+
+@pytest.mark.asyncio
+async def test_iterate_fetches_in_one_round_trip():
+    db = DB()
+    db._pool = FakePool([1, 2, 3])  # type: ignore
+    assert [row async for row in db.iterate("SELECT 1")] == [1, 2, 3]
+    assert db._pool.calls == [("fetch", "SELECT 1")]  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_stream_uses_a_cursor():
+    db = DB()
+    db._pool = FakePool([1, 2, 3])  # type: ignore
+    assert [row async for row in db.stream("SELECT 1", prefetch=2)] == [1, 2, 3]
+    assert db._pool.calls == [("transaction",), ("cursor", 2)]  # type: ignore
@@ -0,0 +1,55 @@
+import pytest
+
+import nebula
+import nebula.objects.base
+from api.delete import DeleteRequestModel, Request
+from nebula.enum import ObjectType
+from tests.fakes import FakeConnection, FakeDB
+
+
+def admin() -> nebula.User:
+    return nebula.User(meta={"id": 1, "login": "admin", "is_admin": True})
+
+
+@pytest.fixture
+def messages(monkeypatch) -> list[dict]:
+    sent: list[dict] = []
+
+    async def msg(topic: str, **data) -> None:
+        sent.append(data)
+
+    monkeypatch.setattr(nebula, "msg", msg)
+    return sent
+
+
+@pytest.fixture
+def conn(monkeypatch) -> FakeConnection:
+    def handler(query: str, args: tuple):
+        if query.startswith("DELETE FROM assets"):
+            return [{"id": id} for id in args[0] if id < 100]
+        return []
+
+    conn = FakeConnection(handler)
+    monkeypatch.setattr(nebula.objects.base, "db", FakeDB(conn))
+    return conn
+
+
+@pytest.mark.asyncio
+async def test_assets_are_deleted(conn, messages):
+    request = DeleteRequestModel(object_type=ObjectType.ASSET, ids=[1, 2])
+    response = await Request().handle(request, admin(), "client")
+    assert response.status_code == 204
+    assert conn.commits == 1
+    assert messages == [
+        {"object_type": "asset", "objects": [1, 2], "initiator": "client"}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_missing_asset_aborts_the_delete(conn, messages):
+    request = DeleteRequestModel(object_type=ObjectType.ASSET, ids=[1, 100])
+    with pytest.raises(nebula.NotFoundException):
+        await Request().handle(request, admin(), "client")
+    assert conn.rollbacks == 1
+    assert conn.commits == 0
+    assert messages == []
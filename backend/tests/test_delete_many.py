@@ -0,0 +1,32 @@
+import pytest
+
+from nebula.objects.asset import Asset
+from tests.fakes import FakeConnection
+
+
+def existing(*existing_ids: int):
+    def handler(query: str, args: tuple):
+        if query.startswith("DELETE FROM assets"):
+            return [{"id": id} for id in args[0] if id in existing_ids]
+        return []
+
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_objects_are_deleted_at_once():
+    conn = FakeConnection(existing(1, 2, 3))
+    deleted = await Asset.delete_many([1, 2, 3], connection=conn, notify=False)
+    assert deleted == [1, 2, 3]
+    assert len(conn.find("DELETE FROM assets")) == 1
+    assert conn.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_missing_objects_are_skipped():
+    conn = FakeConnection(existing(1, 3))
+    deleted = await Asset.delete_many([1, 2, 3], connection=conn, notify=False)
+    assert deleted == [1, 3]
+    # Fulltext rows of the deleted objects only
+    [(_, args)] = conn.find("DELETE FROM ft")
+    assert args[1] == [1, 3]
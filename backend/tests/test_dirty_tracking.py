@@ -0,0 +1,156 @@
+import pytest
+
+from nebula.objects.asset import Asset
+from nebula.objects.base import transaction
+from tests.fakes import FakeConnection
+
+
+def handler(query: str, args: tuple):
+    if query.startswith("INSERT INTO assets"):
+        return [{"id": 42}]
+    return []
+
+
+def failing_on(fragment: str):
+    def _handler(query: str, args: tuple):
+        if fragment in query:
+            raise RuntimeError("Query failed")
+        return handler(query, args)
+
+    return _handler
+
+
+def stored_asset(conn: FakeConnection) -> Asset:
+    return Asset.from_row(
+        {
+            "id": 1,
+            "meta": {"id": 1, "id_folder": 1, "title": "Old", "genre": "Drama"},
+        },
+        connection=conn,
+    )
+
+
+@pytest.mark.asyncio
+async def test_unchanged_object_is_not_written():
+    conn = FakeConnection(handler)
+    asset = stored_asset(conn)
+    assert not asset.is_dirty
+    await asset.save(notify=False)
+    assert conn.queries == []
+
+
+@pytest.mark.asyncio
+async def test_only_changed_keys_are_patched():
+    conn = FakeConnection(handler)
+    asset = stored_asset(conn)
+    asset["title"] = "New"
+    asset["genre"] = None
+    await asset.save(notify=False)
+
+    (query, args), *_ = conn.find("UPDATE assets")
+    assert "meta = (meta || $2::JSONB) - $3::TEXT[]" in query
+    assert "SET mtime = $1" in query
+    patch, removed, id = args[1:]
+    assert set(patch) == {"title", "mtime"}
+    assert patch["title"] == "New"
+    assert removed == ["genre"]
+    assert id == 1
+    assert conn.commits == 1
+    assert not asset.is_dirty
+
+
+@pytest.mark.asyncio
+async def test_object_from_meta_is_written_whole():
+    conn = FakeConnection(handler)
+    asset = Asset.from_meta(
+        {"id": 1, "id_folder": 1, "ctime": 1, "title": "Client data"},
+        connection=conn,
+    )
+    assert asset.is_dirty
+    await asset.save(notify=False)
+
+    (query, args), *_ = conn.find("UPDATE assets")
+    assert "meta=$8" in query
+    assert args[-2]["title"] == "Client data"
+    assert not asset.is_dirty
+
+
+@pytest.mark.asyncio
+async def test_failed_save_keeps_changes():
+    conn = FakeConnection(failing_on("UPDATE assets"))
+    asset = stored_asset(conn)
+    asset["title"] = "New"
+    with pytest.raises(RuntimeError):
+        await asset.save(notify=False)
+    assert conn.rollbacks == 1
+    assert asset.is_dirty
+
+    # Retry
+    conn.handler = handler
+    await asset.save(notify=False)
+    (_, args), *_ = conn.find("UPDATE assets")
+    assert args[1]["title"] == "New"
+    assert not asset.is_dirty
+
+
+@pytest.mark.asyncio
+async def test_rollback_of_enclosing_transaction_keeps_changes():
+    conn = FakeConnection(handler)
+    asset = stored_asset(conn)
+    asset["title"] = "New"
+    with pytest.raises(RuntimeError):
+        async with transaction(conn):
+            await asset.save(notify=False)
+            # Saved, but not committed yet
+            assert not asset.is_dirty
+            raise RuntimeError("Something else failed")
+    assert asset.is_dirty
+    assert asset._dirty == {"title"}
+
+
+@pytest.mark.asyncio
+async def test_changes_made_during_transaction_are_kept():
+    conn = FakeConnection(handler)
+    asset = stored_asset(conn)
+    asset["title"] = "New"
+    async with transaction(conn):
+        await asset.save(notify=False)
+        asset["genre"] = "Comedy"
+    assert asset._dirty == {"genre"}
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_insert_forgets_id():
+    conn = FakeConnection(failing_on("UPDATE assets"))
+    asset = Asset(connection=conn)
+    asset["id_folder"] = 1
+    asset["title"] = "New asset"
+    with pytest.raises(RuntimeError):
+        await asset.save(notify=False)
+    assert asset.id is None
+
+
+@pytest.mark.asyncio
+async def test_untracked_transaction_keeps_object_dirty():
+    conn = FakeConnection(handler)
+    asset = stored_asset(conn)
+    asset["title"] = "New"
+    async with conn.transaction():
+        await asset.save(notify=False)
+    # The outcome of the transaction is not known
+    assert asset._dirty == {"title"}
+
+
+@pytest.mark.asyncio
+async def test_save_many_rollback_keeps_changes():
+    conn = FakeConnection(failing_on("UPDATE assets"))
+    assets = [stored_asset(conn) for _ in range(2)]
+    for asset in assets:
+        asset["title"] = "New"
+    with pytest.raises(RuntimeError):
+        await Asset.save_many(assets, connection=conn, notify=False)
+    assert all(asset._dirty == {"title"} for asset in assets)
+
+    conn.handler = handler
+    await Asset.save_many(assets, connection=conn, notify=False)
+    assert not any(asset.is_dirty for asset in assets)
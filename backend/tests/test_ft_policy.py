@@ -0,0 +1,54 @@
+import pytest
+
+import nebula
+from cli.maintenance import PurgeFulltext
+from nebula.enum import ObjectTypeId
+from nebula.objects.base import SUBCLIPS_WEIGHT, create_ft_index, get_ft_weight
+from nebula.objects.item import Item
+from tests.fakes import FakeConnection
+
+
+def test_object_type_weights_override_metatypes():
+    weights = {"title": 10, "subclips": 0}
+    assert get_ft_weight("title", weights) == 10
+    assert get_ft_weight("subclips", weights) == 0
+    assert get_ft_weight("subclips") == SUBCLIPS_WEIGHT
+    # Not a metatype
+    assert get_ft_weight("description") == 0
+
+
+def test_index_uses_object_type_weights():
+    meta = {
+        "title": "Nebula broadcast",
+        "genre": "Drama",
+        "subclips": [{"title": "Opening credits"}],
+    }
+    index = create_ft_index(meta, {"title": 10, "subclips": 0})
+    assert index == {"nebula": 10, "broadcast": 10}
+
+
+@pytest.mark.asyncio
+async def test_disabled_type_is_not_indexed():
+    conn = FakeConnection()
+    item = Item.from_row(
+        {"id": 1, "meta": {"id": 1, "id_bin": 1, "title": "Old"}},
+        connection=conn,
+    )
+    item["title"] = "New title"
+    await item.save(notify=False)
+    assert conn.find("UPDATE items")
+    assert not conn.find(" ft ")
+    assert not conn.copies
+
+
+@pytest.mark.asyncio
+async def test_purge_ft(monkeypatch):
+    conn = FakeConnection(lambda query, args: "DELETE 0")
+    monkeypatch.setattr(nebula.db, "execute", conn.execute)
+    await PurgeFulltext().main()
+
+    purged = {args[0]: query for query, args in conn.find("DELETE FROM ft")}
+    # Everything of types which are not indexed
+    assert purged[ObjectTypeId.ITEM.value] == "DELETE FROM ft WHERE object_type = $1"
+    # Rows of deleted objects of indexed types
+    assert "NOT EXISTS ( SELECT 1 FROM assets" in purged[ObjectTypeId.ASSET.value]
@@ -0,0 +1,114 @@
+import pytest
+
+from nebula.objects.asset import Asset
+from tests.fakes import FakeConnection, FakeDB
+
+
+class IndexedAsset(Asset):
+    __slots__ = ()
+    ft_weights = {"title": 10, "description": 5}
+
+
+def handler(query: str, args: tuple):
+    if query.startswith("INSERT INTO assets"):
+        return [{"id": 1}]
+    if query.startswith("SELECT value, weight FROM ft"):
+        return [{"value": "old", "weight": 10}, {"value": "movie", "weight": 10}]
+    if "FAIL" in str(args):
+        raise RuntimeError("Query failed")
+    return []
+
+
+def stored_asset(conn: FakeConnection) -> IndexedAsset:
+    return IndexedAsset.from_row(
+        {"id": 1, "meta": {"id": 1, "title": "Old movie", "genre": "Drama"}},
+        connection=conn,
+    )
+
+
+@pytest.mark.asyncio
+async def test_unindexed_change_does_not_touch_index():
+    conn = FakeConnection(handler)
+    asset = stored_asset(conn)
+    asset["genre"] = "Comedy"
+    await asset.save(notify=False)
+    assert conn.find(" ft ") == []
+
+
+@pytest.mark.asyncio
+async def test_only_changed_words_are_written():
+    conn = FakeConnection(handler)
+    asset = stored_asset(conn)
+    asset["title"] = "New movie"
+    asset["description"] = "Old"
+    await asset.save(notify=False)
+
+    assert conn.find("DELETE FROM ft") == []
+    [(_, reweighted)] = conn.find("UPDATE ft")
+    assert reweighted[2:] == (["old"], [5])
+    [(query, inserted)] = conn.find("INSERT INTO ft")
+    assert inserted[2:] == (["new"], [10])
+    assert "ON CONFLICT (id, object_type, value)" in query
+
+
+@pytest.mark.asyncio
+async def test_removed_words_are_deleted():
+    conn = FakeConnection(handler)
+    asset = stored_asset(conn)
+    asset["title"] = "Movie"
+    await asset.save(notify=False)
+    [(_, deleted)] = conn.find("DELETE FROM ft")
+    assert deleted[2] == ["old"]
+    assert conn.find("INSERT INTO ft") == []
+
+
+@pytest.mark.asyncio
+async def test_failed_save_is_reindexed_on_retry():
+    conn = FakeConnection(handler)
+    asset = stored_asset(conn)
+    asset["title"] = "New movie"
+    asset["genre"] = "FAIL"
+    with pytest.raises(RuntimeError):
+        await asset.save(notify=False)
+    assert len(conn.find("INSERT INTO ft")) == 1
+
+    # The index written by the failed save was rolled back
+    asset["genre"] = "Comedy"
+    await asset.save(notify=False)
+    assert len(conn.find("INSERT INTO ft")) == 2
+
+
+@pytest.mark.asyncio
+async def test_save_writes_index_in_the_same_transaction():
+    conn = FakeConnection(handler)
+    asset = IndexedAsset({"id_folder": 1}, connection=FakeDB(conn))
+    asset["title"] = "New movie"
+    await asset.save(notify=False)
+    assert conn.find("INSERT INTO assets")
+    assert conn.find("INSERT INTO ft")
+    assert conn.commits == 1
+
+    asset["title"] = "Movie"
+    await asset.save(notify=False)
+    assert conn.find("UPDATE assets")
+    assert conn.find("DELETE FROM ft")
+    assert conn.commits == 2
+
+
+@pytest.mark.asyncio
+async def test_save_many_reindexes_changed_objects_only():
+    conn = FakeConnection(handler)
+    changed = stored_asset(conn)
+    changed["title"] = "New movie"
+    unchanged = IndexedAsset.from_row(
+        {"id": 2, "meta": {"id": 2, "title": "Other"}},
+        connection=conn,
+    )
+    unchanged["genre"] = "Comedy"
+    await IndexedAsset.save_many([changed, unchanged], notify=False)
+
+    [(_, deleted)] = conn.find("DELETE FROM ft")
+    assert deleted[1] == [1]
+    [(table, records, _)] = conn.copies
+    assert table == "ft"
+    assert sorted(records) == [(1, 0, 10, "movie"), (1, 0, 10, "new")]
@@ -0,0 +1,118 @@
+import pytest
+
+import nebula
+from api.get import GetRequestModel, Request, build_query
+from server import ndjson
+from server.ndjson import ndjson_response
+
+
+class FakeReadOnly:
+    def __init__(self, rows: list[dict]) -> None:
+        self.rows = rows
+        self.calls: list[tuple] = []
+
+    async def iterate(self, query: str, *args):
+        self.calls.append(("iterate", args))
+        for row in self.rows:
+            yield row
+
+    async def stream(self, query: str, *args, prefetch: int | None = None):
+        self.calls.append(("stream", args))
+        for row in self.rows:
+            yield row
+
+
+def row(id: int, meta: dict | None, id_folder: int = 1) -> dict:
+    return {
+        "id": id,
+        "version": f"{id}.5",
+        "acl": {"id_folder": id_folder},
+        "meta": meta,
+    }
+
+
+def editor() -> nebula.User:
+    return nebula.User(
+        meta={"id": 2, "login": "editor", "can/asset_view": [1]},
+    )
+
+
+async def body(response) -> list[bytes]:
+    return [chunk async for chunk in response.body_iterator]
+
+
+#
+# Streaming
+#
+
+
+@pytest.mark.asyncio
+async def test_first_row_is_sent_immediately(monkeypatch):
+    monkeypatch.setattr(ndjson, "CHUNK_SIZE", 18)
+
+    async def rows():
+        yield {"id": 1}
+        yield b'{"id":2}'
+        yield '{"id":3}'
+        yield {"id": 4}
+
+    chunks = await body(ndjson_response(rows()))
+    assert chunks == [b'{"id":1}\n', b'{"id":2}\n{"id":3}\n', b'{"id":4}\n']
+
+
+@pytest.mark.asyncio
+async def test_stream_omits_inaccessible_and_unmodified_objects(monkeypatch):
+    readonly = FakeReadOnly(
+        [
+            row(1, {"id": 1, "title": "Visible"}),
+            row(2, {"id": 2, "title": "Hidden"}, id_folder=2),
+            row(3, None),
+        ]
+    )
+    monkeypatch.setattr(nebula.db, "readonly", readonly)
+    request = GetRequestModel(ids=[1, 2, 3], stream=True)
+    response = await Request().handle(request, editor())
+
+    assert response.media_type == "application/x-ndjson"
+    assert b"".join(await body(response)) == b'{"id":1,"title":"Visible"}\n'
+    assert readonly.calls[0][0] == "stream"
+
+
+#
+# Conditional get
+#
+
+
+@pytest.mark.asyncio
+async def test_known_versions_are_not_returned(monkeypatch):
+    readonly = FakeReadOnly([row(1, {"id": 1, "title": "Changed"}), row(2, None)])
+    monkeypatch.setattr(nebula.db, "readonly", readonly)
+    request = GetRequestModel(ids=[1, 2], known_versions={1: "1.0", 2: "2.5"})
+    response = await Request().handle(request, editor())
+
+    assert response.data == [{"id": 1, "title": "Changed"}]
+    assert response.versions == {1: "1.5"}
+    assert response.not_modified == [2]
+    _, args = readonly.calls[0]
+    assert args == ([1, 2], [1, 2], ["1.0", "2.5"])
+
+
+@pytest.mark.asyncio
+async def test_only_requested_fields_are_returned(monkeypatch):
+    readonly = FakeReadOnly([row(1, {"id": 1, "title": "Title"})])
+    monkeypatch.setattr(nebula.db, "readonly", readonly)
+    request = GetRequestModel(ids=[1], fields=["title"])
+    await Request().handle(request, editor())
+
+    _, args = readonly.calls[0]
+    assert sorted(args[3]) == ["id", "title"]
+    assert "jsonb_object_agg" in build_query("asset", ["title"])
+    assert "jsonb_object_agg" not in build_query("asset", None)
+
+
+@pytest.mark.asyncio
+async def test_inaccessible_object_is_forbidden(monkeypatch):
+    readonly = FakeReadOnly([row(1, {"id": 1}, id_folder=2)])
+    monkeypatch.setattr(nebula.db, "readonly", readonly)
+    with pytest.raises(nebula.ForbiddenException):
+        await Request().handle(GetRequestModel(ids=[1]), editor())
@@ -0,0 +1,60 @@
+import pytest
+
+import nebula.objects.base
+from nebula.common import json_dumps, json_loads
+from nebula.objects.asset import Asset
+from tests.fakes import FakeConnection
+
+
+@pytest.fixture
+def decoded(monkeypatch) -> list[int]:
+    """Record IDs of decoded payloads"""
+    decoded: list[int] = []
+
+    def counting_loads(payload):
+        result = json_loads(payload)
+        decoded.append(result["id"])
+        return result
+
+    monkeypatch.setattr(nebula.objects.base, "json_loads", counting_loads)
+    return decoded
+
+
+def raw_rows(count: int) -> list[dict]:
+    return [
+        {"id": id, "meta": json_dumps({"id": id, "title": f"Asset {id}"})}
+        for id in range(1, count + 1)
+    ]
+
+
+def test_only_inspected_rows_are_decoded(decoded):
+    assets = [Asset.from_row(row) for row in raw_rows(1000)]
+    by_id = {asset.id: asset for asset in assets}
+    assert decoded == []
+
+    page = [by_id[id]["title"] for id in range(1, 11)]
+    assert page[0] == "Asset 1"
+    assert decoded == list(range(1, 11))
+
+
+def test_decoded_meta_includes_defaults(decoded):
+    asset = Asset.from_raw('{"id": 5}', id=5)
+    assert asset.id == 5
+    assert decoded == []
+    assert asset["status"] == Asset.defaults["status"]
+    assert decoded == [5]
+
+
+@pytest.mark.asyncio
+async def test_unchanged_lazy_object_is_not_decoded_on_save(decoded):
+    conn = FakeConnection()
+    asset = Asset.from_raw('{"id": 5, "title": "Lazy"}', id=5, connection=conn)
+    await asset.save(notify=False)
+    assert conn.queries == []
+    assert decoded == []
+
+
+def test_objects_are_slotted():
+    asset = Asset.from_raw('{"id": 5}', id=5)
+    with pytest.raises(AttributeError):
+        asset.something = 1  # type: ignore
@@ -0,0 +1,70 @@
+import asyncio
+
+import orjson
+import pytest
+
+from nebula import messaging
+from nebula.config import config
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.messages: list[tuple[str, dict]] = []
+
+    async def publish(self, message: bytes) -> None:
+        _, _, _, topic, data = orjson.loads(message)
+        self.messages.append((topic, data))
+
+
+@pytest.fixture
+def redis(monkeypatch) -> FakeRedis:
+    redis = FakeRedis()
+    monkeypatch.setattr(messaging, "Redis", redis)
+    monkeypatch.setattr(messaging, "changes", messaging.ChangeAggregator())
+    monkeypatch.setattr(config, "messaging_debounce", 0.01)
+    return redis
+
+
+@pytest.mark.asyncio
+async def test_changes_are_merged(redis: FakeRedis):
+    await messaging.msg("objects_changed", object_type="asset", objects=[1, 2])
+    await messaging.msg("objects_changed", object_type="asset", objects=[2, 3])
+    await messaging.msg("objects_changed", object_type="item", objects=[7])
+    assert redis.messages == []
+
+    await asyncio.sleep(0.05)
+    assert redis.messages == [
+        ("objects_changed", {"object_type": "asset", "objects": [1, 2, 3]}),
+        ("objects_changed", {"object_type": "item", "objects": [7]}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_changes_of_initiators_are_kept_apart(redis: FakeRedis):
+    await messaging.msg("objects_changed", object_type="asset", objects=[1])
+    await messaging.msg(
+        "objects_changed", object_type="asset", objects=[2], initiator="client"
+    )
+    await messaging.flush_messages()
+    assert [data.get("initiator") for _, data in redis.messages] == [None, "client"]
+
+
+@pytest.mark.asyncio
+async def test_other_messages_keep_the_order(redis: FakeRedis):
+    await messaging.msg("objects_changed", object_type="asset", objects=[1])
+    await messaging.msg("job_progress", id=1, progress=50)
+    assert [topic for topic, _ in redis.messages] == ["objects_changed", "job_progress"]
+
+    # The flush cancelled the scheduled one
+    await asyncio.sleep(0.05)
+    assert len(redis.messages) == 2
+
+
+@pytest.mark.asyncio
+async def test_changes_are_published_immediately_without_debounce(
+    redis: FakeRedis,
+    monkeypatch,
+):
+    monkeypatch.setattr(config, "messaging_debounce", 0)
+    await messaging.msg("objects_changed", object_type="asset", objects=[1])
+    assert len(redis.messages) == 1
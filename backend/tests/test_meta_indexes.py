@@ -0,0 +1,93 @@
+import pytest
+
+from nebula.enum import MetaClass
+from nebula.metadata.indexes import (
+    meta_expression,
+    meta_index_name,
+    update_meta_indexes,
+)
+from tests.fakes import FakeConnection
+
+
+def pg_indexes(legacy: list[dict], managed: list[dict]):
+    def _handler(query: str, args: tuple):
+        if "indexname = ANY($1)" in query:
+            return [row for row in legacy if row["indexname"] in args[0]]
+        if "indexname LIKE $1" in query:
+            return managed
+        return []
+
+    return _handler
+
+
+def test_casted_expression_is_safe():
+    assert meta_expression("episode", MetaClass.INTEGER) == (
+        "meta_integer(meta->>'episode')"
+    )
+    assert meta_expression("duration", MetaClass.TIMECODE) == (
+        "meta_numeric(meta->>'duration')"
+    )
+    assert meta_expression("title", MetaClass.STRING) == "(meta->>'title')"
+
+
+@pytest.mark.asyncio
+async def test_legacy_indexes_are_dropped():
+    conn = FakeConnection(
+        pg_indexes(
+            legacy=[{"indexname": "idx_genre"}, {"indexname": "idx_series_name"}],
+            managed=[],
+        )
+    )
+    await update_meta_indexes(
+        conn,
+        {"genre": MetaClass.STRING},
+        legacy_keys=["genre", "series/name", "status"],
+    )
+
+    (query, args), *_ = conn.find("indexname = ANY($1)")
+    # Only expression indexes of the metadata, not table columns
+    assert "(meta ->> %" in query
+    assert args[0] == ["idx_genre", "idx_series_name", "idx_status"]
+
+    dropped = [q for q, _ in conn.find("DROP INDEX")]
+    assert dropped == [
+        "DROP INDEX IF EXISTS idx_genre",
+        "DROP INDEX IF EXISTS idx_series_name",
+    ]
+    assert conn.find(
+        "CREATE INDEX IF NOT EXISTS idx_meta_genre_text ON assets ((meta->>'genre'))"
+    )
+
+
+@pytest.mark.asyncio
+async def test_plain_cast_indexes_are_rebuilt():
+    name = meta_index_name("episode", MetaClass.INTEGER)
+    current = meta_index_name("year", MetaClass.INTEGER)
+    conn = FakeConnection(
+        pg_indexes(
+            legacy=[],
+            managed=[
+                {
+                    "indexname": name,
+                    "indexdef": f"CREATE INDEX {name} ON public.assets "
+                    "USING btree ((((meta ->> 'episode'::text))::integer))",
+                },
+                {
+                    "indexname": current,
+                    "indexdef": f"CREATE INDEX {current} ON public.assets "
+                    "USING btree (meta_integer((meta ->> 'year'::text)))",
+                },
+            ],
+        )
+    )
+    await update_meta_indexes(
+        conn,
+        {"episode": MetaClass.INTEGER, "year": MetaClass.INTEGER},
+    )
+
+    assert [q for q, _ in conn.find("DROP INDEX")] == [f"DROP INDEX IF EXISTS {name}"]
+    created = [q for q, _ in conn.find("CREATE INDEX")]
+    assert created == [
+        f"CREATE INDEX IF NOT EXISTS {name} ON assets "
+        "(meta_integer(meta->>'episode'))"
+    ]
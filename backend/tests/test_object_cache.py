@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+import nebula.objects.base
+from nebula.objects.asset import Asset
+from nebula.objects.base import transaction
+from nebula.objects.cache import ObjectCache
+from tests.fakes import FakeConnection
+
+
+@pytest.fixture
+def cache(monkeypatch) -> ObjectCache:
+    cache = ObjectCache(size=10, ttl=60)
+    monkeypatch.setattr(nebula.objects.base, "object_cache", cache)
+    return cache
+
+
+class BlockingLoader:
+    """Loader returning the given payload once released"""
+
+    def __init__(self, payload: str) -> None:
+        self.payload = payload
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def load_many(self, ids: list[int]) -> dict[int, str]:
+        self.started.set()
+        await self.release.wait()
+        return {id: self.payload for id in ids}
+
+    def forget(self, ids: list[int]) -> None:
+        pass
+
+
+def test_put_and_get(cache: ObjectCache):
+    cache.put("asset", 1, {"id": 1}, cache.generation)
+    assert cache.get("asset", 1) == b'{"id":1}'
+    cache.invalidate("asset", [1])
+    assert cache.get("asset", 1) is None
+
+
+def test_stale_put_is_ignored(cache: ObjectCache):
+    generation = cache.generation
+    cache.invalidate("asset", [2])
+    cache.put("asset", 1, {"id": 1}, generation)
+    assert cache.get("asset", 1) is None
+
+
+@pytest.mark.asyncio
+async def test_load_finishing_after_save_is_not_cached(cache, monkeypatch):
+    loader = BlockingLoader('{"id": 1, "title": "Old"}')
+    monkeypatch.setattr(nebula.objects.base, "get_loader", lambda _: loader)
+
+    load = asyncio.create_task(Asset.load(1))
+    await asyncio.wait_for(loader.started.wait(), 1)
+
+    conn = FakeConnection()
+    asset = Asset.from_row({"id": 1, "meta": {"id": 1}}, connection=conn)
+    asset["title"] = "New"
+    await asset.save(notify=False)
+
+    loader.release.set()
+    assert (await load)["title"] == "Old"
+    assert cache.get("asset", 1) is None
+
+
+@pytest.mark.asyncio
+async def test_entries_are_dropped_on_commit(cache):
+    conn = FakeConnection()
+    asset = Asset.from_row({"id": 1, "meta": {"id": 1}}, connection=conn)
+    async with transaction(conn):
+        asset["title"] = "New"
+        await asset.save(notify=False)
+        # Another request reads the data committed so far
+        cache.put("asset", 1, {"id": 1}, cache.generation)
+    assert cache.get("asset", 1) is None
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+import nebula.objects.loader
+from nebula.objects.asset import Asset
+from nebula.objects.base import transaction
+from nebula.objects.loader import ObjectLoader
+from tests.fakes import FakeConnection
+
+
+class FakeDB:
+    def __init__(self) -> None:
+        self.queries: list[list[int]] = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def fetch(self, query: str, ids: list[int]):
+        self.queries.append(sorted(ids))
+        await self.release.wait()
+        return [{"id": id, "meta": f'{{"id": {id}}}'} for id in ids if id < 100]
+
+
+@pytest.fixture
+def fake_db(monkeypatch) -> FakeDB:
+    fake_db = FakeDB()
+    monkeypatch.setattr(nebula.objects.loader, "db", fake_db)
+    monkeypatch.setattr(nebula.objects.loader, "loaders", {})
+    return fake_db
+
+
+@pytest.mark.asyncio
+async def test_loads_are_batched(fake_db: FakeDB):
+    loader = ObjectLoader("asset")
+    results = await asyncio.gather(loader.load(1), loader.load(2), loader.load(100))
+    assert results == ['{"id": 1}', '{"id": 2}', None]
+    assert fake_db.queries == [[1, 2, 100]]
+    assert not loader.tasks
+
+
+@pytest.mark.asyncio
+async def test_concurrent_loads_are_coalesced(fake_db: FakeDB):
+    loader = ObjectLoader("asset")
+    fake_db.release.clear()
+    first = asyncio.ensure_future(loader.load(1))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert loader.tasks, "The running batch must be referenced"
+    second = asyncio.ensure_future(loader.load(1))
+    fake_db.release.set()
+    assert await first == await second
+    assert fake_db.queries == [[1]]
+
+
+@pytest.mark.asyncio
+async def test_forgotten_objects_are_loaded_again(fake_db: FakeDB):
+    loader = ObjectLoader("asset")
+    fake_db.release.clear()
+    first = asyncio.ensure_future(loader.load(1))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    # The object was written meanwhile
+    loader.forget([1])
+    second = asyncio.ensure_future(loader.load(1))
+    await asyncio.sleep(0)
+    fake_db.release.set()
+    await asyncio.gather(first, second)
+    assert fake_db.queries == [[1], [1]]
+
+
+@pytest.mark.asyncio
+async def test_loader_is_bypassed_within_transaction(fake_db: FakeDB, monkeypatch):
+    async def load_many(self, ids):
+        raise AssertionError("Loads within a transaction must not be coalesced")
+
+    def handler(query: str, args: tuple):
+        return [{"id": 1, "meta": '{"id": 1}'}]
+
+    monkeypatch.setattr(ObjectLoader, "load_many", load_many)
+    conn = FakeConnection(handler)
+    async with transaction(conn):
+        asset = await Asset.load(1)
+    assert asset.id == 1
+    # Read using the transaction connection, so own writes are visible
+    assert fake_db.queries == []
+    [(_, args)] = conn.find("FROM assets")
+    assert args == ([1],)
@@ -0,0 +1,73 @@
+import importlib
+
+import pytest
+
+from nebula.config import config
+from nebula.db import DB, current_client, recent_write
+
+# nebula.db is shadowed by the DB instance exported by the nebula package
+db_module = importlib.import_module("nebula.db")
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.data: dict[str, str] = {}
+        self.sets = 0
+        self.gets = 0
+
+    async def set(self, namespace: str, key: str, value: str, ttl: int = 0) -> None:
+        self.sets += 1
+        self.data[f"{namespace}-{key}"] = value
+
+    async def get(self, namespace: str, key: str) -> str | None:
+        self.gets += 1
+        return self.data.get(f"{namespace}-{key}")
+
+
+@pytest.fixture
+def redis(monkeypatch) -> FakeRedis:
+    redis = FakeRedis()
+    monkeypatch.setattr(db_module, "Redis", redis)
+    monkeypatch.setattr(config, "postgres_readonly", "postgres://replica/nebula")
+    monkeypatch.setattr(config, "postgres_readonly_lag_guard", 5)
+    return redis
+
+
+@pytest.mark.asyncio
+async def test_every_write_refreshes_the_guard(redis: FakeRedis):
+    current_client.set("user-1")
+    db = DB()
+    await db.mark_written()
+    await db.mark_written()
+    assert redis.sets == 2
+    assert await db.written_recently()
+    assert redis.gets == 0
+
+
+@pytest.mark.asyncio
+async def test_guard_is_resolved_once_per_request(redis: FakeRedis):
+    current_client.set("user-1")
+    db = DB()
+    assert not await db.written_recently()
+    assert not await db.written_recently()
+    assert redis.gets == 1
+
+
+@pytest.mark.asyncio
+async def test_write_of_another_worker_is_seen(redis: FakeRedis):
+    # Written by another worker (another DB instance)
+    current_client.set("user-1")
+    await DB().mark_written()
+    recent_write.set(None)
+
+    assert await DB().written_recently()
+    assert redis.gets == 1
+
+
+@pytest.mark.asyncio
+async def test_anonymous_reads_use_the_replica(redis: FakeRedis):
+    assert current_client.get() is None
+    db = DB()
+    await db.mark_written()
+    assert not await db.written_recently()
+    assert redis.sets == redis.gets == 0
@@ -0,0 +1,136 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import nebula
+import nebula.objects.base
+from cli import reindex
+from cli.reindex import MAX_VALUE_LENGTH, Reindex, index_batch
+from nebula.common import json_dumps
+from nebula.objects.asset import Asset
+from nebula.settings.metatypes import MetaType
+from tests.fakes import FakeConnection, FakeDB
+
+ASSETS = [
+    (1, json_dumps({"id": 1, "title": "Morning news"})),
+    (2, json_dumps({"id": 2, "title": "Evening news"})),
+    (3, json_dumps({"id": 3, "title": "Weather"})),
+]
+
+
+class ReindexDB(FakeDB):
+    """Database of the rebuild. Statements are recorded by the connection."""
+
+    async def execute(self, query: str, *args):
+        return await self.conn.execute(query, *args)
+
+    async def fetchval(self, query: str, *args):
+        return len(ASSETS) if "FROM assets" in query else 0
+
+    async def stream(self, query: str, *args, prefetch: int | None = None):
+        if "FROM assets" in query:
+            for row in ASSETS:
+                yield row
+
+
+def handler(query: str, args: tuple):
+    # Asset 2 was saved during the rebuild
+    if query.startswith("SELECT id, meta::TEXT FROM assets WHERE"):
+        return [ASSETS[1]]
+    return []
+
+
+@pytest.fixture(autouse=True)
+def ft_settings(monkeypatch):
+    metatypes = {"title": MetaType(fulltext=10), "genre": MetaType()}
+    monkeypatch.setattr(nebula.settings, "metatypes", metatypes)
+
+
+@pytest.fixture
+def conn(monkeypatch) -> FakeConnection:
+    conn = FakeConnection(handler)
+    fake_db = ReindexDB(conn)
+    monkeypatch.setattr(nebula, "db", fake_db)
+    monkeypatch.setattr(nebula.objects.base, "db", fake_db)
+    return conn
+
+
+def test_batch_is_indexed():
+    long_word = "x" * (MAX_VALUE_LENGTH + 1)
+    batch = [
+        (1, json_dumps({"title": "Morning news", "genre": "Drama"})),
+        (2, json_dumps({"title": long_word})),
+    ]
+    weights = {"title": 10, "genre": 0}
+    assert sorted(index_batch(batch, 0, weights)) == [
+        (1, 0, 10, "morning"),
+        (1, 0, 10, "news"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_objects_are_loaded_to_shadow_table(conn, monkeypatch):
+    monkeypatch.setattr(reindex, "BATCH_SIZE", 2)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        await Reindex().load(Asset, executor, max_pending=1)
+
+    assert {table for table, _, _ in conn.copies} == {"ft_new"}
+    records = sorted(record for _, rows, _ in conn.copies for record in rows)
+    assert records == [
+        (1, 0, 10, "morning"),
+        (1, 0, 10, "news"),
+        (2, 0, 10, "evening"),
+        (2, 0, 10, "news"),
+        (3, 0, 10, "weather"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_objects_saved_meanwhile_are_reindexed(conn):
+    await Reindex().catch_up(conn, 1000)
+
+    [(query, args)] = conn.find("FROM assets WHERE")
+    assert "WHERE mtime >= $1" in query
+    assert args == (1000,)
+    [(_, args)] = conn.find("DELETE FROM ft_new")
+    assert args == (0, [2])
+    [(table, records, _)] = conn.copies
+    assert table == "ft_new"
+    assert sorted(records) == [(2, 0, 10, "evening"), (2, 0, 10, "news")]
+
+
+@pytest.mark.asyncio
+async def test_shadow_table_replaces_index(conn, monkeypatch):
+    loaded: list[str] = []
+
+    async def load(self, object_class, executor, max_pending):
+        loaded.append(object_class.object_type)
+
+    monkeypatch.setattr(Reindex, "load", load)
+    await Reindex().main(workers=1)
+    assert "asset" in loaded
+    assert "bin" not in loaded  # Fulltext disabled
+
+    queries = [query for query, _ in conn.queries]
+    position = {
+        step: next(i for i, query in enumerate(queries) if query.startswith(step))
+        for step in [
+            "DROP TABLE IF EXISTS ft_new",
+            "CREATE TABLE ft_new (LIKE ft",
+            "CREATE UNIQUE INDEX idx_ft_new_object",
+            "LOCK TABLE ft",
+            "DROP TABLE ft",
+            "ALTER TABLE ft_new RENAME TO ft",
+        ]
+    }
+    assert list(position.values()) == sorted(position.values())
+    assert "ALTER INDEX idx_ft_new_object RENAME TO idx_ft_object" in queries
+    assert "ALTER INDEX idx_ft_new_search RENAME TO idx_ft_search" in queries
+
+    # Objects saved during the rebuild are indexed before and after locking
+    catch_up = [
+        i for i, query in enumerate(queries) if query.startswith("DELETE FROM ft_new")
+    ]
+    assert len(catch_up) == 2
+    assert catch_up[0] < position["LOCK TABLE ft"] < catch_up[1]
+    assert catch_up[1] < position["DROP TABLE ft"]
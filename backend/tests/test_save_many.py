@@ -0,0 +1,53 @@
+import pytest
+
+from nebula.objects.asset import Asset
+from tests.fakes import FakeConnection
+
+
+def handler(query: str, args: tuple):
+    if query.startswith("SELECT nextval"):
+        return [{"id": 100 + i} for i in range(args[1])]
+    return []
+
+
+@pytest.mark.asyncio
+async def test_mixed_batch():
+    conn = FakeConnection(handler)
+    new = Asset(connection=conn)
+    new["id_folder"] = 1
+    new["title"] = "New"
+    patched = Asset.from_row(
+        {"id": 1, "meta": {"id": 1, "id_folder": 1, "title": "Old"}},
+        connection=conn,
+    )
+    patched["title"] = "Patched"
+    replaced = Asset.from_meta(
+        {"id": 2, "id_folder": 1, "ctime": 1, "title": "Replaced"},
+        connection=conn,
+    )
+    await Asset.save_many([new, patched, replaced], notify=False)
+
+    assert new.id == 100
+    assert conn.commits == 1
+
+    # Only the new object is inserted
+    [(insert, insert_args)] = conn.find("INSERT INTO assets")
+    assert "ON CONFLICT" not in insert
+    assert len(insert_args) == len(Asset.db_columns) + 2
+    assert insert_args[0] == 100
+
+    # Existing objects are updated
+    updates = {args[-1]: query for query, args in conn.find("UPDATE assets")}
+    assert set(updates) == {1, 2}
+    assert "meta || " in updates[1]
+    assert "meta=$8" in updates[2]
+
+    assert not any(obj.is_dirty for obj in [new, patched, replaced])
+
+
+@pytest.mark.asyncio
+async def test_unchanged_objects_are_skipped():
+    conn = FakeConnection(handler)
+    asset = Asset.from_row({"id": 1, "meta": {"id": 1}}, connection=conn)
+    await Asset.save_many([asset], notify=False)
+    assert conn.queries == []
@@ -0,0 +1,39 @@
+from nebula.search import build_search_query, prefix_match, search_terms
+from tests.fakes import normalize
+
+
+def test_search_terms():
+    assert search_terms("Star Trek: the Star") == ["star", "the", "trek"]
+    assert search_terms("a to be") == []
+
+
+def test_inlined_prefix_match():
+    assert prefix_match("trek", None) == "value LIKE 'trek%'"
+
+
+def test_bound_prefix_match_is_a_range():
+    params: list = []
+
+    def bind(value, cast: str) -> str:
+        params.append(value)
+        return f"${len(params)}::{cast}"
+
+    condition = prefix_match("trek", bind)
+    assert condition == "value ~>=~ $1::TEXT AND value ~<~ $2::TEXT"
+    assert params == ["trek", "trel"]
+
+
+def test_single_term_query():
+    query = normalize(build_search_query(["trek"]))
+    assert query == (
+        "SELECT id, MAX(weight) AS score FROM ft "
+        "WHERE object_type = 0 AND value LIKE 'trek%' GROUP BY id"
+    )
+
+
+def test_objects_must_match_all_terms():
+    query = normalize(build_search_query(["star", "trek"], object_type="event"))
+    assert query.startswith("SELECT id, SUM(score) AS score FROM (")
+    assert query.count("UNION ALL") == 1
+    assert "object_type = 3" in query
+    assert query.endswith("GROUP BY id HAVING COUNT(*) = 2")
@@ -0,0 +1,116 @@
+import pytest
+
+import nebula
+from api.set import OperationModel, OperationsRequest, OperationsRequestModel, Validator
+from tests.fakes import FakeConnection
+
+
+class FakePool:
+    def __init__(self, conn: FakeConnection) -> None:
+        self.conn = conn
+
+    def acquire(self) -> "FakePool":
+        return self
+
+    async def __aenter__(self) -> FakeConnection:
+        return self.conn
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+
+def handler(query: str, args: tuple):
+    if query.startswith("SELECT nextval"):
+        return [{"id": 100 + i} for i in range(args[1])]
+    if query.startswith("INSERT INTO assets") and "Broken" in str(args):
+        raise RuntimeError("Unable to save")
+    return []
+
+
+@pytest.fixture
+def conn(monkeypatch) -> FakeConnection:
+    conn = FakeConnection(handler)
+    pool = FakePool(conn)
+
+    async def get_pool():
+        return pool
+
+    monkeypatch.setattr(nebula.db, "pool", get_pool)
+    monkeypatch.setattr(Validator, "validators", {})
+    return conn
+
+
+@pytest.fixture
+def messages(monkeypatch) -> list[tuple[str, dict]]:
+    messages: list[tuple[str, dict]] = []
+
+    async def msg(topic: str, **data):
+        messages.append((topic, data))
+
+    monkeypatch.setattr(nebula, "msg", msg)
+    return messages
+
+
+def admin() -> nebula.User:
+    return nebula.User(meta={"id": 1, "login": "admin", "is_admin": True})
+
+
+def new_asset(title: str) -> OperationModel:
+    return OperationModel(data={"id_folder": 1, "title": title})
+
+
+@pytest.mark.asyncio
+async def test_failed_save_rolls_back_every_operation(
+    conn: FakeConnection,
+    messages: list,
+):
+    request = OperationsRequestModel(
+        operations=[new_asset("First"), new_asset("Broken")],
+        atomic=True,
+    )
+    result = await OperationsRequest().handle(request, admin())
+
+    assert not result.success
+    assert [op.success for op in result.operations] == [False, False]
+    assert all(op.error == "Unable to save" for op in result.operations)
+    assert conn.rollbacks == 1
+    assert conn.commits == 0
+    assert messages == []
+
+
+@pytest.mark.asyncio
+async def test_failed_operation_rolls_back_preceding_ones(
+    conn: FakeConnection,
+    messages: list,
+):
+    request = OperationsRequestModel(
+        operations=[
+            new_asset("First"),
+            OperationModel(id=5, data={"title": "Missing"}),
+            new_asset("Third"),
+        ],
+        atomic=True,
+    )
+    result = await OperationsRequest().handle(request, admin())
+
+    assert not result.success
+    errors = [op.error for op in result.operations]
+    assert errors[0] == errors[2] == "Not applied"
+    assert "not found" in errors[1]
+    assert not conn.find("INSERT INTO assets")
+    assert conn.rollbacks == 1
+    assert messages == []
+
+
+@pytest.mark.asyncio
+async def test_user_cannot_grant_own_rights(conn: FakeConnection):
+    user = nebula.User(meta={"id": 2, "login": "editor"}, connection=conn)
+    operation = OperationModel(
+        object_type="user",
+        id=2,
+        data={"is_admin": True, "can/asset_edit": True, "full_name": "Editor"},
+    )
+    await OperationsRequest().apply(operation, user, conn, user)
+    assert operation.data == {"full_name": "Editor"}
+    assert not user.is_admin
+    assert user["full_name"] == "Editor"
@@ -0,0 +1,77 @@
+import pytest
+
+import nebula
+from api.suggest import Request, SuggestRequestModel
+from server import suggestions
+from server.suggestions import SuggestionIndex
+
+
+class FakeDB:
+    def __init__(self, rows: list[tuple]) -> None:
+        self.rows = rows
+
+    async def fetch(self, query: str, *args) -> list[tuple]:
+        return self.rows
+
+
+@pytest.fixture
+def index(monkeypatch) -> SuggestionIndex:
+    vocabulary = FakeDB([("drama", 3, 10), ("dragon", 1, 5), ("dream", 1, 2)])
+    monkeypatch.setattr(nebula.db, "readonly", vocabulary)
+    return SuggestionIndex()
+
+
+def saved(monkeypatch, index: SuggestionIndex, rows: list[tuple]) -> None:
+    monkeypatch.setattr(nebula.db, "fetch", FakeDB(rows).fetch)
+    index.changed.add(1)
+
+
+@pytest.mark.asyncio
+async def test_precomputed_prefixes_are_updated_in_place(monkeypatch, index):
+    await index.build()
+    precomputed = index.cache["dr"]
+    assert precomputed == ["drama", "dragon", "dream"]
+
+    saved(monkeypatch, index, [("drift", 2), ("dream", 5)])
+    await index.update()
+    # Not evicted, updated
+    assert index.cache["dr"] is precomputed
+    assert index.suggest("dr") == ["dream", "drama", "drift", "dragon"]
+    assert index.suggest("dre") == ["dream"]
+
+
+@pytest.mark.asyncio
+async def test_updated_completions_match_recomputed(monkeypatch, index):
+    monkeypatch.setattr(suggestions, "MAX_SUGGESTIONS", 2)
+    await index.build()
+    saved(monkeypatch, index, [("drum", 2), ("dragon", 4)])
+    await index.update()
+    cached = dict(index.cache)
+    index.cache.clear()
+    assert {prefix: index.complete(prefix) for prefix in cached} == cached
+    assert index.suggest("dr") == ["dragon", "drama"]
+
+
+@pytest.mark.asyncio
+async def test_full_cache_keeps_precomputed_prefixes(monkeypatch, index):
+    monkeypatch.setattr(suggestions, "CACHE_SIZE", 4)
+    await index.build()
+    index.complete("dra")
+    index.complete("dre")
+    index.complete("drea")
+    assert list(index.cache) == ["d", "dr", "drea"]
+
+
+@pytest.mark.asyncio
+async def test_restricted_users_get_no_suggestions(monkeypatch, index):
+    await index.build()
+    monkeypatch.setattr("api.suggest.suggestion_index", index)
+    request = SuggestRequestModel(query="star dr")
+
+    user = nebula.User(meta={"id": 1, "login": "editor"})
+    response = await Request().handle(request, user)
+    assert response.suggestions == ["star drama", "star dragon", "star dream"]
+
+    user["can/asset_view"] = [1, 2]
+    response = await Request().handle(request, user)
+    assert response.suggestions == []
@@ -0,0 +1,139 @@
+import asyncpg
+import pytest
+
+from nebula.helpers import views
+from nebula.helpers.views import (
+    can_materialize,
+    is_materialized,
+    sync_view_members,
+    update_view_members,
+    view_condition,
+)
+from nebula.settings.models import ViewSettings
+from tests.fakes import FakeConnection
+
+
+def view(id: int, **kwargs) -> ViewSettings:
+    return ViewSettings(id=id, name=f"View {id}", position=id, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def clear_built_conditions():
+    views.built_conditions.clear()
+    yield
+    views.built_conditions.clear()
+
+
+def test_only_asset_row_conditions_are_materialized():
+    assert can_materialize(view(1, folders=[1, 2]))
+    assert can_materialize(view(2, conditions=["meta->>'genre' = 'Drama'"]))
+    assert not can_materialize(view(3))
+    assert not can_materialize(
+        view(4, conditions=["ctime > extract(epoch from now())"])
+    )
+    assert not can_materialize(
+        view(5, conditions=["id IN (SELECT id_asset FROM items)"])
+    )
+    assert not can_materialize(
+        view(6, conditions=["EXISTS (select 1 FROM events WHERE id_magic = assets.id)"])
+    )
+
+
+def test_changed_view_is_evaluated_live_until_rebuilt():
+    views.built_conditions[1] = "id_folder IN (1)"
+    assert is_materialized(view(1, folders=[1]))
+    assert not is_materialized(view(1, folders=[2]))
+    assert not is_materialized(view(2, folders=[1]))
+
+
+def built(query: str, args: tuple):
+    if query.startswith("SELECT id_view, condition FROM view_conditions"):
+        return [
+            {"id_view": 1, "condition": "id_folder IN (1)"},
+            {"id_view": 3, "condition": "status IN (1)"},
+        ]
+
+
+@pytest.mark.asyncio
+async def test_memberships_are_updated_using_built_conditions():
+    conn = FakeConnection(built)
+    await update_view_members(conn, [42])
+
+    [(_, args)] = conn.find("DELETE FROM view_members")
+    # Memberships of views which are not materialized are kept
+    assert args == ([42], [1, 3])
+    [(query, args)] = conn.find("INSERT INTO view_members")
+    assert "SELECT 1, id FROM assets WHERE id = ANY($1) AND id_folder IN (1)" in query
+    assert "SELECT 3, id FROM assets WHERE id = ANY($1) AND status IN (1)" in query
+    assert args == ([42],)
+
+
+@pytest.mark.asyncio
+async def test_nothing_is_updated_without_materialized_views():
+    conn = FakeConnection()
+    await update_view_members(conn, [42])
+    assert not conn.find("view_members")
+
+
+@pytest.mark.asyncio
+async def test_failed_update_is_raised():
+    def handler(query: str, args: tuple):
+        if query.startswith("INSERT INTO view_members"):
+            raise asyncpg.exceptions.InvalidTextRepresentationError("Bad value")
+        return built(query, args)
+
+    conn = FakeConnection(handler)
+    with pytest.raises(asyncpg.PostgresError):
+        await update_view_members(conn, [42])
+
+
+@pytest.mark.asyncio
+async def test_changed_views_are_rebuilt():
+    unchanged = view(1, folders=[1])
+    changed = view(2, folders=[2])
+
+    def handler(query: str, args: tuple):
+        if query.startswith("SELECT id_view, condition FROM view_conditions"):
+            return [
+                {"id_view": 1, "condition": view_condition(unchanged)},
+                {"id_view": 2, "condition": "id_folder IN (1)"},
+                {"id_view": 3, "condition": "id_folder IN (3)"},
+            ]
+        if query.startswith("INSERT INTO view_members"):
+            return "INSERT 0 5"
+
+    conn = FakeConnection(handler)
+    await sync_view_members(conn, [unchanged, changed])
+
+    rebuilt = [args for _, args in conn.find("INSERT INTO view_members")]
+    assert rebuilt == [(2,)]
+    (_, args), *_ = conn.find("INSERT INTO view_conditions")
+    assert args == (2, view_condition(changed))
+    (_, args), *_ = conn.find("DELETE FROM view_conditions")
+    assert args == ([3],)
+
+
+@pytest.mark.asyncio
+async def test_view_which_cannot_be_built_is_evaluated_live():
+    broken = view(1, conditions=["(meta->>'year')::INTEGER > 2000"])
+    conditions = {1: "id_folder IN (1)"}
+
+    def handler(query: str, args: tuple):
+        if query.startswith("SELECT id_view, condition FROM view_conditions"):
+            return [{"id_view": k, "condition": v} for k, v in conditions.items()]
+        if query.startswith("INSERT INTO view_members"):
+            raise asyncpg.exceptions.InvalidTextRepresentationError("Bad value")
+        if query.startswith("DELETE FROM view_conditions"):
+            for id in args[0]:
+                del conditions[id]
+
+    conn = FakeConnection(handler)
+    await sync_view_members(conn, [broken])
+    assert can_materialize(broken)
+    assert not is_materialized(broken)
+
+    # Previous memberships are dropped, so they are not updated on save either
+    assert conditions == {}
+    attempts = len(conn.find("INSERT INTO view_members"))
+    await update_view_members(conn, [42])
+    assert len(conn.find("INSERT INTO view_members")) == attempts